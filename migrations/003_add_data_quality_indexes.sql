@@ -0,0 +1,19 @@
+-- Migration: Add Data Quality Covering Indexes
+-- Version: 0.8.0
+-- Date: 2026-10-17
+-- Description: Adds a partial index on virtual_machines(folder) and a covering index on vm_labels
+--              for the Data Quality folder coverage and label coverage queries
+
+-- ============================================================================
+-- 1. PARTIAL INDEX ON FOLDER (GROUP BY folder WHERE folder IS NOT NULL)
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS ix_virtual_machines_folder_not_null
+    ON virtual_machines(folder) WHERE folder IS NOT NULL;
+
+-- ============================================================================
+-- 2. COVERING INDEX ON VM_LABELS (per-VM direct/inherited flags and label joins)
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS ix_vm_labels_vm_id_inherited
+    ON vm_labels(vm_id, inherited_from_folder, label_id);
@@ -0,0 +1,12 @@
+-- Migration: Add VM Name Search Index
+-- Version: 0.8.0
+-- Date: 2026-10-17
+-- Description: Adds an expression index on lower(virtual_machines.vm) so the labelling
+--              page's case-insensitive VM name prefix search is an index range scan
+
+-- ============================================================================
+-- 1. EXPRESSION INDEX ON LOWER(VM) (prefix search by VM name)
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS ix_virtual_machines_vm_lower
+    ON virtual_machines(lower(vm));
@@ -0,0 +1,16 @@
+-- Migration: Add Folder Filter Indexes
+-- Version: 0.8.0
+-- Date: 2026-10-17
+-- Description: Adds composite (cluster, folder) and (datacenter, folder) indexes so the
+--              labelling page's distinct folder lists per cluster / datacenter are
+--              served by an index scan instead of a sort
+
+-- ============================================================================
+-- 1. COMPOSITE INDEXES (distinct folders filtered by cluster or datacenter)
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS ix_virtual_machines_cluster_folder
+    ON virtual_machines(cluster, folder);
+
+CREATE INDEX IF NOT EXISTS ix_virtual_machines_datacenter_folder
+    ON virtual_machines(datacenter, folder);
@@ -31,6 +31,11 @@ def add_indexes(db_url: str):
         ('resource_pool', 'ix_virtual_machines_resource_pool'),
         ('folder', 'ix_virtual_machines_folder'),
         ('os_config', 'ix_virtual_machines_os_config'),
+        # Grouped by the Data Quality report
+        ('connection_state', 'ix_virtual_machines_connection_state'),
+        ('guest_state', 'ix_virtual_machines_guest_state'),
+        ('firmware', 'ix_virtual_machines_firmware'),
+        ('hw_version', 'ix_virtual_machines_hw_version'),
     ]
     
     created_count = 0
@@ -4,10 +4,12 @@ import streamlit as st
 from pathlib import Path
 import tempfile
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from streamlit_extras.colored_header import colored_header
 from streamlit_extras.add_vertical_space import add_vertical_space
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, func, inspect, literal, select, table, text, union_all
 from sqlalchemy.orm import sessionmaker
 
 # Import loader and models
@@ -15,6 +17,138 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.loader import load_excel_to_db, get_sheet_names
 from src.models import Base, VirtualMachine
+from src.dashboard.utils.database import get_engine
+
+
+@st.cache_data(ttl=5)
+def _db_size(path: str) -> int:
+    """Get database file size in bytes (cached briefly to avoid a stat per rerun)."""
+    return os.path.getsize(path)
+
+
+@st.cache_data(ttl=30)
+def _table_names(db_url: str) -> list[str]:
+    """Get table names for the database (cached to skip inspector reflection)."""
+    return inspect(get_engine(db_url)).get_table_names()
+
+
+@st.cache_data(ttl=30)
+def _table_counts(db_url: str) -> dict[str, int]:
+    """Count records of every table in a single UNION ALL round-trip.
+    
+    Table names are checked against the inspector allowlist and rendered
+    through SQLAlchemy's identifier quoting rather than string formatting.
+    """
+    allowed = set(_table_names(db_url))
+    if not allowed:
+        return {}
+    
+    counts_query = union_all(*[
+        select(
+            literal(table_name).label("table_name"),
+            func.count().label("record_count")
+        ).select_from(table(table_name))
+        for table_name in sorted(allowed)
+    ])
+    
+    with get_engine(db_url).connect() as conn:
+        rows = conn.execute(counts_query).all()
+    return {row.table_name: row.record_count for row in rows}
+
+
+@st.cache_resource
+def _executor() -> ThreadPoolExecutor:
+    """Get the shared executor used to run imports off the render thread."""
+    return ThreadPoolExecutor(max_workers=2)
+
+
+def _run_import(file_bytes: bytes, db_url: str, clear_existing: bool,
+                sheet_name: str, progress: dict) -> int:
+    """Import an uploaded workbook in a worker thread.
+    
+    The job owns its own temporary copy of the file, since the page's temp
+    file is removed at the end of every rerun.
+    
+    Args:
+        file_bytes: Raw content of the uploaded Excel file
+        db_url: Database connection URL
+        clear_existing: Remove existing VM data before import
+        sheet_name: Sheet to import
+        progress: Shared dict updated with 'done' and 'total' row counts
+        
+    Returns:
+        Number of records loaded
+    """
+    def _update(done: int, total: int):
+        progress["done"] = done
+        progress["total"] = total
+    
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
+        tmp_file.write(file_bytes)
+        job_path = Path(tmp_file.name)
+    
+    try:
+        return load_excel_to_db(
+            job_path,
+            db_url,
+            clear_existing=clear_existing,
+            sheet_name=sheet_name,
+            progress_callback=_update
+        )
+    finally:
+        try:
+            os.unlink(job_path)
+        except OSError:
+            pass
+
+
+def _render_import_job(db_url: str):
+    """Poll the background import job and render its progress or outcome."""
+    job = st.session_state["import_job"]
+    future = job["future"]
+    progress = job["progress"]
+    
+    if not future.done():
+        total = progress["total"]
+        fraction = progress["done"] / total if total else 0.0
+        st.progress(
+            min(fraction, 1.0),
+            text=f"Importing '{job['sheet_name']}'... {progress['done']:,} / {total:,} rows"
+        )
+        time.sleep(0.5)
+        st.rerun()
+    
+    del st.session_state["import_job"]
+    
+    try:
+        records_loaded = future.result()
+    except Exception as e:
+        st.error(f"❌ Import failed: {e}")
+        
+        with st.expander("🔍 Error Details"):
+            st.exception(e)
+        return
+    
+    st.success(f"✅ Successfully imported {records_loaded:,} records!")
+    
+    # Show import summary
+    st.balloons()
+    
+    with st.expander("📋 Import Summary", expanded=True):
+        summary_col1, summary_col2 = st.columns(2)
+        
+        with summary_col1:
+            st.metric("Records Imported", f"{records_loaded:,}")
+            st.metric("Source Sheet", job["sheet_name"])
+        
+        with summary_col2:
+            st.metric("Database", "Connected" if db_url else "N/A")
+            st.metric("Mode", "Replace" if job["clear_existing"] else "Append")
+        
+        st.info("💡 **Next Steps:** Navigate to Overview or VM Explorer to analyze your data")
+    
+    # Clear cache after import
+    st.cache_data.clear()
 
 
 def render(db_url: str):
@@ -47,7 +181,16 @@ def render(db_url: str):
             help="Upload VMware vSphere inventory export (RVTools or similar format)"
         )
         
+        # Filled at the end of render() so polling reruns don't cut off the other tabs
+        import_status = st.container()
+        
         if uploaded_file is not None:
+            # Record upload time once per file instead of on every rerun
+            upload_time = st.session_state.setdefault(
+                f"upload_time_{uploaded_file.file_id}",
+                datetime.now().strftime("%H:%M:%S")
+            )
+            
             # Show file info
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -56,7 +199,7 @@ def render(db_url: str):
                 file_size_mb = uploaded_file.size / (1024 * 1024)
                 st.metric("File Size", f"{file_size_mb:.2f} MB")
             with col3:
-                st.metric("Upload Time", datetime.now().strftime("%H:%M:%S"))
+                st.metric("Upload Time", upload_time)
             
             add_vertical_space(1)
             
@@ -106,44 +249,24 @@ def render(db_url: str):
                 
                 add_vertical_space(1)
                 
-                # Import button
-                if st.button("🚀 Import Data", type="primary", width='stretch'):
-                    with st.spinner("Importing data... This may take a few minutes for large files."):
-                        try:
-                            # Load data
-                            records_loaded = load_excel_to_db(
-                                tmp_path,
-                                db_url,
-                                clear_existing=clear_existing,
-                                sheet_name=selected_sheet
-                            )
-                            
-                            st.success(f"✅ Successfully imported {records_loaded:,} records!")
-                            
-                            # Show import summary
-                            st.balloons()
-                            
-                            with st.expander("📋 Import Summary", expanded=True):
-                                summary_col1, summary_col2 = st.columns(2)
-                                
-                                with summary_col1:
-                                    st.metric("Records Imported", f"{records_loaded:,}")
-                                    st.metric("Source Sheet", selected_sheet)
-                                
-                                with summary_col2:
-                                    st.metric("Database", "Connected" if db_url else "N/A")
-                                    st.metric("Mode", "Replace" if clear_existing else "Append")
-                                
-                                st.info("💡 **Next Steps:** Navigate to Overview or VM Explorer to analyze your data")
-                            
-                            # Clear cache after import
-                            st.cache_data.clear()
-                            
-                        except Exception as e:
-                            st.error(f"❌ Import failed: {e}")
-                            
-                            with st.expander("🔍 Error Details"):
-                                st.exception(e)
+                # Import button (runs in a background thread so the session stays responsive)
+                import_running = "import_job" in st.session_state
+                if st.button("🚀 Import Data", type="primary", width='stretch', disabled=import_running):
+                    progress = {"done": 0, "total": 0}
+                    future = _executor().submit(
+                        _run_import,
+                        uploaded_file.getvalue(),
+                        db_url,
+                        clear_existing,
+                        selected_sheet,
+                        progress
+                    )
+                    st.session_state["import_job"] = {
+                        "future": future,
+                        "progress": progress,
+                        "sheet_name": selected_sheet,
+                        "clear_existing": clear_existing,
+                    }
                 
             finally:
                 # Clean up temp file
@@ -203,7 +326,6 @@ def render(db_url: str):
         
         try:
             engine = create_engine(db_url, echo=False)
-            inspector = inspect(engine)
             SessionLocal = sessionmaker(bind=engine)
             session = SessionLocal()
             
@@ -235,7 +357,7 @@ def render(db_url: str):
                 if db_url.startswith('sqlite'):
                     db_path = db_url.replace('sqlite:///', '')
                     if os.path.exists(db_path):
-                        size_mb = os.path.getsize(db_path) / (1024 * 1024)
+                        size_mb = _db_size(db_path) / (1024 * 1024)
                         st.metric("Database Size", f"{size_mb:.2f} MB")
                     else:
                         st.metric("Database Size", "N/A")
@@ -245,22 +367,21 @@ def render(db_url: str):
             # Table statistics
             st.write("**Tables & Record Counts:**")
             
-            tables = inspector.get_table_names()
+            tables = _table_names(db_url)
             
             if tables:
+                try:
+                    counts = _table_counts(db_url)
+                except Exception:
+                    counts = {}
+                
                 table_data = []
                 for table_name in tables:
-                    try:
-                        count = session.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
-                        table_data.append({
-                            "Table": table_name,
-                            "Records": f"{count:,}"
-                        })
-                    except Exception as e:
-                        table_data.append({
-                            "Table": table_name,
-                            "Records": "Error"
-                        })
+                    count = counts.get(table_name)
+                    table_data.append({
+                        "Table": table_name,
+                        "Records": f"{count:,}" if count is not None else "Error"
+                    })
                 
                 import pandas as pd
                 df_tables = pd.DataFrame(table_data)
@@ -655,6 +776,7 @@ def render(db_url: str):
                         # Get size after
                         size_after = os.path.getsize(db_path) / (1024 * 1024)
                         saved = size_before - size_after
+                        _db_size.clear()
                         
                         st.success(f"✅ Database optimized!")
                         st.info(f"📊 Size before: {size_before:.2f} MB → After: {size_after:.2f} MB (Saved: {saved:.2f} MB)")
@@ -674,47 +796,52 @@ def render(db_url: str):
                 health_status = []
                 
                 try:
-                    engine = create_engine(db_url, echo=False)
+                    engine = get_engine(db_url)
                     
-                    # Test 1: Connection
-                    try:
-                        with engine.connect() as conn:
+                    # All probes share a single connection to avoid repeated checkouts
+                    with engine.connect() as conn:
+                        # Test 1: Connection
+                        try:
                             conn.execute(text("SELECT 1"))
-                        health_status.append(("✅", "Database Connection", "Successful"))
-                    except Exception as e:
-                        health_status.append(("❌", "Database Connection", f"Failed: {e}"))
-                    
-                    # Test 2: Tables exist
-                    try:
-                        inspector = inspect(engine)
-                        tables = inspector.get_table_names()
-                        health_status.append(("✅", "Tables", f"{len(tables)} tables found"))
-                    except Exception as e:
-                        health_status.append(("❌", "Tables", f"Error: {e}"))
-                    
-                    # Test 3: Data accessible
-                    try:
-                        SessionLocal = sessionmaker(bind=engine)
-                        session = SessionLocal()
-                        count = session.query(VirtualMachine).count()
-                        session.close()
-                        health_status.append(("✅", "Data Access", f"{count:,} VM records"))
-                    except Exception as e:
-                        health_status.append(("❌", "Data Access", f"Error: {e}"))
-                    
-                    # Test 4: Write test
-                    try:
-                        with engine.connect() as conn:
+                            health_status.append(("✅", "Database Connection", "Successful"))
+                        except Exception as e:
+                            health_status.append(("❌", "Database Connection", f"Failed: {e}"))
+                        
+                        # Test 2: Tables exist
+                        try:
+                            tables = inspect(conn).get_table_names()
+                            health_status.append(("✅", "Tables", f"{len(tables)} tables found"))
+                        except Exception as e:
+                            health_status.append(("❌", "Tables", f"Error: {e}"))
+                        
+                        # Test 3: Data accessible
+                        try:
+                            count = conn.execute(
+                                select(func.count()).select_from(VirtualMachine)
+                            ).scalar()
+                            health_status.append(("✅", "Data Access", f"{count:,} VM records"))
+                        except Exception as e:
+                            conn.rollback()
+                            health_status.append(("❌", "Data Access", f"Error: {e}"))
+                        
+                        # Test 4: Write test
+                        try:
                             conn.execute(text("SELECT 1"))
                             conn.commit()
-                        health_status.append(("✅", "Write Access", "Successful"))
-                    except Exception as e:
-                        health_status.append(("❌", "Write Access", f"Failed: {e}"))
+                            health_status.append(("✅", "Write Access", "Successful"))
+                        except Exception as e:
+                            health_status.append(("❌", "Write Access", f"Failed: {e}"))
                     
                 except Exception as e:
-                    health_status.append(("❌", "Health Check", f"Error: {e}"))
+                    # Connection checkout itself failed, so no probe could run
+                    health_status.append(("❌", "Database Connection", f"Failed: {e}"))
                 
                 # Display results
                 st.write("**Health Check Results:**")
                 for icon, check, result in health_status:
                     st.write(f"{icon} **{check}:** {result}")
+    
+    # Poll a running background import last, once every tab has been drawn
+    if "import_job" in st.session_state:
+        with import_status:
+            _render_import_job(db_url)
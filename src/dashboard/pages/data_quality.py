@@ -3,10 +3,13 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-from sqlalchemy import create_engine, func, inspect
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import Float, and_, case, cast, exists, func, inspect, or_, select, text
+import numpy as np
 import pandas as pd
-from src.models import VirtualMachine
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.models import ColumnQualityStat, FolderLabel, Label, VirtualMachine, VMLabel
+from src.dashboard.utils.cache import encode_csv, get_distinct_values
+from src.dashboard.utils.database import DatabaseManager, get_engine
 from src.dashboard.utils.pagination import PaginationHelper
 from src.dashboard.utils.errors import DataValidator
 import sys
@@ -15,115 +18,360 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils.theme import ThemeManager
 
 
+# Column groups offered in the category selector (None = all columns)
+CATEGORIES = {
+    "All": None,
+    "Basic Info": ["vm", "powerstate", "template", "config_status", "dns_name", "connection_state", "guest_state"],
+    "Resources": ["cpus", "memory", "nics", "disks", "provisioned_mib", "in_use_mib"],
+    "Network": ["primary_ip_address", "network_1", "network_2", "network_3", "network_4"],
+    "Infrastructure": ["datacenter", "cluster", "host", "resource_pool", "folder"],
+    "Operating System": ["os_config", "os_vmware_tools"],
+    "Hardware": ["firmware", "hw_version", "hw_upgrade_status"],
+    "Custom Fields": ["code_ccx", "vm_nbu", "vm_orchid", "env"],
+    "Identifiers": ["vm_id", "vm_uuid"],
+    "Labels": "labels",  # Special handling for labels
+}
+
+# Low-cardinality columns whose distinct values come from a cached lookup
+# instead of a COUNT(DISTINCT) scan
+CATEGORICAL_COLS = frozenset({
+    "powerstate", "connection_state", "guest_state", "firmware", "hw_version", "template",
+})
+
+# Folder coverage orderings (all descending, ties broken by folder path)
+FOLDER_SORT_OPTIONS = ['Total VMs', 'Coverage %', 'Unlabeled VMs']
+
+# Example keys listed in a quality-issue description
+ISSUE_PREVIEW_SIZE = 5
+
+# Longest value label drawn in detailed-report charts (table and CSV keep full values)
+CHART_LABEL_MAX_LENGTH = 40
+
+# Inventory size above which missing indexes on CATEGORICAL_COLS are flagged
+INDEX_HINT_THRESHOLD = 100_000
+
+# Columns aggregated per SELECT; wider sets are split into concurrent batches
+MAX_COLUMNS_PER_QUERY = 200
+MAX_PROBE_WORKERS = 4  # Stays below the pooled engine's pool_size
+
+# Dialects with a built-in APPROX_COUNT_DISTINCT aggregate
+NATIVE_APPROX_DIALECTS = frozenset({"duckdb", "snowflake", "bigquery"})
+
+# Mapped VirtualMachine column attributes, resolved once at import time
+_COLUMN_ATTRS = {
+    name: getattr(VirtualMachine, name)
+    for name in inspect(VirtualMachine).columns.keys()
+}
+
+
+def _distinct_count_expr(col_attr, dialect_name: str, fused: bool = False):
+    """Build an expression counting the distinct non-null values of a column.
+    
+    PostgreSQL and MySQL can parallelize GROUP BY but not COUNT(DISTINCT), so a
+    lone column is counted over a grouped subquery there. Each subquery scans
+    the table again, so ``fused`` keeps COUNT(DISTINCT) for multi-column probes
+    that should share one scan. SQLite always uses COUNT(DISTINCT).
+    """
+    if fused or dialect_name == "sqlite":
+        return func.count(func.distinct(col_attr))
+    
+    grouped = select(col_attr).where(col_attr.isnot(None)).group_by(col_attr).subquery()
+    return select(func.count()).select_from(grouped).scalar_subquery()
+
+
+def _approx_distinct_expr(col_attr, dialect_name: str):
+    """Build an approximate (HyperLogLog) distinct-count expression.
+    
+    PostgreSQL relies on the ``hll`` extension; DuckDB, Snowflake and BigQuery
+    use their built-in ``approx_count_distinct``. Callers check support first.
+    """
+    if dialect_name in NATIVE_APPROX_DIALECTS:
+        return func.approx_count_distinct(col_attr)
+    return func.hll_cardinality(func.hll_add_agg(func.hll_hash_any(col_attr)))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _approx_distinct_supported(db_url: str) -> bool:
+    """Check whether the database can count distinct values approximately."""
+    engine = get_engine(db_url)
+    
+    if engine.dialect.name in NATIVE_APPROX_DIALECTS:
+        return True
+    if engine.dialect.name != "postgresql":
+        return False
+    
+    try:
+        with engine.connect() as conn:
+            return bool(conn.execute(
+                text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'hll')")
+            ).scalar())
+    except Exception:
+        return False
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _unindexed_columns(db_url: str, columns: tuple) -> tuple:
+    """Return the columns that are not the leading column of any index."""
+    indexes = inspect(get_engine(db_url)).get_indexes("virtual_machines")
+    leading = {idx["column_names"][0] for idx in indexes if idx["column_names"]}
+    return tuple(col_name for col_name in columns if col_name not in leading)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _analyzable_columns(db_url: str) -> tuple:
+    """Get all virtual_machines columns except id and imported_at.
+    
+    The schema only changes through migrations, so an hourly refresh is enough.
+    """
+    columns = inspect(get_engine(db_url)).get_columns("virtual_machines")
+    return tuple(col["name"] for col in columns if col["name"] not in ("id", "imported_at"))
+
+
+def _inventory_stats(session):
+    """Fetch the VM count and latest import timestamp in one round-trip.
+    
+    The timestamp versions cached reports so a new import invalidates them.
+    """
+    total_vms, data_version = session.execute(
+        select(func.count(), func.max(VirtualMachine.imported_at)).select_from(VirtualMachine)
+    ).one()
+    return total_vms, data_version
+
 
 def render(db_url: str):
     """Render the data quality report page."""
     st.markdown('<h1 class="main-header">📋 Data Quality Report</h1>', unsafe_allow_html=True)
     
     try:
-        engine = create_engine(db_url, echo=False)
-        SessionLocal = sessionmaker(bind=engine)
-        session = SessionLocal()
-        inspector = inspect(engine)
-        
-        # Get total VM count
-        total_vms = session.query(func.count(VirtualMachine.id)).scalar()
-        
-        if total_vms == 0:
-            st.warning("⚠️ No data found in database. Please load data first.")
-            return
-        
-        st.info(f"Analyzing {total_vms:,} virtual machines")
-        
-        # Category selection
-        categories = {
-            "All": None,
-            "Basic Info": ["vm", "powerstate", "template", "config_status", "dns_name", "connection_state", "guest_state"],
-            "Resources": ["cpus", "memory", "nics", "disks", "provisioned_mib", "in_use_mib"],
-            "Network": ["primary_ip_address", "network_1", "network_2", "network_3", "network_4"],
-            "Infrastructure": ["datacenter", "cluster", "host", "resource_pool", "folder"],
-            "Operating System": ["os_config", "os_vmware_tools"],
-            "Hardware": ["firmware", "hw_version", "hw_upgrade_status"],
-            "Custom Fields": ["code_ccx", "vm_nbu", "vm_orchid", "env"],
-            "Identifiers": ["vm_id", "vm_uuid"],
-            "Labels": "labels",  # Special handling for labels
-        }
-        
-        selected_category = st.selectbox("Select Category", list(categories.keys()))
-        
-        st.divider()
-        
-        # Get columns to analyze
-        if categories[selected_category]:
-            columns_to_analyze = categories[selected_category]
-        else:
-            # Get all columns except id and imported_at
-            all_columns = [col["name"] for col in inspector.get_columns("virtual_machines")]
-            columns_to_analyze = [c for c in all_columns if c not in ["id", "imported_at"]]
-        
-        # Analysis mode
-        col1, col2 = st.columns(2)
-        with col1:
-            analysis_mode = st.radio(
-                "Analysis Type",
-                ["Summary", "Detailed"],
-                horizontal=True
-            )
-        with col2:
-            show_charts = st.checkbox("Show Charts", value=True)
-        
-        st.divider()
-        
-        # Check if Labels category is selected
-        if selected_category == "Labels":
-            _render_label_quality_report(session, total_vms)
-        elif analysis_mode == "Summary":
-            _render_summary_report(session, columns_to_analyze, total_vms, show_charts)
-        else:
-            _render_detailed_report(session, columns_to_analyze, total_vms)
-        
+        # Pooled engine and session factory are cached across reruns; the
+        # context manager returns the connection to the pool on every exit path
+        with DatabaseManager.session_scope(db_url) as session:
+            # Get total VM count and data version
+            total_vms, data_version = _inventory_stats(session)
+            
+            if total_vms == 0:
+                st.warning("⚠️ No data found in database. Please load data first.")
+                return
+            
+            st.info(f"Analyzing {total_vms:,} virtual machines")
+            
+            # GROUP BY / COUNT(DISTINCT) on large tables needs indexes to avoid full scans
+            if total_vms > INDEX_HINT_THRESHOLD:
+                unindexed = _unindexed_columns(db_url, tuple(sorted(CATEGORICAL_COLS)))
+                if unindexed:
+                    statements = "\n".join(
+                        f"CREATE INDEX ix_virtual_machines_{col_name} ON virtual_machines ({col_name});"
+                        for col_name in unindexed
+                    )
+                    st.info(
+                        "⚠️ Consider indexing frequently grouped columns for faster reports "
+                        "(or run `scripts/add_indexes.py`):\n\n"
+                        f"```sql\n{statements}\n```"
+                    )
+            
+            # Category selection
+            selected_category = st.selectbox("Select Category", list(CATEGORIES.keys()))
+            
+            st.divider()
+            
+            # Get columns to analyze (Labels has its own report and needs none)
+            if selected_category == "Labels":
+                columns_to_analyze = []
+            elif CATEGORIES[selected_category]:
+                columns_to_analyze = CATEGORIES[selected_category]
+            else:
+                columns_to_analyze = list(_analyzable_columns(db_url))
+            
+            # Analysis mode
+            col1, col2 = st.columns(2)
+            with col1:
+                analysis_mode = st.radio(
+                    "Analysis Type",
+                    ["Summary", "Detailed"],
+                    horizontal=True
+                )
+            with col2:
+                show_charts = st.checkbox("Show Charts", value=True)
+            
+            st.divider()
+            
+            # Check if Labels category is selected
+            if selected_category == "Labels":
+                _render_label_quality_report(session, db_url, total_vms)
+            elif analysis_mode == "Summary":
+                _render_summary_report(db_url, columns_to_analyze, total_vms, data_version, show_charts)
+            else:
+                _render_detailed_report(session, db_url, columns_to_analyze, total_vms, data_version)
+            
     except Exception as e:
         st.error(f"❌ Error loading data: {str(e)}")
-    finally:
-        session.close()
 
 
-def _render_summary_report(session, columns, total_vms, show_charts):
+def _probe_columns(db_url: str, columns, approximate: bool = False) -> dict:
+    """Fetch non-null and distinct counts for a batch of columns in one SELECT.
+    
+    Uses its own pooled session so batches can run concurrently. With
+    ``approximate`` set, distinct counts use HyperLogLog estimates. Columns in
+    CATEGORICAL_COLS take their distinct count from the cached value lookup.
+    
+    Returns:
+        Mapping of column name to (non_null_count, distinct_count)
+    """
+    scanned = [col_name for col_name in columns if col_name not in CATEGORICAL_COLS]
+    
+    with DatabaseManager.session_scope(db_url) as session:
+        dialect_name = session.get_bind().dialect.name
+        if approximate:
+            distinct_exprs = [_approx_distinct_expr(_COLUMN_ATTRS[col_name], dialect_name) for col_name in scanned]
+        else:
+            # Several columns: fuse every aggregate into a single table scan
+            fused = len(scanned) > 1
+            distinct_exprs = [
+                _distinct_count_expr(_COLUMN_ATTRS[col_name], dialect_name, fused) for col_name in scanned
+            ]
+        stmt = select(
+            *[func.count(_COLUMN_ATTRS[col_name]) for col_name in columns],
+            *distinct_exprs
+        ).select_from(VirtualMachine)
+        # Server-side cursor on PostgreSQL streams the wide row instead of buffering it
+        counts = session.execute(stmt.execution_options(stream_results=True)).one()
+    
+    distinct_counts = {
+        col_name: int(round(counts[len(columns) + idx] or 0))
+        for idx, col_name in enumerate(scanned)
+    }
+    
+    results = {}
+    for idx, col_name in enumerate(columns):
+        non_null_count = counts[idx] or 0
+        if non_null_count == 0:
+            # All-NULL column: nothing distinct to look up
+            distinct_count = 0
+        elif col_name in distinct_counts:
+            distinct_count = distinct_counts[col_name]
+        else:
+            distinct_count = len(get_distinct_values(db_url, col_name))
+        results[col_name] = (non_null_count, distinct_count)
+    
+    return results
+
+
+def _stored_counts(db_url: str, columns, total_vms: int, data_version) -> dict:
+    """Read materialized column statistics if they describe the current data.
+    
+    Statistics are refreshed at import time (see QualityService); they are
+    only trusted when they cover every requested column, were computed over
+    the current row count and are not older than the latest import.
+    
+    Returns:
+        Mapping of column name to (non_null_count, distinct_count), or an
+        empty dict when the live aggregates must be used instead
+    """
+    try:
+        with DatabaseManager.session_scope(db_url) as session:
+            stats = session.execute(
+                select(
+                    ColumnQualityStat.column_name,
+                    ColumnQualityStat.non_null_count,
+                    ColumnQualityStat.distinct_count,
+                    ColumnQualityStat.total_rows,
+                    ColumnQualityStat.refreshed_at
+                ).where(ColumnQualityStat.column_name.in_(columns))
+            ).all()
+    except Exception:
+        # Databases created before the statistics table existed
+        return {}
+    
+    if len(stats) != len(set(columns)):
+        return {}
+    if any(
+        row.total_rows != total_vms or (data_version is not None and row.refreshed_at < data_version)
+        for row in stats
+    ):
+        return {}
+    
+    return {row.column_name: (row.non_null_count, row.distinct_count) for row in stats}
+
+
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def _compute_quality(db_url: str, columns: tuple, total_vms: int, data_version=None,
+                     approximate: bool = False) -> pd.DataFrame:
+    """Compute completeness and cardinality metrics for the given columns.
+    
+    Args:
+        db_url: Database connection URL
+        columns: Column names to analyze (must exist on VirtualMachine)
+        total_vms: Total VM count used as completeness denominator
+        data_version: Latest import timestamp; part of the cache key so a new
+            import invalidates the cached report
+        approximate: Estimate distinct counts with HyperLogLog (see
+            _approx_distinct_supported)
+        
+    Returns:
+        DataFrame with one row of metrics per column
+    """
+    if not columns:
+        return pd.DataFrame()
+    
+    # Precomputed statistics from the last import skip the aggregation entirely
+    column_counts = _stored_counts(db_url, columns, total_vms, data_version)
+    
+    if not column_counts:
+        batches = [
+            columns[i:i + MAX_COLUMNS_PER_QUERY]
+            for i in range(0, len(columns), MAX_COLUMNS_PER_QUERY)
+        ]
+        
+        if len(batches) == 1 or get_engine(db_url).dialect.name == "sqlite":
+            # SQLite serializes access to the file, so batches run one after another
+            for batch in batches:
+                column_counts.update(_probe_columns(db_url, batch, approximate))
+        else:
+            with ThreadPoolExecutor(max_workers=min(MAX_PROBE_WORKERS, len(batches))) as executor:
+                futures = [executor.submit(_probe_columns, db_url, batch, approximate) for batch in batches]
+                for future in as_completed(futures):
+                    column_counts.update(future.result())
+    
+    non_null = np.array([column_counts[col_name][0] for col_name in columns], dtype=np.int64)
+    distinct = np.array([column_counts[col_name][1] for col_name in columns], dtype=np.int64)
+    
+    # Vectorized ratios; zero denominators yield 0 instead of a division warning
+    completeness = np.divide(
+        non_null * 100.0, total_vms, out=np.zeros(len(columns)), where=total_vms > 0
+    )
+    cardinality = np.divide(
+        distinct * 100.0, non_null, out=np.zeros(len(columns)), where=non_null > 0
+    )
+    
+    df_report = pd.DataFrame({
+        'Column': list(columns),
+        'Non-Null Count': non_null,
+        'Null Count': total_vms - non_null,
+        'Completeness (%)': completeness.round(1),
+        'Unique Values': distinct,
+        'Cardinality': cardinality.round(1)
+    })
+    
+    # Arrow-backed columns hand off to st.dataframe without a pandas->Arrow conversion
+    return df_report.convert_dtypes(dtype_backend="pyarrow")
+
+
+def _render_summary_report(db_url, columns, total_vms, data_version, show_charts):
     """Render summary report with completeness metrics."""
     st.subheader("Data Completeness Summary")
     
-    report_data = []
-    
+    # Drop unknown columns up front so they don't break the aggregate query
+    valid_columns = []
     for col_name in columns:
-        try:
-            col_attr = getattr(VirtualMachine, col_name)
-            
-            # Count non-null values
-            non_null_count = session.query(func.count(col_attr)).filter(
-                col_attr.isnot(None)
-            ).scalar() or 0
-            
-            # Count distinct values
-            distinct_count = session.query(func.count(func.distinct(col_attr))).filter(
-                col_attr.isnot(None)
-            ).scalar() or 0
-            
-            # Calculate metrics
-            completeness = (non_null_count / total_vms * 100) if total_vms > 0 else 0
-            null_count = total_vms - non_null_count
-            
-            report_data.append({
-                'Column': col_name,
-                'Non-Null Count': non_null_count,
-                'Null Count': null_count,
-                'Completeness (%)': round(completeness, 1),
-                'Unique Values': distinct_count,
-                'Cardinality': round(distinct_count / non_null_count * 100, 1) if non_null_count > 0 else 0
-            })
-        except Exception as e:
-            st.warning(f"Could not analyze column '{col_name}': {e}")
+        if col_name in _COLUMN_ATTRS:
+            valid_columns.append(col_name)
+        else:
+            st.warning(f"Could not analyze column '{col_name}': unknown column")
+    
+    # Summary only compares cardinality buckets, so estimates are good enough
+    approximate = _approx_distinct_supported(db_url)
     
-    df_report = pd.DataFrame(report_data)
+    df_report = _compute_quality(db_url, tuple(valid_columns), total_vms, data_version, approximate)
     
     if df_report.empty:
         st.warning("No data to display")
@@ -133,21 +381,19 @@ def _render_summary_report(session, columns, total_vms, show_charts):
     df_report = df_report.sort_values('Completeness (%)', ascending=False)
     
     # Display metrics
+    completeness = df_report['Completeness (%)'].to_numpy(dtype=float)
     col1, col2, col3 = st.columns(3)
     with col1:
-        avg_completeness = df_report['Completeness (%)'].mean()
-        st.metric("Average Completeness", f"{avg_completeness:.1f}%")
+        st.metric("Average Completeness", f"{completeness.mean():.1f}%")
     with col2:
-        complete_cols = len(df_report[df_report['Completeness (%)'] == 100])
-        st.metric("100% Complete Columns", complete_cols)
+        st.metric("100% Complete Columns", int((completeness == 100).sum()))
     with col3:
-        incomplete_cols = len(df_report[df_report['Completeness (%)'] < 50])
-        st.metric("< 50% Complete Columns", incomplete_cols)
+        st.metric("< 50% Complete Columns", int((completeness < 50).sum()))
     
     st.divider()
     
     # Export button
-    csv_data = df_report.to_csv(index=False).encode('utf-8')
+    csv_data = encode_csv(df_report)
     st.download_button(
         label="⬇️ Export Report CSV",
         data=csv_data,
@@ -155,23 +401,26 @@ def _render_summary_report(session, columns, total_vms, show_charts):
         mime="text/csv"
     )
     
-    # Display table with color coding
-    def color_completeness(val):
-        if val >= 90:
-            return 'background-color: #d4edda'
-        elif val >= 70:
-            return 'background-color: #fff3cd'
-        elif val >= 50:
-            return 'background-color: #f8d7da'
-        else:
-            return 'background-color: #f5c6cb'
-    
-    styled_df = df_report.style.map(
-        color_completeness,
-        subset=['Completeness (%)']
+    # Display table; native progress column avoids per-cell Styler rendering
+    st.dataframe(
+        df_report,
+        width="stretch",
+        hide_index=True,
+        column_config={
+            'Completeness (%)': st.column_config.ProgressColumn(
+                'Completeness (%)',
+                min_value=0,
+                max_value=100,
+                format="%.1f%%"
+            ),
+            'Unique Values': st.column_config.NumberColumn(
+                '≈ Unique Values' if approximate else 'Unique Values'
+            )
+        }
     )
     
-    st.dataframe(styled_df, width="stretch", hide_index=True)
+    if approximate:
+        st.caption("≈ Unique values are HyperLogLog estimates; use the Detailed view for exact counts.")
     
     if show_charts:
         st.divider()
@@ -180,17 +429,10 @@ def _render_summary_report(session, columns, total_vms, show_charts):
         
         with col1:
             # Completeness bar chart
-            fig = px.bar(
-                df_report.head(20),
-                x='Completeness (%)',
-                y='Column',
-                orientation='h',
-                title='Data Completeness by Column (Top 20)',
-                color='Completeness (%)',
-                color_continuous_scale='RdYlGn',
-                range_color=[0, 100]
+            top = df_report.head(20)
+            fig = _completeness_bar_figure(
+                tuple(top['Column'].tolist()), tuple(top['Completeness (%)'].tolist())
             )
-            fig.update_layout(yaxis={'categoryorder':'total ascending'})
             fig = ThemeManager.apply_chart_theme(fig)
 
             st.plotly_chart(fig, width='stretch')
@@ -216,7 +458,107 @@ def _render_summary_report(session, columns, total_vms, show_charts):
             st.plotly_chart(fig, width='stretch')
 
 
-def _render_detailed_report(session, columns, total_vms):
+@st.cache_data(max_entries=32, show_spinner=False)
+def _completeness_bar_figure(columns: tuple, completeness: tuple) -> go.Figure:
+    """Build the completeness-by-column bar chart from plain arrays."""
+    fig = go.Figure(go.Bar(
+        x=completeness,
+        y=columns,
+        orientation='h',
+        marker=dict(
+            color=completeness,
+            colorscale='RdYlGn',
+            cmin=0,
+            cmax=100,
+            colorbar=dict(title='Completeness (%)')
+        )
+    ))
+    fig.update_layout(
+        title='Data Completeness by Column (Top 20)',
+        xaxis_title='Completeness (%)',
+        yaxis={'categoryorder': 'total ascending'}
+    )
+    return fig
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _value_distribution_figure(viz_type: str, values: tuple, counts: tuple, title: str) -> go.Figure:
+    """Build the detailed-report value distribution chart from plain arrays.
+    
+    Graph objects skip Plotly Express's DataFrame introspection, and the
+    figure is cached so unrelated reruns don't rebuild it.
+    """
+    if viz_type == "Bar Chart":
+        fig = go.Figure(go.Bar(
+            x=counts,
+            y=values,
+            orientation='h',
+            text=counts,
+            textposition='outside',
+            marker=dict(color=counts, colorscale='Blues')
+        ))
+        fig.update_layout(showlegend=False, yaxis={'categoryorder': 'total ascending'})
+    elif viz_type == "Pie Chart":
+        fig = go.Figure(go.Pie(
+            labels=values,
+            values=counts,
+            textposition='inside',
+            textinfo='percent+label'
+        ))
+    else:  # Treemap
+        fig = go.Figure(go.Treemap(
+            labels=values,
+            parents=[""] * len(values),
+            values=counts,
+            marker=dict(colors=counts, colorscale='Viridis')
+        ))
+    
+    fig.update_layout(title=title)
+    return fig
+
+
+def _value_counts_stmt(col_attr):
+    """Build the per-value count statement for a column, most frequent first."""
+    return select(
+        col_attr,
+        func.count().label('count')
+    ).where(
+        col_attr.isnot(None)
+    ).group_by(col_attr).order_by(func.count().desc())
+
+
+def _read_frame(session, stmt, columns) -> pd.DataFrame:
+    """Run a statement straight into an Arrow-backed DataFrame.
+    
+    pandas decodes the cursor into Arrow columns, skipping a Python Row
+    tuple per result row.
+    """
+    df = pd.read_sql_query(stmt, session.connection(), dtype_backend="pyarrow")
+    df.columns = columns
+    return df
+
+
+def _value_counts_frame(session, stmt, total_vms: int) -> pd.DataFrame:
+    """Fetch (value, count) rows as a Value/Count/Percentage frame."""
+    df_values = _read_frame(session, stmt, ['Value', 'Count'])
+    df_values['Percentage'] = np.round(
+        df_values['Count'].to_numpy(dtype='int64', na_value=0) * (100.0 / total_vms), 2
+    )
+    return df_values
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _all_value_counts(db_url: str, col_name: str, total_vms: int) -> pd.DataFrame:
+    """Fetch every distinct value with its count for the full CSV export.
+    
+    Only called on explicit request, since high-cardinality columns can have
+    tens of thousands of distinct values.
+    """
+    with DatabaseManager.session_scope(db_url) as session:
+        return _value_counts_frame(session, _value_counts_stmt(_COLUMN_ATTRS[col_name]), total_vms)
+
+
+def _render_detailed_report(session, db_url, columns, total_vms, data_version):
     """Render detailed report with actual unique values."""
     st.subheader("Detailed Unique Values Report")
     
@@ -232,12 +574,15 @@ def _render_detailed_report(session, columns, total_vms):
     st.divider()
     
     try:
-        col_attr = getattr(VirtualMachine, selected_column)
+        col_attr = _COLUMN_ATTRS[selected_column]
         
-        # Get statistics
-        non_null_count = session.query(func.count(col_attr)).filter(
-            col_attr.isnot(None)
-        ).scalar() or 0
+        # Header statistics come from one cached COUNT / COUNT(DISTINCT) probe,
+        # since the value-count query below is LIMITed to the current page
+        stats = _compute_quality(
+            db_url, (selected_column,), total_vms, data_version
+        ).iloc[0]
+        non_null_count = int(stats['Non-Null Count'])
+        distinct_count = int(stats['Unique Values'])
         
         null_count = total_vms - non_null_count
         completeness = (non_null_count / total_vms * 100) if total_vms > 0 else 0
@@ -251,9 +596,6 @@ def _render_detailed_report(session, columns, total_vms):
         with col3:
             st.metric("Completeness", f"{completeness:.1f}%")
         with col4:
-            distinct_count = session.query(func.count(func.distinct(col_attr))).filter(
-                col_attr.isnot(None)
-            ).scalar() or 0
             st.metric("Unique Values", f"{distinct_count:,}")
         
         st.divider()
@@ -262,9 +604,7 @@ def _render_detailed_report(session, columns, total_vms):
         st.subheader(f"Unique Values in '{selected_column}'")
         
         # Count total distinct values
-        total_distinct = session.query(func.count(func.distinct(col_attr))).filter(
-            col_attr.isnot(None)
-        ).scalar() or 0
+        total_distinct = distinct_count
         
         if total_distinct == 0:
             st.info("No non-null values found for this column")
@@ -276,25 +616,14 @@ def _render_detailed_report(session, columns, total_vms):
             default_page_size=25
         )
         
-        # Build base query
-        base_query = session.query(
-            col_attr,
-            func.count(VirtualMachine.id).label('count')
-        ).filter(
-            col_attr.isnot(None)
-        ).group_by(col_attr).order_by(func.count(VirtualMachine.id).desc())
-        
-        # Apply pagination
+        # Apply pagination (LIMIT/OFFSET pushed into SQL)
         paginated_query = pagination.paginate_query(
-            base_query,
+            _value_counts_stmt(col_attr),
             total_count=total_distinct
         )
         
-        value_counts = paginated_query.all()
-        
         # Create dataframe for current page
-        df_values = pd.DataFrame(value_counts, columns=['Value', 'Count'])
-        df_values['Percentage'] = (df_values['Count'] / total_vms * 100).round(2)
+        df_values = _value_counts_frame(session, paginated_query, total_vms)
         
         # Show pagination info
         st.info(f"Showing {len(df_values)} of {total_distinct:,} unique values")
@@ -303,7 +632,7 @@ def _render_detailed_report(session, columns, total_vms):
         df_display = df_values
         
         # Export button (exports current page only)
-        csv_data = df_values.to_csv(index=False).encode('utf-8')
+        csv_data = encode_csv(df_values)
         col1, col2 = st.columns([3, 1])
         with col1:
             st.download_button(
@@ -312,6 +641,20 @@ def _render_detailed_report(session, columns, total_vms):
                 file_name=f"unique_values_{selected_column}_page_{pagination.current_page}.csv",
                 mime="text/csv"
             )
+            
+            # Full export runs the unbounded query only when requested
+            if total_distinct > len(df_values) and st.button(
+                f"📦 Prepare Full Export ({total_distinct:,} values)",
+                key=f"data_quality_full_export_{selected_column}"
+            ):
+                df_all = _all_value_counts(db_url, selected_column, total_vms)
+                st.download_button(
+                    label=f"⬇️ Export All Values ({len(df_all):,})",
+                    data=encode_csv(df_all),
+                    file_name=f"unique_values_{selected_column}.csv",
+                    mime="text/csv",
+                    key=f"data_quality_full_export_download_{selected_column}"
+                )
         with col2:
             # Pagination controls
             pagination.show_pagination_controls()
@@ -331,47 +674,22 @@ def _render_detailed_report(session, columns, total_vms):
         # Visualization
         viz_type = st.radio("Visualization", ["Bar Chart", "Pie Chart", "Treemap"], horizontal=True)
         
-        if viz_type == "Bar Chart":
-            fig = px.bar(
-                df_display,
-                x='Count',
-                y='Value',
-                orientation='h',
-                title=f'Top {limit} Values Distribution',
-                text='Count',
-                color='Count',
-                color_continuous_scale='Blues'
-            )
-            fig.update_traces(textposition='outside')
-            fig.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
-            fig = ThemeManager.apply_chart_theme(fig)
-
-            st.plotly_chart(fig, width='stretch')
-            
-        elif viz_type == "Pie Chart":
-            fig = px.pie(
-                df_display,
-                values='Count',
-                names='Value',
-                title=f'Top {limit} Values Distribution'
-            )
-            fig.update_traces(textposition='inside', textinfo='percent+label')
-            fig = ThemeManager.apply_chart_theme(fig)
-
-            st.plotly_chart(fig, width='stretch')
-            
-        else:  # Treemap
-            fig = px.treemap(
-                df_display,
-                path=['Value'],
-                values='Count',
-                title=f'Top {limit} Values Distribution',
-                color='Count',
-                color_continuous_scale='Viridis'
-            )
-            fig = ThemeManager.apply_chart_theme(fig)
+        # Long values (DNS names, paths) bloat Plotly's SVG text, so charts get truncated labels
+        values = df_display['Value'].astype(str)
+        df_chart = df_display.assign(Value=values.where(
+            values.str.len() <= CHART_LABEL_MAX_LENGTH,
+            values.str.slice(0, CHART_LABEL_MAX_LENGTH - 1) + "…"
+        ))
+        
+        fig = _value_distribution_figure(
+            viz_type,
+            tuple(df_chart['Value'].tolist()),
+            tuple(df_chart['Count'].tolist()),
+            f'Top {limit} Values Distribution'
+        )
+        fig = ThemeManager.apply_chart_theme(fig)
 
-            st.plotly_chart(fig, width='stretch')
+        st.plotly_chart(fig, width='stretch')
         
         # Show null values if any
         if null_count > 0:
@@ -383,25 +701,176 @@ def _render_detailed_report(session, columns, total_vms):
         st.error(f"Error analyzing column: {str(e)}")
 
 
-def _render_label_quality_report(session, total_vms):
-    """Render label quality and coverage report."""
-    from src.models import Label, VMLabel, FolderLabel
+def _keyset_after(count_expr, key_expr, after):
+    """Predicate selecting groups after ``after`` in (count DESC, key ASC) order."""
+    last_count, last_key = after
+    return or_(count_expr < last_count, and_(count_expr == last_count, key_expr > last_key))
+
+
+def _page_cursor(key_prefix: str, page: int, page_size: int):
+    """Return the last (count, key) of the previous page if it has been fetched."""
+    return st.session_state.get(f"{key_prefix}_cursors", {}).get((page_size, page - 1))
+
+
+def _remember_cursor(key_prefix: str, page: int, page_size: int, cursor):
+    """Store the last (count, key) of a page so the next page can seek past it."""
+    st.session_state.setdefault(f"{key_prefix}_cursors", {})[(page_size, page)] = cursor
+
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def _label_key_stats(db_url: str, page: int, page_size: int, after=None) -> pd.DataFrame:
+    """Fetch one page of per-key value and VM counts, most used keys first.
     
-    st.subheader("🏷️ Label Coverage & Quality")
+    With ``after`` (the previous page's last (vm_count, key)) the page is
+    found by keyset seek instead of sorting and skipping every earlier group.
+    Label assignments change outside imports, so this uses a short TTL instead
+    of the data version.
+    """
+    vm_count = func.count(func.distinct(VMLabel.vm_id))
+    
+    with DatabaseManager.session_scope(db_url) as session:
+        query = select(
+            Label.key,
+            func.count(func.distinct(Label.id)).label('value_count'),
+            vm_count.label('vm_count')
+        ).outerjoin(
+            VMLabel, Label.id == VMLabel.label_id
+        ).group_by(Label.key).order_by(
+            vm_count.desc(), Label.key
+        )
+        
+        if after is not None:
+            query = query.having(_keyset_after(vm_count, Label.key, after))
+        else:
+            query = query.offset((page - 1) * page_size)
+        
+        return _read_frame(session, query.limit(page_size), ['Label Key', 'Value Count', 'VM Count'])
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _folder_sizes(db_url: str) -> np.ndarray:
+    """Fetch the VM count of every folder, for slider bounds and filtered totals."""
+    with DatabaseManager.session_scope(db_url) as session:
+        sizes = session.execute(
+            select(func.count(VirtualMachine.id)).where(
+                VirtualMachine.folder.isnot(None)
+            ).group_by(VirtualMachine.folder)
+        ).scalars().all()
+    
+    return np.array(sizes, dtype=np.int64)
+
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def _folder_coverage(db_url: str, page: int, page_size: int, after=None,
+                     min_vms: int = 1, sort_by: str = 'Total VMs') -> pd.DataFrame:
+    """Fetch one page of per-folder VM and labeled-VM counts.
+    
+    Folders below ``min_vms`` are dropped and the rest ordered by ``sort_by``
+    (one of FOLDER_SORT_OPTIONS, descending) in SQL, so every page comes from
+    the same filtered ordering. ``after`` is the previous page's last
+    (sort value, folder) for a keyset seek.
+    """
+    # Joining one row per labeled VM keeps the join 1:1, so plain COUNTs
+    # replace COUNT(DISTINCT) on the primary key
+    labeled = select(VMLabel.vm_id).distinct().subquery()
+    folder_vms = func.count(VirtualMachine.id)
+    labeled_vms = func.count(labeled.c.vm_id)
+    sort_expr = {
+        'Total VMs': folder_vms,
+        'Coverage %': cast(labeled_vms, Float) / folder_vms,
+        'Unlabeled VMs': folder_vms - labeled_vms,
+    }[sort_by]
+    
+    with DatabaseManager.session_scope(db_url) as session:
+        query = select(
+            VirtualMachine.folder,
+            folder_vms.label('total_vms'),
+            labeled_vms.label('labeled_vms')
+        ).outerjoin(
+            labeled, VirtualMachine.id == labeled.c.vm_id
+        ).where(
+            VirtualMachine.folder.isnot(None)
+        ).group_by(
+            VirtualMachine.folder
+        ).having(
+            folder_vms >= min_vms
+        ).order_by(
+            sort_expr.desc(), VirtualMachine.folder
+        )
+        
+        if after is not None:
+            query = query.having(_keyset_after(sort_expr, VirtualMachine.folder, after))
+        else:
+            query = query.offset((page - 1) * page_size)
+        
+        return _read_frame(session, query.limit(page_size), ['Folder', 'Total VMs', 'Labeled VMs'])
+
+
+def _folder_sort_value(row, sort_by: str):
+    """Compute a folder row's sort value exactly as _folder_coverage orders it."""
+    if sort_by == 'Coverage %':
+        return float(row['Labeled VMs']) / float(row['Total VMs'])
+    if sort_by == 'Unlabeled VMs':
+        return int(row['Total VMs'] - row['Labeled VMs'])
+    return int(row['Total VMs'])
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _label_overview(db_url: str) -> dict:
+    """Fetch the label overview counts in a single round-trip.
     
-    # Get label statistics
-    total_labels = session.query(func.count(Label.id)).scalar() or 0
-    total_label_keys = session.query(func.count(func.distinct(Label.key))).scalar() or 0
+    VM coverage comes from one pass over vm_labels that flags each VM as
+    having direct and/or inherited labels; the definition counts ride along
+    as scalar subqueries.
     
-    # Get VM label assignments (direct only, not inherited)
-    vms_with_labels = session.query(
-        func.count(func.distinct(VMLabel.vm_id))
-    ).filter(VMLabel.inherited_from_folder == False).scalar() or 0
+    Returns:
+        Dict with total_labels, label_keys, folders_with_labels and the VM
+        counts direct, inherited_only and labeled
+    """
+    per_vm = select(
+        VMLabel.vm_id,
+        func.max(case((VMLabel.inherited_from_folder == False, 1), else_=0)).label('has_direct'),
+        func.max(case((VMLabel.inherited_from_folder == True, 1), else_=0)).label('has_inherited')
+    ).group_by(VMLabel.vm_id).subquery()
     
-    # Get folder label assignments
-    folders_with_labels = session.query(
-        func.count(func.distinct(FolderLabel.folder_path))
-    ).scalar() or 0
+    coverage = select(
+        func.coalesce(func.sum(per_vm.c.has_direct), 0).label('direct'),
+        func.coalesce(func.sum(
+            case((and_(per_vm.c.has_direct == 0, per_vm.c.has_inherited == 1), 1), else_=0)
+        ), 0).label('inherited_only'),
+        func.count().label('labeled')
+    ).select_from(per_vm).subquery()
+    
+    stmt = select(
+        select(func.count(Label.id)).scalar_subquery().label('total_labels'),
+        select(func.count(func.distinct(Label.key))).scalar_subquery().label('label_keys'),
+        select(func.count(func.distinct(FolderLabel.folder_path))).scalar_subquery().label('folders_with_labels'),
+        coverage.c.direct,
+        coverage.c.inherited_only,
+        coverage.c.labeled
+    )
+    
+    with DatabaseManager.session_scope(db_url) as session:
+        return dict(session.execute(stmt).mappings().one())
+
+
+def _count_rows(session, stmt) -> int:
+    """Count the rows a statement would return without fetching them."""
+    return session.execute(select(func.count()).select_from(stmt.subquery())).scalar() or 0
+
+
+def _render_label_quality_report(session, db_url, total_vms):
+    """Render label quality and coverage report."""
+    st.subheader("🏷️ Label Coverage & Quality")
+    
+    # Overview counts are shared by every tab and fetched in one cached query
+    overview = _label_overview(db_url)
+    total_labels = overview['total_labels']
+    total_label_keys = overview['label_keys']
+    folders_with_labels = overview['folders_with_labels']
+    vms_with_labels = overview['direct']
+    vms_inherited_only = overview['inherited_only']
+    vms_no_labels = total_vms - overview['labeled']
     
     # Display overview metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -428,26 +897,12 @@ def _render_label_quality_report(session, total_vms):
     with tab1:
         st.write("**VM Label Coverage:**")
         
-        # VMs with no labels at all (direct or inherited)
-        vms_no_labels = session.query(
-            func.count(VirtualMachine.id)
-        ).outerjoin(VMLabel).filter(VMLabel.id.is_(None)).scalar() or 0
-        
-        # VMs with inherited labels only
-        vms_inherited_only = session.query(
-            func.count(func.distinct(VMLabel.vm_id))
-        ).filter(
-            VMLabel.inherited_from_folder == True
-        ).scalar() or 0
-        
-        vms_with_any_labels = total_vms - vms_no_labels
-        
         coverage_data = pd.DataFrame({
             'Category': ['With Direct Labels', 'Inherited Only', 'No Labels'],
-            'Count': [vms_with_labels, vms_inherited_only - vms_with_labels, vms_no_labels],
+            'Count': [vms_with_labels, vms_inherited_only, vms_no_labels],
             'Percentage': [
                 (vms_with_labels / total_vms * 100) if total_vms > 0 else 0,
-                ((vms_inherited_only - vms_with_labels) / total_vms * 100) if total_vms > 0 else 0,
+                (vms_inherited_only / total_vms * 100) if total_vms > 0 else 0,
                 (vms_no_labels / total_vms * 100) if total_vms > 0 else 0
             ]
         })
@@ -486,12 +941,7 @@ def _render_label_quality_report(session, total_vms):
     with tab2:
         st.write("**Label Key Usage Analysis:**")
         
-        # Count total label keys
-        total_label_keys_count = session.query(
-            func.count(func.distinct(Label.key))
-        ).scalar() or 0
-        
-        if total_label_keys_count == 0:
+        if total_label_keys == 0:
             st.info("No label keys found")
             return
         
@@ -501,35 +951,23 @@ def _render_label_quality_report(session, total_vms):
             default_page_size=25
         )
         
-        # Build base query for label key statistics
-        # Note: We need to use a subquery approach for proper pagination with GROUP BY
-        from sqlalchemy import select
-        
-        # Get label key usage statistics with pagination
-        base_key_query = session.query(
-            Label.key,
-            func.count(func.distinct(Label.id)).label('value_count'),
-            func.count(func.distinct(VMLabel.vm_id)).label('vm_count')
-        ).outerjoin(
-            VMLabel, Label.id == VMLabel.label_id
-        ).group_by(Label.key).order_by(
-            func.count(func.distinct(VMLabel.vm_id)).desc()
-        )
-        
-        # Apply pagination
-        paginated_key_query = label_key_pagination.paginate_query(
-            base_key_query,
-            total_count=total_label_keys_count
+        # Aggregates are cached per page so switching tabs or pages re-renders instantly;
+        # stepping forward seeks past the previous page instead of using OFFSET
+        page, page_size = label_key_pagination.current_page, label_key_pagination.page_size
+        df_keys = _label_key_stats(
+            db_url, page, page_size,
+            _page_cursor(label_key_pagination.key_prefix, page, page_size)
         )
         
-        key_stats = paginated_key_query.all()
-        
-        if key_stats:
-            df_keys = pd.DataFrame(key_stats, columns=['Label Key', 'Value Count', 'VM Count'])
+        if not df_keys.empty:
+            _remember_cursor(
+                label_key_pagination.key_prefix, page, page_size,
+                (int(df_keys['VM Count'].iloc[-1]), df_keys['Label Key'].iloc[-1])
+            )
             df_keys['VM Coverage %'] = (df_keys['VM Count'] / total_vms * 100).round(1)
             
             # Show pagination info
-            st.info(f"Showing {len(df_keys)} of {total_label_keys_count:,} label keys")
+            st.info(f"Showing {len(df_keys)} of {total_label_keys:,} label keys")
             
             # Pagination controls
             label_key_pagination.show_pagination_controls()
@@ -548,7 +986,7 @@ def _render_label_quality_report(session, total_vms):
             )
             
             # Export (current page)
-            csv_data = df_keys.to_csv(index=False).encode('utf-8')
+            csv_data = encode_csv(df_keys)
             st.download_button(
                 label=f"⬇️ Export Current Page ({len(df_keys)} keys)",
                 data=csv_data,
@@ -590,30 +1028,29 @@ def _render_label_quality_report(session, total_vms):
             })
         
         # Check for label keys with only one value (might be misconfigured)
-        single_value_keys = session.query(
-            Label.key
-        ).group_by(Label.key).having(
+        single_value_stmt = select(Label.key).group_by(Label.key).having(
             func.count(func.distinct(Label.value)) == 1
-        ).all()
+        )
+        single_value_count = _count_rows(session, single_value_stmt)
         
-        if single_value_keys:
+        if single_value_count:
+            # Only a short preview is displayed, so only that many keys are fetched
+            preview = session.execute(
+                single_value_stmt.order_by(Label.key).limit(ISSUE_PREVIEW_SIZE)
+            ).scalars().all()
             issues.append({
                 'Issue': 'Label keys with single value',
-                'Count': len(single_value_keys),
+                'Count': single_value_count,
                 'Severity': 'Low',
-                'Description': f'{len(single_value_keys)} label keys have only one value: {", ".join([k[0] for k in single_value_keys[:5]])}{"..." if len(single_value_keys) > 5 else ""}'
+                'Description': f'{single_value_count} label keys have only one value: {", ".join(preview)}{"..." if single_value_count > ISSUE_PREVIEW_SIZE else ""}'
             })
         
-        # Check for unused labels
-        unused_labels = session.query(
-            func.count(Label.id)
-        ).outerjoin(
-            VMLabel, Label.id == VMLabel.label_id
-        ).outerjoin(
-            FolderLabel, Label.id == FolderLabel.label_id
-        ).filter(
-            VMLabel.id.is_(None),
-            FolderLabel.id.is_(None)
+        # Check for unused labels (anti-joins stop at the first assignment found)
+        unused_labels = session.execute(
+            select(func.count(Label.id)).where(
+                ~exists().where(VMLabel.label_id == Label.id),
+                ~exists().where(FolderLabel.label_id == Label.id)
+            )
         ).scalar() or 0
         
         if unused_labels > 0:
@@ -624,36 +1061,36 @@ def _render_label_quality_report(session, total_vms):
                 'Description': f'{unused_labels} label definitions are not assigned to any VM or folder'
             })
         
-        # Check for low coverage labels
-        low_coverage_keys = session.query(
-            Label.key
-        ).join(
-            VMLabel, Label.id == VMLabel.label_id
-        ).group_by(Label.key).having(
-            func.count(func.distinct(VMLabel.vm_id)) < total_vms * 0.1  # Less than 10% coverage
-        ).all()
+        # Check for low coverage labels (only meaningful beyond a handful of VMs)
+        low_coverage_count = _count_rows(
+            session,
+            select(Label.key).join(
+                VMLabel, Label.id == VMLabel.label_id
+            ).group_by(Label.key).having(
+                func.count(func.distinct(VMLabel.vm_id)) < total_vms * 0.1  # Less than 10% coverage
+            )
+        ) if total_vms > 10 else 0
         
-        if low_coverage_keys and total_vms > 10:
+        if low_coverage_count:
             issues.append({
                 'Issue': 'Label keys with low coverage',
-                'Count': len(low_coverage_keys),
+                'Count': low_coverage_count,
                 'Severity': 'Low',
-                'Description': f'{len(low_coverage_keys)} label keys are used by less than 10% of VMs'
+                'Description': f'{low_coverage_count} label keys are used by less than 10% of VMs'
             })
         
         if issues:
             df_issues = pd.DataFrame(issues)
             
-            # Color code by severity
-            def color_severity(val):
-                if val == 'High':
-                    return 'background-color: #f8d7da'
-                elif val == 'Medium':
-                    return 'background-color: #fff3cd'
-                else:
-                    return 'background-color: #d1ecf1'
+            # Color code by severity, one vectorized pass over the column
+            def color_severity(severity):
+                return np.select(
+                    [severity == 'High', severity == 'Medium'],
+                    ['background-color: #f8d7da', 'background-color: #fff3cd'],
+                    default='background-color: #d1ecf1'
+                )
             
-            styled_issues = df_issues.style.map(
+            styled_issues = df_issues.style.apply(
                 color_severity,
                 subset=['Severity']
             )
@@ -672,70 +1109,48 @@ def _render_label_quality_report(session, total_vms):
     with tab4:
         st.write("**Label Coverage by Folder:**")
         
-        # Count total folders
-        total_folders = session.query(
-            func.count(func.distinct(VirtualMachine.folder))
-        ).filter(
-            VirtualMachine.folder.isnot(None)
-        ).scalar() or 0
+        folder_sizes = _folder_sizes(db_url)
         
-        if total_folders == 0:
+        if folder_sizes.size == 0:
             st.info("No folder data available")
             return
         
-        # Initialize pagination for folders
+        # Filter and sort are applied in SQL before pagination
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            largest_folder = int(folder_sizes.max())
+            # A slider needs a non-empty range
+            min_vms = st.slider('Minimum VMs in folder', 1, largest_folder, 1) if largest_folder > 1 else 1
+        with col2:
+            sort_by = st.selectbox('Sort by', FOLDER_SORT_OPTIONS)
+        
+        total_folders = int((folder_sizes >= min_vms).sum())
+        
+        # Separate page state per filter/sort so cursors never cross orderings
         folder_pagination = PaginationHelper(
-            key_prefix="data_quality_folder_coverage",
+            key_prefix=f"data_quality_folder_coverage_{sort_by}_{min_vms}",
             default_page_size=50
         )
+        with col3:
+            folder_pagination.show_pagination_controls()
         
-        # Build base query for folders
-        base_folder_query = session.query(
-            VirtualMachine.folder,
-            func.count(func.distinct(VirtualMachine.id)).label('total_vms'),
-            func.count(func.distinct(VMLabel.vm_id)).label('labeled_vms')
-        ).outerjoin(
-            VMLabel, VirtualMachine.id == VMLabel.vm_id
-        ).filter(
-            VirtualMachine.folder.isnot(None)
-        ).group_by(
-            VirtualMachine.folder
-        ).order_by(
-            func.count(func.distinct(VirtualMachine.id)).desc()
-        )
-        
-        # Apply pagination
-        paginated_folder_query = folder_pagination.paginate_query(
-            base_folder_query,
-            total_count=total_folders
+        page, page_size = folder_pagination.current_page, folder_pagination.page_size
+        df_filtered = _folder_coverage(
+            db_url, page, page_size,
+            _page_cursor(folder_pagination.key_prefix, page, page_size),
+            min_vms, sort_by
         )
         
-        folder_coverage = paginated_folder_query.all()
-        
-        if folder_coverage:
-            df_folders = pd.DataFrame(
-                folder_coverage,
-                columns=['Folder', 'Total VMs', 'Labeled VMs']
+        if not df_filtered.empty:
+            _remember_cursor(
+                folder_pagination.key_prefix, page, page_size,
+                (_folder_sort_value(df_filtered.iloc[-1], sort_by), df_filtered['Folder'].iloc[-1])
             )
-            df_folders['Coverage %'] = (df_folders['Labeled VMs'] / df_folders['Total VMs'] * 100).round(1)
-            df_folders['Unlabeled VMs'] = df_folders['Total VMs'] - df_folders['Labeled VMs']
+            df_filtered['Coverage %'] = (df_filtered['Labeled VMs'] / df_filtered['Total VMs'] * 100).round(1)
+            df_filtered['Unlabeled VMs'] = df_filtered['Total VMs'] - df_filtered['Labeled VMs']
             
             # Show pagination info
-            st.info(f"Showing {len(df_folders)} of {total_folders:,} folders")
-            
-            # Filter options
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                min_vms = st.slider('Minimum VMs in folder', 1, int(df_folders['Total VMs'].max()), 1)
-            with col2:
-                sort_by = st.selectbox('Sort by', ['Total VMs', 'Coverage %', 'Unlabeled VMs'])
-            with col3:
-                folder_pagination.show_pagination_controls()
-            
-            df_filtered = df_folders[df_folders['Total VMs'] >= min_vms].sort_values(
-                sort_by,
-                ascending=(sort_by != 'Coverage %')
-            )
+            st.info(f"Showing {len(df_filtered)} of {total_folders:,} folders")
             
             # Display table
             st.dataframe(
@@ -750,7 +1165,7 @@ def _render_label_quality_report(session, total_vms):
             )
             
             # Export (current page)
-            csv_data = df_filtered.to_csv(index=False).encode('utf-8')
+            csv_data = encode_csv(df_filtered)
             st.download_button(
                 label=f"⬇️ Export Current Page ({len(df_filtered)} folders)",
                 data=csv_data,
@@ -3,47 +3,469 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-from sqlalchemy import create_engine, func
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import case, func, inspect, literal, select
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from streamlit_extras.metric_cards import style_metric_cards
 from streamlit_extras.colored_header import colored_header
 from streamlit_extras.add_vertical_space import add_vertical_space
 from streamlit_extras.dataframe_explorer import dataframe_explorer
-from src.models import VirtualMachine
+from src.models import FolderLabel, Label, VirtualMachine
 from src.services.label_service import LabelService
+from src.dashboard.utils.cache import encode_csv
+from src.dashboard.utils.database import DatabaseManager, get_engine
 import sys
 from pathlib import Path
+from typing import Optional
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils.theme import ThemeManager
 
 
 
-def _aggregate_folder_path(folder_path: str, level: int) -> str:
-    """Aggregate folder path to specified hierarchy level.
+# Folder details table: displayed columns, in order, with their formats
+FOLDER_TABLE_FORMAT = {
+    'Folder': '{}',
+    'Label_Count': '{:,.0f}',
+    'VMs': '{:,.0f}',
+    'Total_CPUs': '{:,.0f}',
+    'Total_Memory_GB': '{:,.1f}',
+    'Total_Provisioned_GB': '{:,.1f}',
+    'Total_In_Use_GB': '{:,.1f}',
+    'Total_Unshared_GB': '{:,.1f}',
+    'Avg_CPUs': '{:.1f}',
+    'Avg_Memory_GB': '{:.1f}',
+    'Avg_Provisioned_GB': '{:.1f}',
+    'Avg_In_Use_GB': '{:.1f}',
+    'Datacenters': '{:.0f}',
+    'Clusters': '{:.0f}',
+    'Hosts': '{:.0f}',
+}
+
+# Dialects whose string-position function (instr/strpos) truncates folder paths in SQL
+HIERARCHY_KEY_DIALECTS = frozenset({"sqlite", "postgresql", "mysql", "mariadb"})
+
+# Threads building the visualization figures concurrently
+MAX_FIGURE_WORKERS = 4
+
+# Column dtypes of the per-folder totals (counts fit int32/int16, sizes float32)
+FOLDER_STAT_DTYPES = {
+    'VMs': 'int32',
+    'Total_CPUs': 'int32',
+    'Total_Memory_MB': 'float32',
+    'Total_Provisioned_MiB': 'float32',
+    'Total_In_Use_MiB': 'float32',
+    'Total_Unshared_MiB': 'float32',
+    'Datacenters': 'int16',
+    'Clusters': 'int16',
+    'Hosts': 'int16',
+}
+
+
+def _aggregate_folder_paths(folders: pd.Series, level: int) -> pd.Series:
+    """Aggregate folder paths to the specified hierarchy level.
     
     Args:
-        folder_path: Full folder path (e.g., 'vm/datacenter1/cluster1/folder1')
+        folders: Full folder paths (e.g., 'vm/datacenter1/cluster1/folder1')
         level: Hierarchy level to aggregate to (1 = first segment, 2 = first two segments, etc.)
     
     Returns:
-        Aggregated folder path
+        Aggregated folder paths; empty results become "(root)"
     
     Examples:
-        >>> _aggregate_folder_path('vm/datacenter1/cluster1/folder1', 1)
-        'vm'
-        >>> _aggregate_folder_path('vm/datacenter1/cluster1/folder1', 2)
-        'vm/datacenter1'
+        >>> _aggregate_folder_paths(pd.Series(['vm/datacenter1/cluster1/folder1']), 2).tolist()
+        ['vm/datacenter1']
+    """
+    parts = folders.str.split('/', n=level)
+    aggregated = parts.str[:level].str.join('/')
+    return aggregated.where(aggregated.str.len() > 0, "(root)")
+
+
+def _folder_hierarchy_keys(level: int, dialect_name: str):
+    """Build a subquery mapping each folder to its path truncated at ``level``.
+    
+    SQL counterpart of :func:`_aggregate_folder_paths`: the position of the
+    ``level``-th '/' is located one segment per nested SELECT DISTINCT, so
+    the expression stays linear in ``level`` and is evaluated once per
+    distinct folder rather than once per VM.
+    
+    Args:
+        level: Hierarchy level to aggregate to
+        dialect_name: SQLAlchemy dialect name of the target database
+    
+    Returns:
+        Subquery with ``folder`` and ``agg_folder`` columns
+    """
+    locate = func.strpos if dialect_name == "postgresql" else func.instr
+    
+    # cut = position of the last '/' found so far, -1 once the path runs out
+    keys = select(
+        VirtualMachine.folder.label('folder'),
+        literal(0).label('cut')
+    ).where(VirtualMachine.folder.isnot(None)).distinct().subquery()
+    for _ in range(level):
+        offset = locate(func.substr(keys.c.folder, keys.c.cut + 1), '/')
+        keys = select(
+            keys.c.folder,
+            case(
+                (keys.c.cut < 0, -1),
+                (offset == 0, -1),
+                else_=keys.c.cut + offset
+            ).label('cut')
+        ).distinct().subquery()
+    
+    prefix = case(
+        (keys.c.cut < 0, keys.c.folder),
+        else_=func.substr(keys.c.folder, 1, keys.c.cut - 1)
+    )
+    return select(
+        keys.c.folder,
+        func.coalesce(func.nullif(prefix, ''), '(root)').label('agg_folder')
+    ).subquery()
+
+
+def _add_derived_columns(df_folders: pd.DataFrame) -> pd.DataFrame:
+    """Add the GB totals and per-VM averages to raw folder totals.
+    
+    Applied once, after any regrouping, in a single assign over float32
+    arrays.
+    """
+    vms = df_folders['VMs'].to_numpy(np.float32)
+    memory_gb = np.round(df_folders['Total_Memory_MB'].to_numpy() / 1024, 1)
+    provisioned_gb = np.round(df_folders['Total_Provisioned_MiB'].to_numpy() / 1024, 1)
+    in_use_gb = np.round(df_folders['Total_In_Use_MiB'].to_numpy() / 1024, 1)
+    return df_folders.assign(
+        Total_Memory_GB=memory_gb,
+        Total_Provisioned_GB=provisioned_gb,
+        Total_In_Use_GB=in_use_gb,
+        Total_Unshared_GB=np.round(df_folders['Total_Unshared_MiB'].to_numpy() / 1024, 1),
+        Avg_CPUs=np.round(df_folders['Total_CPUs'].to_numpy(np.float32) / vms, 1),
+        Avg_Memory_GB=np.round(memory_gb / vms, 1),
+        Avg_Provisioned_GB=np.round(provisioned_gb / vms, 1),
+        Avg_In_Use_GB=np.round(in_use_gb / vms, 1)
+    )
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_folder_stats(db_url: str, level: Optional[int] = None) -> pd.DataFrame:
+    """Fetch per-folder resource and storage totals with derived columns.
+    
+    Cached per (db_url, level), so changing the filter, sort or label
+    widgets re-slices this frame without going back to the database.
+    
+    Args:
+        db_url: SQLAlchemy database URL
+        level: Hierarchy level to aggregate folders to (None = full path)
+    
+    Returns:
+        DataFrame with one row per folder, unordered (empty when no VM has
+        a folder)
+    """
+    with DatabaseManager.session_scope(db_url) as session:
+        dialect_name = session.get_bind().dialect.name
+        sql_level = level if dialect_name in HIERARCHY_KEY_DIALECTS else None
+        
+        folder_key = VirtualMachine.folder
+        if sql_level is not None:
+            keys = _folder_hierarchy_keys(sql_level, dialect_name)
+            folder_key = keys.c.agg_folder
+        
+        stmt = select(
+            folder_key,
+            func.count(VirtualMachine.id).label('vm_count'),
+            func.coalesce(func.sum(VirtualMachine.cpus), 0).label('total_cpus'),
+            func.coalesce(func.sum(VirtualMachine.memory), 0).label('total_memory'),
+            func.coalesce(func.sum(VirtualMachine.provisioned_mib), 0).label('total_provisioned'),
+            func.coalesce(func.sum(VirtualMachine.in_use_mib), 0).label('total_in_use'),
+            func.coalesce(func.sum(VirtualMachine.unshared_mib), 0).label('total_unshared'),
+            func.count(func.distinct(VirtualMachine.datacenter)).label('datacenters'),
+            func.count(func.distinct(VirtualMachine.cluster)).label('clusters'),
+            func.count(func.distinct(VirtualMachine.host)).label('hosts')
+        ).where(
+            VirtualMachine.folder.isnot(None)
+        ).group_by(folder_key)
+        if sql_level is not None:
+            stmt = stmt.select_from(VirtualMachine).join(keys, keys.c.folder == VirtualMachine.folder)
+        
+        folder_stats = session.execute(stmt).all()
+    
+    # Convert to DataFrame (SUMs are coalesced to 0 in SQL, so no column holds None)
+    df_folders = pd.DataFrame(folder_stats, columns=[
+        'Folder', 'VMs', 'Total_CPUs', 'Total_Memory_MB', 
+        'Total_Provisioned_MiB', 'Total_In_Use_MiB', 'Total_Unshared_MiB',
+        'Datacenters', 'Clusters', 'Hosts'
+    ]).astype(FOLDER_STAT_DTYPES)
+    
+    if level is not None and sql_level is None:
+        # No string-position function to truncate paths in SQL: regroup the
+        # per-folder totals (distinct infrastructure counts become sums)
+        df_folders['Folder'] = _aggregate_folder_paths(df_folders['Folder'], level)
+        df_folders = df_folders.groupby('Folder', as_index=False).sum().astype(FOLDER_STAT_DTYPES)
+    
+    df_folders = _add_derived_columns(df_folders)
+    
+    # Folder is a repeated key for isin/map/sort: store it as category codes
+    df_folders['Folder'] = df_folders['Folder'].astype('category')
+    return df_folders
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _labels_available(db_url: str) -> bool:
+    """Check once whether the label tables exist (cached to skip inspector reflection)."""
+    table_names = inspect(get_engine(db_url)).get_table_names()
+    return Label.__tablename__ in table_names and FolderLabel.__tablename__ in table_names
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_label_keys(db_url: str) -> list:
+    """Fetch the distinct label keys offered in the label filter."""
+    with DatabaseManager.session_scope(db_url) as session:
+        return [k for k in session.scalars(select(Label.key).distinct()) if k]
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_label_values(db_url: str, label_key: str) -> list:
+    """Fetch the distinct values defined for one label key."""
+    with DatabaseManager.session_scope(db_url) as session:
+        return [v for v in session.scalars(
+            select(Label.value).where(Label.key == label_key).distinct()
+        ) if v]
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_folder_label_counts(db_url: str) -> dict:
+    """Count the labels assigned to each folder in one grouped query.
+    
+    Returns:
+        Dict mapping folder path to its number of folder labels (folders
+        without labels are absent)
     """
-    if not folder_path:
-        return "(root)"
+    with DatabaseManager.session_scope(db_url) as session:
+        return dict(session.execute(select(
+            FolderLabel.folder_path,
+            func.count(FolderLabel.label_id)
+        ).join(
+            Label, Label.id == FolderLabel.label_id
+        ).group_by(FolderLabel.folder_path)).all())
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_labeled_folders(db_url: str, label_key: str, label_value: Optional[str] = None) -> set:
+    """Fetch the folder paths carrying a label key (and value) in one JOIN.
     
-    parts = folder_path.split('/')
-    if level >= len(parts):
-        return folder_path
+    Args:
+        db_url: SQLAlchemy database URL
+        label_key: Label key to match
+        label_value: Label value to match (None = any value of the key)
     
-    aggregated = '/'.join(parts[:level])
-    return aggregated if aggregated else "(root)"
+    Returns:
+        Set of folder paths
+    """
+    stmt = select(FolderLabel.folder_path).join(
+        Label, Label.id == FolderLabel.label_id
+    ).where(Label.key == label_key)
+    if label_value is not None:
+        stmt = stmt.where(Label.value == label_value)
+    
+    with DatabaseManager.session_scope(db_url) as session:
+        return set(session.scalars(stmt.distinct()).all())
+
+
+def _top_folders_figure(df_top: pd.DataFrame) -> go.Figure:
+    """Bar chart of the largest folders by VM count."""
+    fig = px.bar(
+        df_top,
+        x='VMs',
+        y='Folder',
+        orientation='h',
+        title=f'Top {len(df_top)} Folders by VM Count',
+        color='VMs',
+        color_continuous_scale='Blues',
+        text='VMs'
+    )
+    fig.update_traces(textposition='outside')
+    fig.update_layout(
+        showlegend=False,
+        yaxis={'categoryorder':'total ascending'},
+        height=500
+    )
+    return fig
+
+
+def _folder_size_figure(df_folders: pd.DataFrame) -> go.Figure:
+    """Histogram of VMs per folder."""
+    fig = px.histogram(
+        df_folders,
+        x='VMs',
+        nbins=20,
+        title='Folder Size Distribution',
+        labels={'VMs': 'Number of VMs', 'count': 'Number of Folders'},
+        color_discrete_sequence=['#1f77b4']
+    )
+    fig.update_layout(
+        showlegend=False,
+        height=500
+    )
+    return fig
+
+
+def _resource_allocation_figure(df_top: pd.DataFrame) -> go.Figure:
+    """Grouped vCPU / memory bars for the top folders."""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        name='vCPUs',
+        x=df_top['Folder'],
+        y=df_top['Total_CPUs'],
+        marker_color='lightblue'
+    ))
+    fig.add_trace(go.Bar(
+        name='Memory (GB)',
+        x=df_top['Folder'],
+        y=df_top['Total_Memory_GB'],
+        marker_color='lightcoral'
+    ))
+    
+    fig.update_layout(
+        title=f'Top {len(df_top)} Folders - Resource Allocation',
+        barmode='group',
+        xaxis_tickangle=-45,
+        height=500
+    )
+    return fig
+
+
+def _resource_profile_figure(df_top: pd.DataFrame) -> go.Figure:
+    """Scatter of average vCPUs vs memory per VM for the top folders."""
+    fig = px.scatter(
+        df_top,
+        x='Avg_CPUs',
+        y='Avg_Memory_GB',
+        size='VMs',
+        hover_data=['Folder', 'VMs'],
+        title=f'Top {len(df_top)} Folders - Avg Resource Profile per VM',
+        color='VMs',
+        color_continuous_scale='Viridis'
+    )
+    fig.update_layout(
+        xaxis_title='Avg vCPUs per VM',
+        yaxis_title='Avg Memory (GB) per VM',
+        height=500
+    )
+    return fig
+
+
+def _provisioned_storage_figure(df_top: pd.DataFrame) -> go.Figure:
+    """Bar chart of provisioned storage for the top folders."""
+    fig = px.bar(
+        df_top,
+        x='Total_Provisioned_GB',
+        y='Folder',
+        orientation='h',
+        title=f'Top {len(df_top)} Folders by Provisioned Storage',
+        color='Total_Provisioned_GB',
+        color_continuous_scale='Oranges',
+        text='Total_Provisioned_GB'
+    )
+    fig.update_traces(texttemplate='%{text:.0f} GB', textposition='outside')
+    fig.update_layout(
+        showlegend=False,
+        yaxis={'categoryorder':'total ascending'},
+        height=500
+    )
+    return fig
+
+
+def _storage_utilization_figure(df_top: pd.DataFrame) -> go.Figure:
+    """Grouped provisioned / in-use storage bars for the top folders."""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        name='Provisioned',
+        x=df_top['Folder'],
+        y=df_top['Total_Provisioned_GB'],
+        marker_color='lightsalmon'
+    ))
+    fig.add_trace(go.Bar(
+        name='In Use',
+        x=df_top['Folder'],
+        y=df_top['Total_In_Use_GB'],
+        marker_color='lightseagreen'
+    ))
+    
+    fig.update_layout(
+        title=f'Top {len(df_top)} Folders - Storage Utilization',
+        barmode='group',
+        xaxis_tickangle=-45,
+        height=500,
+        yaxis_title='Storage (GB)'
+    )
+    return fig
+
+
+def _storage_efficiency_figure(df_top: pd.DataFrame) -> go.Figure:
+    """Scatter of storage efficiency against provisioned storage."""
+    fig = px.scatter(
+        df_top,
+        x='Total_Provisioned_GB',
+        y='Storage_Efficiency_%',
+        size='VMs',
+        hover_data=['Folder', 'Total_In_Use_GB'],
+        title='Storage Efficiency by Folder',
+        color='VMs',
+        color_continuous_scale='Viridis',
+        labels={'Storage_Efficiency_%': 'Efficiency (%)', 'Total_Provisioned_GB': 'Provisioned Storage (GB)'}
+    )
+    fig.add_hline(y=100, line_dash="dash", line_color="red", annotation_text="100% Efficiency")
+    fig.update_layout(height=450)
+    return fig
+
+
+def _avg_storage_figure(df_top: pd.DataFrame) -> go.Figure:
+    """Bar chart of average provisioned storage per VM for the top folders."""
+    fig = px.bar(
+        df_top,
+        x='Avg_Provisioned_GB',
+        y='Folder',
+        orientation='h',
+        title=f'Top {len(df_top)} Folders - Avg Provisioned Storage per VM',
+        color='Avg_Provisioned_GB',
+        color_continuous_scale='Purples',
+        text='Avg_Provisioned_GB'
+    )
+    fig.update_traces(texttemplate='%{text:.1f} GB', textposition='outside')
+    fig.update_layout(
+        showlegend=False,
+        yaxis={'categoryorder':'total ascending'},
+        height=450
+    )
+    return fig
+
+
+def _folder_treemap_figure(df_top: pd.DataFrame) -> go.Figure:
+    """Treemap of VMs per folder (one flat level, so no px regrouping)."""
+    vms = df_top['VMs'].to_numpy()
+    fig = go.Figure(go.Treemap(
+        labels=df_top['Folder'].to_numpy(),
+        parents=np.full(len(df_top), ''),
+        values=vms,
+        marker=dict(colors=vms, colorscale='Blues', showscale=True),
+        customdata=df_top[['Total_CPUs', 'Total_Memory_GB']].to_numpy(),
+        hovertemplate='%{label}<br>VMs=%{value}<br>CPUs=%{customdata[0]}<br>Memory=%{customdata[1]} GB<extra></extra>'
+    ))
+    fig.update_layout(title=f'Top {len(df_top)} Folders - VM Distribution (Treemap)', height=600)
+    return fig
+
+
+def _folder_sunburst_figure(df_top: pd.DataFrame) -> go.Figure:
+    """Sunburst of VMs per folder, colored by vCPUs."""
+    fig = go.Figure(go.Sunburst(
+        labels=df_top['Folder'].to_numpy(),
+        parents=np.full(len(df_top), ''),
+        values=df_top['VMs'].to_numpy(),
+        marker=dict(colors=df_top['Total_CPUs'].to_numpy(), colorscale='Oranges', showscale=True),
+        hovertemplate='%{label}<br>VMs=%{value}<br>CPUs=%{color}<extra></extra>'
+    ))
+    fig.update_layout(title=f'Top {len(df_top)} Folders - VM Distribution (Sunburst)', height=600)
+    return fig
 
 
 def render(db_url: str):
@@ -54,10 +476,9 @@ def render(db_url: str):
         color_name="blue-70"
     )
     
+    # Pooled engine and session factory are cached across reruns
+    session = DatabaseManager.get_session(db_url)
     try:
-        engine = create_engine(db_url, echo=False)
-        SessionLocal = sessionmaker(bind=engine)
-        session = SessionLocal()
         label_service = LabelService(session)
         
         # Check if data exists
@@ -67,47 +488,6 @@ def render(db_url: str):
             st.warning("⚠️ No data found in database. Please load data first.")
             return
         
-        # Get folder statistics
-        folder_stats = session.query(
-            VirtualMachine.folder,
-            func.count(VirtualMachine.id).label('vm_count'),
-            func.sum(VirtualMachine.cpus).label('total_cpus'),
-            func.sum(VirtualMachine.memory).label('total_memory'),
-            func.sum(VirtualMachine.provisioned_mib).label('total_provisioned'),
-            func.sum(VirtualMachine.in_use_mib).label('total_in_use'),
-            func.sum(VirtualMachine.unshared_mib).label('total_unshared'),
-            func.count(func.distinct(VirtualMachine.datacenter)).label('datacenters'),
-            func.count(func.distinct(VirtualMachine.cluster)).label('clusters'),
-            func.count(func.distinct(VirtualMachine.host)).label('hosts')
-        ).filter(
-            VirtualMachine.folder.isnot(None)
-        ).group_by(VirtualMachine.folder).all()
-        
-        if not folder_stats:
-            st.warning("No folder information found in the inventory.")
-            return
-        
-        # Convert to DataFrame
-        df_folders = pd.DataFrame(folder_stats, columns=[
-            'Folder', 'VMs', 'Total_CPUs', 'Total_Memory_MB', 
-            'Total_Provisioned_MiB', 'Total_In_Use_MiB', 'Total_Unshared_MiB',
-            'Datacenters', 'Clusters', 'Hosts'
-        ])
-        df_folders['Total_Memory_GB'] = (df_folders['Total_Memory_MB'] / 1024).round(1)
-        df_folders['Total_Provisioned_GB'] = (df_folders['Total_Provisioned_MiB'] / 1024).round(1)
-        df_folders['Total_In_Use_GB'] = (df_folders['Total_In_Use_MiB'] / 1024).round(1)
-        df_folders['Total_Unshared_GB'] = (df_folders['Total_Unshared_MiB'] / 1024).round(1)
-        df_folders['Avg_CPUs'] = (df_folders['Total_CPUs'] / df_folders['VMs']).round(1)
-        df_folders['Avg_Memory_GB'] = (df_folders['Total_Memory_GB'] / df_folders['VMs']).round(1)
-        df_folders['Avg_Provisioned_GB'] = (df_folders['Total_Provisioned_GB'] / df_folders['VMs']).round(1)
-        df_folders['Avg_In_Use_GB'] = (df_folders['Total_In_Use_GB'] / df_folders['VMs']).round(1)
-        
-        # Fill NaN values
-        df_folders = df_folders.fillna(0)
-        
-        # Sort by VM count
-        df_folders = df_folders.sort_values('VMs', ascending=False)
-        
         # Aggregation options (must be before summary metrics)
         add_vertical_space(1)
         colored_header(
@@ -130,66 +510,41 @@ def render(db_url: str):
         with col3:
             sort_by = st.selectbox("Sort by", ["VMs", "Total_CPUs", "Total_Memory_GB", "Total_Provisioned_GB", "Total_In_Use_GB", "Folder"])
         
-        # Label filters
-        col_label1, col_label2 = st.columns(2)
-        with col_label1:
-            from src.models import Label
-            label_keys = [k[0] for k in session.query(Label.key).distinct().all() if k[0]]
-            selected_label_key = st.selectbox("Filter by Label Key", ["All"] + label_keys, help="Filter folders by label key")
-        
-        with col_label2:
-            selected_label_value = None
-            if selected_label_key != "All":
-                label_values = [v[0] for v in session.query(Label.value).filter(
-                    Label.key == selected_label_key
-                ).distinct().all() if v[0]]
-                selected_label_value = st.selectbox("Filter by Label Value", ["All"] + label_values)
-        
-        # Apply folder aggregation
-        if aggregate_level != "Full Path":
-            level = int(aggregate_level.split()[1])  # Extract level number
-            df_folders['Aggregated_Folder'] = df_folders['Folder'].apply(
-                lambda x: _aggregate_folder_path(x, level)
-            )
-            
-            # Re-aggregate by new folder paths
-            df_folders = df_folders.groupby('Aggregated_Folder').agg({
-                'VMs': 'sum',
-                'Total_CPUs': 'sum',
-                'Total_Memory_MB': 'sum',
-                'Total_Memory_GB': 'sum',
-                'Total_Provisioned_MiB': 'sum',
-                'Total_In_Use_MiB': 'sum',
-                'Total_Unshared_MiB': 'sum',
-                'Total_Provisioned_GB': 'sum',
-                'Total_In_Use_GB': 'sum',
-                'Total_Unshared_GB': 'sum',
-                'Datacenters': 'sum',  # This will over-count but gives an idea
-                'Clusters': 'sum',
-                'Hosts': 'sum'
-            }).reset_index()
-            df_folders.rename(columns={'Aggregated_Folder': 'Folder'}, inplace=True)
-            
-            # Recalculate averages
-            df_folders['Avg_CPUs'] = (df_folders['Total_CPUs'] / df_folders['VMs']).round(1)
-            df_folders['Avg_Memory_GB'] = (df_folders['Total_Memory_GB'] / df_folders['VMs']).round(1)
-            df_folders['Avg_Provisioned_GB'] = (df_folders['Total_Provisioned_GB'] / df_folders['VMs']).round(1)
-            df_folders['Avg_In_Use_GB'] = (df_folders['Total_In_Use_GB'] / df_folders['VMs']).round(1)
-            df_folders = df_folders.sort_values('VMs', ascending=False)
+        # Label filters (skipped entirely when the label tables are absent)
+        labels_available = _labels_available(db_url)
+        selected_label_key = "All"
+        selected_label_value = None
+        if labels_available:
+            col_label1, col_label2 = st.columns(2)
+            with col_label1:
+                label_keys = _load_label_keys(db_url)
+                selected_label_key = st.selectbox("Filter by Label Key", ["All"] + label_keys, help="Filter folders by label key")
             
+            with col_label2:
+                if selected_label_key != "All":
+                    label_values = _load_label_values(db_url, selected_label_key)
+                    selected_label_value = st.selectbox("Filter by Label Value", ["All"] + label_values)
+        
+        # Get folder statistics, grouped by the (possibly truncated) folder path
+        level = None if aggregate_level == "Full Path" else int(aggregate_level.split()[1])
+        df_folders = _load_folder_stats(db_url, level)
+        
+        if df_folders.empty:
+            st.warning("No folder information found in the inventory.")
+            return
+        
+        # Every VM with a folder lands in exactly one group at any level
+        foldered_vms = int(df_folders['VMs'].sum())
+        
+        if aggregate_level != "Full Path":
             st.info(f"📂 Viewing folders aggregated at **{aggregate_level}** (folders grouped by first {aggregate_level.split()[1]} level(s))")
         
         # Add label coverage info to dataframe (before summary metrics)
-        folder_label_counts = {}
-        for folder in df_folders['Folder']:
-            try:
-                labels = label_service.get_folder_labels(folder)
-                folder_label_counts[folder] = len(labels)
-            except:
-                folder_label_counts[folder] = 0
+        folder_label_counts = _load_folder_label_counts(db_url) if labels_available else {}
         
-        df_folders['Label_Count'] = df_folders['Folder'].map(folder_label_counts)
-        df_folders['Label_Count'] = df_folders['Label_Count'].fillna(0).astype(int)
+        # Look counts up once per category and broadcast through the codes
+        category_label_counts = df_folders['Folder'].cat.categories.map(folder_label_counts).fillna(0)
+        df_folders['Label_Count'] = category_label_counts.to_numpy('int32')[df_folders['Folder'].cat.codes]
         
         add_vertical_space(2)
         
@@ -214,9 +569,7 @@ def render(db_url: str):
             label_coverage_pct = (folders_with_labels / len(df_folders) * 100) if len(df_folders) > 0 else 0
             st.metric("🏷️ Labeled Folders", folders_with_labels, delta=f"{label_coverage_pct:.0f}%")
         with col5:
-            folders_with_null = session.query(func.count(VirtualMachine.id)).filter(
-                VirtualMachine.folder.is_(None)
-            ).scalar() or 0
+            folders_with_null = max(total_vms - foldered_vms, 0)
             st.metric("VMs w/o Folder", folders_with_null)
         
         # Style metric cards
@@ -231,33 +584,9 @@ def render(db_url: str):
         
         # Apply label filter if selected
         if selected_label_key != "All":
-            from src.models import FolderLabel
-            
-            # Get folders with the selected label
-            if selected_label_value and selected_label_value != "All":
-                # Specific key=value
-                label = session.query(Label).filter(
-                    Label.key == selected_label_key,
-                    Label.value == selected_label_value
-                ).first()
-                if label:
-                    labeled_folders = session.query(FolderLabel.folder_path).filter(
-                        FolderLabel.label_id == label.id
-                    ).all()
-                    labeled_folders = [f[0] for f in labeled_folders]
-            else:
-                # Any value for this key
-                label_ids = session.query(Label.id).filter(
-                    Label.key == selected_label_key
-                ).all()
-                label_ids = [lid[0] for lid in label_ids]
-                if label_ids:
-                    labeled_folders = session.query(FolderLabel.folder_path).filter(
-                        FolderLabel.label_id.in_(label_ids)
-                    ).distinct().all()
-                    labeled_folders = [f[0] for f in labeled_folders]
-                else:
-                    labeled_folders = []
+            # Get folders with the selected label (any value when "All")
+            label_value = selected_label_value if selected_label_value != "All" else None
+            labeled_folders = _load_labeled_folders(db_url, selected_label_key, label_value)
             
             # Filter dataframe to only labeled folders
             df_folders = df_folders[df_folders['Folder'].isin(labeled_folders)]
@@ -268,26 +597,14 @@ def render(db_url: str):
             else:
                 st.warning(f"No folders found with label: {selected_label_key}" + 
                           (f"={selected_label_value}" if selected_label_value and selected_label_value != "All" else ""))
-            
-            # Recalculate label counts for filtered folders
-            folder_label_counts = {}
-            for folder in df_folders['Folder']:
-                try:
-                    labels = label_service.get_folder_labels(folder)
-                    folder_label_counts[folder] = len(labels)
-                except:
-                    folder_label_counts[folder] = 0
-            
-            df_folders['Label_Count'] = df_folders['Folder'].map(folder_label_counts)
-            df_folders['Label_Count'] = df_folders['Label_Count'].fillna(0).astype(int)
         
         # Apply filters
-        df_filtered = df_folders[df_folders['VMs'] >= min_vms]
-        if sort_by != "VMs":
-            df_filtered = df_filtered.sort_values(sort_by, ascending=False)
+        # Sorted exactly once: the table needs the full order, and the chart
+        # slices below are its leading rows
+        df_filtered = df_folders[df_folders['VMs'] >= min_vms].sort_values(sort_by, ascending=False)
         
         # Export button
-        csv_data = df_filtered.to_csv(index=False).encode('utf-8')
+        csv_data = encode_csv(df_filtered)
         st.download_button(
             label="⬇️ Export Folder Analysis CSV",
             data=csv_data,
@@ -302,31 +619,11 @@ def render(db_url: str):
             color_name="violet-70"
         )
         
-        # Select columns to display
-        display_df = df_filtered[[
-            'Folder', 'Label_Count', 'VMs', 'Total_CPUs', 'Total_Memory_GB', 
-            'Total_Provisioned_GB', 'Total_In_Use_GB', 'Total_Unshared_GB',
-            'Avg_CPUs', 'Avg_Memory_GB', 'Avg_Provisioned_GB', 'Avg_In_Use_GB',
-            'Datacenters', 'Clusters', 'Hosts'
-        ]].copy()
+        # Select columns to display (a projection; Styler does not mutate it)
+        display_df = df_filtered[list(FOLDER_TABLE_FORMAT)]
         
         st.dataframe(
-            display_df.style.format({
-                'Label_Count': '{:,.0f}',
-                'VMs': '{:,.0f}',
-                'Total_CPUs': '{:,.0f}',
-                'Total_Memory_GB': '{:,.1f}',
-                'Total_Provisioned_GB': '{:,.1f}',
-                'Total_In_Use_GB': '{:,.1f}',
-                'Total_Unshared_GB': '{:,.1f}',
-                'Avg_CPUs': '{:.1f}',
-                'Avg_Memory_GB': '{:.1f}',
-                'Avg_Provisioned_GB': '{:.1f}',
-                'Avg_In_Use_GB': '{:.1f}',
-                'Datacenters': '{:.0f}',
-                'Clusters': '{:.0f}',
-                'Hosts': '{:.0f}'
-            }),
+            display_df.style.format(FOLDER_TABLE_FORMAT),
             width="stretch",
             hide_index=True
         )
@@ -340,6 +637,34 @@ def render(db_url: str):
             color_name="blue-70"
         )
         
+        # Chart slices shared by all tabs
+        provisioned = df_filtered['Total_Provisioned_GB'].to_numpy()
+        in_use = df_filtered['Total_In_Use_GB'].to_numpy()
+        df_filtered = df_filtered.assign(**{'Storage_Efficiency_%': np.round(
+            np.divide(in_use * 100, provisioned, out=np.zeros_like(provisioned), where=provisioned > 0), 1
+        )})
+        df_top_20 = df_filtered.head(20)
+        df_top_15 = df_top_20.head(15)
+        df_top_10 = df_top_20.head(10)
+        
+        # Build every chart concurrently; the theme reads session state, so it
+        # is applied on the script thread
+        chart_builders = {
+            'top_folders': (_top_folders_figure, df_top_15),
+            'folder_size': (_folder_size_figure, df_filtered),
+            'resource_allocation': (_resource_allocation_figure, df_top_10),
+            'resource_profile': (_resource_profile_figure, df_top_10),
+            'provisioned_storage': (_provisioned_storage_figure, df_top_15),
+            'storage_utilization': (_storage_utilization_figure, df_top_15),
+            'storage_efficiency': (_storage_efficiency_figure, df_top_20),
+            'avg_storage': (_avg_storage_figure, df_top_15),
+            'treemap': (_folder_treemap_figure, df_top_20),
+            'sunburst': (_folder_sunburst_figure, df_top_15),
+        }
+        with ThreadPoolExecutor(max_workers=MAX_FIGURE_WORKERS) as executor:
+            futures = {name: executor.submit(build, df) for name, (build, df) in chart_builders.items()}
+        figures = {name: ThemeManager.apply_chart_theme(future.result()) for name, future in futures.items()}
+        
         viz_tab1, viz_tab2, viz_tab3, viz_tab4 = st.tabs(["📊 Distribution", "🎯 Resources", "💾 Storage", "🗂️ Hierarchy"])
         
         with viz_tab1:
@@ -347,100 +672,22 @@ def render(db_url: str):
             
             with col1:
                 # Top folders by VM count
-                top_n = min(15, len(df_filtered))
-                df_top = df_filtered.head(top_n)
-                
-                fig = px.bar(
-                    df_top,
-                    x='VMs',
-                    y='Folder',
-                    orientation='h',
-                    title=f'Top {top_n} Folders by VM Count',
-                    color='VMs',
-                    color_continuous_scale='Blues',
-                    text='VMs'
-                )
-                fig.update_traces(textposition='outside')
-                fig.update_layout(
-                    showlegend=False,
-                    yaxis={'categoryorder':'total ascending'},
-                    height=500
-                )
-                fig = ThemeManager.apply_chart_theme(fig)
-
-                st.plotly_chart(fig, width='stretch')
+                st.plotly_chart(figures['top_folders'], width='stretch')
             
             with col2:
                 # Folder size distribution
-                fig = px.histogram(
-                    df_filtered,
-                    x='VMs',
-                    nbins=20,
-                    title='Folder Size Distribution',
-                    labels={'VMs': 'Number of VMs', 'count': 'Number of Folders'},
-                    color_discrete_sequence=['#1f77b4']
-                )
-                fig.update_layout(
-                    showlegend=False,
-                    height=500
-                )
-                fig = ThemeManager.apply_chart_theme(fig)
-
-                st.plotly_chart(fig, width='stretch')
+                st.plotly_chart(figures['folder_size'], width='stretch')
         
         with viz_tab2:
             col1, col2 = st.columns(2)
             
             with col1:
                 # Resource allocation by folder
-                df_top = df_filtered.head(10)
-                
-                fig = go.Figure()
-                fig.add_trace(go.Bar(
-                    name='vCPUs',
-                    x=df_top['Folder'],
-                    y=df_top['Total_CPUs'],
-                    marker_color='lightblue'
-                ))
-                fig.add_trace(go.Bar(
-                    name='Memory (GB)',
-                    x=df_top['Folder'],
-                    y=df_top['Total_Memory_GB'],
-                    marker_color='lightcoral'
-                ))
-                
-                fig.update_layout(
-                    title='Top 10 Folders - Resource Allocation',
-                    barmode='group',
-                    xaxis_tickangle=-45,
-                    height=500
-                )
-                fig = ThemeManager.apply_chart_theme(fig)
-
-                st.plotly_chart(fig, width='stretch')
+                st.plotly_chart(figures['resource_allocation'], width='stretch')
             
             with col2:
                 # Average resources per VM by folder
-                df_top = df_filtered.head(10)
-                
-                fig = px.scatter(
-                    df_top,
-                    x='Avg_CPUs',
-                    y='Avg_Memory_GB',
-                    size='VMs',
-                    hover_data=['Folder', 'VMs'],
-                    title='Top 10 Folders - Avg Resource Profile per VM',
-                    color='VMs',
-                    color_continuous_scale='Viridis'
-                )
-                fig.update_layout(
-                    xaxis_title='Avg vCPUs per VM',
-                    yaxis_title='Avg Memory (GB) per VM',
-                    height=500
-                )
-                fig = ThemeManager.apply_chart_theme(fig)
-
-                st.plotly_chart(fig, width='stretch')
+                st.plotly_chart(figures['resource_profile'], width='stretch')
         
         with viz_tab3:
             st.subheader("Storage Consumption by Folder")
@@ -449,56 +696,11 @@ def render(db_url: str):
             
             with col1:
                 # Top folders by provisioned storage
-                df_top = df_filtered.head(15)
-                
-                fig = px.bar(
-                    df_top,
-                    x='Total_Provisioned_GB',
-                    y='Folder',
-                    orientation='h',
-                    title='Top 15 Folders by Provisioned Storage',
-                    color='Total_Provisioned_GB',
-                    color_continuous_scale='Oranges',
-                    text='Total_Provisioned_GB'
-                )
-                fig.update_traces(texttemplate='%{text:.0f} GB', textposition='outside')
-                fig.update_layout(
-                    showlegend=False,
-                    yaxis={'categoryorder':'total ascending'},
-                    height=500
-                )
-                fig = ThemeManager.apply_chart_theme(fig)
-
-                st.plotly_chart(fig, width='stretch')
+                st.plotly_chart(figures['provisioned_storage'], width='stretch')
             
             with col2:
                 # Storage utilization (In Use vs Provisioned)
-                df_top = df_filtered.head(15)
-                
-                fig = go.Figure()
-                fig.add_trace(go.Bar(
-                    name='Provisioned',
-                    x=df_top['Folder'],
-                    y=df_top['Total_Provisioned_GB'],
-                    marker_color='lightsalmon'
-                ))
-                fig.add_trace(go.Bar(
-                    name='In Use',
-                    x=df_top['Folder'],
-                    y=df_top['Total_In_Use_GB'],
-                    marker_color='lightseagreen'
-                ))
-                
-                fig.update_layout(
-                    title='Top 15 Folders - Storage Utilization',
-                    barmode='group',
-                    xaxis_tickangle=-45,
-                    height=500,
-                    yaxis_title='Storage (GB)'
-                )
-                fig = ThemeManager.apply_chart_theme(fig)
-
-                st.plotly_chart(fig, width='stretch')
+                st.plotly_chart(figures['storage_utilization'], width='stretch')
             
             # Storage efficiency metrics
             st.divider()
@@ -506,79 +708,18 @@ def render(db_url: str):
             
             with col1:
                 # Storage efficiency scatter
-                df_top = df_filtered.head(20).copy()
-                df_top['Storage_Efficiency_%'] = (df_top['Total_In_Use_GB'] / df_top['Total_Provisioned_GB'] * 100).round(1)
-                
-                fig = px.scatter(
-                    df_top,
-                    x='Total_Provisioned_GB',
-                    y='Storage_Efficiency_%',
-                    size='VMs',
-                    hover_data=['Folder', 'Total_In_Use_GB'],
-                    title='Storage Efficiency by Folder',
-                    color='VMs',
-                    color_continuous_scale='Viridis',
-                    labels={'Storage_Efficiency_%': 'Efficiency (%)', 'Total_Provisioned_GB': 'Provisioned Storage (GB)'}
-                )
-                fig.add_hline(y=100, line_dash="dash", line_color="red", annotation_text="100% Efficiency")
-                fig.update_layout(height=450)
-                fig = ThemeManager.apply_chart_theme(fig)
-
-                st.plotly_chart(fig, width='stretch')
+                st.plotly_chart(figures['storage_efficiency'], width='stretch')
             
             with col2:
                 # Avg storage per VM
-                df_top = df_filtered.head(15)
-                
-                fig = px.bar(
-                    df_top,
-                    x='Avg_Provisioned_GB',
-                    y='Folder',
-                    orientation='h',
-                    title='Top 15 Folders - Avg Provisioned Storage per VM',
-                    color='Avg_Provisioned_GB',
-                    color_continuous_scale='Purples',
-                    text='Avg_Provisioned_GB'
-                )
-                fig.update_traces(texttemplate='%{text:.1f} GB', textposition='outside')
-                fig.update_layout(
-                    showlegend=False,
-                    yaxis={'categoryorder':'total ascending'},
-                    height=450
-                )
-                fig = ThemeManager.apply_chart_theme(fig)
-
-                st.plotly_chart(fig, width='stretch')
+                st.plotly_chart(figures['avg_storage'], width='stretch')
         
         with viz_tab4:
             # Treemap of folder hierarchy
-            fig = px.treemap(
-                df_filtered.head(20),
-                path=['Folder'],
-                values='VMs',
-                title='Top 20 Folders - VM Distribution (Treemap)',
-                color='VMs',
-                color_continuous_scale='Blues',
-                hover_data=['Total_CPUs', 'Total_Memory_GB']
-            )
-            fig.update_layout(height=600)
-            fig = ThemeManager.apply_chart_theme(fig)
-
-            st.plotly_chart(fig, width='stretch')
+            st.plotly_chart(figures['treemap'], width='stretch')
             
             # Sunburst alternative view
-            fig = px.sunburst(
-                df_filtered.head(15),
-                path=['Folder'],
-                values='VMs',
-                title='Top 15 Folders - VM Distribution (Sunburst)',
-                color='Total_CPUs',
-                color_continuous_scale='Oranges'
-            )
-            fig.update_layout(height=600)
-            fig = ThemeManager.apply_chart_theme(fig)
-
-            st.plotly_chart(fig, width='stretch')
+            st.plotly_chart(figures['sunburst'], width='stretch')
         
         add_vertical_space(2)
         
@@ -595,38 +736,39 @@ def render(db_url: str):
         )
         
         if selected_folder:
-            # Show folder labels if any
-            try:
+            # Show folder labels if any (the bulk counts already say whether there are some)
+            if folder_label_counts.get(selected_folder):
                 folder_labels = label_service.get_folder_labels(selected_folder)
-                if folder_labels:
-                    st.write("**🏷️ Folder Labels:**")
-                    label_badges = []
-                    for lbl in folder_labels:
-                        color = lbl.get('color', '#607078') or '#607078'
-                        badge = f'<span style="background-color: {color}; color: white; padding: 4px 8px; border-radius: 4px; margin: 2px; display: inline-block; font-size: 12px;">{lbl["key"]}={lbl["value"]}</span>'
-                        label_badges.append(badge)
-                    st.markdown(' '.join(label_badges), unsafe_allow_html=True)
-                    add_vertical_space(1)
-            except Exception:
-                pass  # Labels feature may not be available
+                st.write("**🏷️ Folder Labels:**")
+                label_badges = []
+                for lbl in folder_labels:
+                    color = lbl.get('color', '#607078') or '#607078'
+                    badge = f'<span style="background-color: {color}; color: white; padding: 4px 8px; border-radius: 4px; margin: 2px; display: inline-block; font-size: 12px;">{lbl["key"]}={lbl["value"]}</span>'
+                    label_badges.append(badge)
+                st.markdown(' '.join(label_badges), unsafe_allow_html=True)
+                add_vertical_space(1)
             
-            # Get VMs in this folder
-            folder_vms = session.query(VirtualMachine).filter(
-                VirtualMachine.folder == selected_folder
-            ).all()
+            # Aggregate the folder's VMs in SQL; rows are only fetched for the expander
+            folder_filter = VirtualMachine.folder == selected_folder
+            vm_count, powered_on, total_cpus, total_mem, total_prov, total_used = session.query(
+                func.count(VirtualMachine.id),
+                func.sum(case((VirtualMachine.powerstate == "poweredOn", 1), else_=0)),
+                func.sum(VirtualMachine.cpus),
+                func.sum(VirtualMachine.memory),
+                func.sum(VirtualMachine.provisioned_mib),
+                func.sum(VirtualMachine.in_use_mib)
+            ).filter(folder_filter).one()
             
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                st.metric("Total VMs", len(folder_vms))
+                st.metric("Total VMs", vm_count)
             with col2:
-                powered_on = sum(1 for vm in folder_vms if vm.powerstate == "poweredOn")
-                st.metric("Powered On", powered_on)
+                st.metric("Powered On", int(powered_on or 0))
             with col3:
-                total_cpus = sum(vm.cpus or 0 for vm in folder_vms)
-                st.metric("Total vCPUs", int(total_cpus))
+                st.metric("Total vCPUs", int(total_cpus or 0))
             with col4:
-                total_mem = sum(vm.memory or 0 for vm in folder_vms) / 1024
+                total_mem = (total_mem or 0) / 1024
                 st.metric("Total Memory", f"{total_mem:.0f} GB")
             
             # Style metrics
@@ -642,34 +784,34 @@ def render(db_url: str):
             # Storage metrics
             col1, col2, col3 = st.columns(3)
             with col1:
-                total_prov = sum(vm.provisioned_mib or 0 for vm in folder_vms) / 1024
+                total_prov = (total_prov or 0) / 1024
                 st.metric("Provisioned Storage", f"{total_prov:.0f} GB")
             with col2:
-                total_used = sum(vm.in_use_mib or 0 for vm in folder_vms) / 1024
+                total_used = (total_used or 0) / 1024
                 st.metric("In Use Storage", f"{total_used:.0f} GB")
             with col3:
                 efficiency = (total_used / total_prov * 100) if total_prov > 0 else 0
                 st.metric("Storage Efficiency", f"{efficiency:.1f}%")
             
             # VMs in folder
-            with st.expander(f"View VMs in '{selected_folder}' ({len(folder_vms)} VMs)"):
-                vm_data = []
-                for vm in folder_vms:
-                    vm_data.append({
-                        'VM': vm.vm,
-                        'Power': vm.powerstate or 'N/A',
-                        'CPUs': vm.cpus or 0,
-                        'Memory (GB)': (vm.memory or 0) / 1024,
-                        'Datacenter': vm.datacenter or 'N/A',
-                        'Cluster': vm.cluster or 'N/A',
-                        'Host': vm.host or 'N/A'
-                    })
-                
-                df_vms = pd.DataFrame(vm_data)
+            with st.expander(f"View VMs in '{selected_folder}' ({vm_count} VMs)"):
+                vms_stmt = select(
+                    VirtualMachine.vm.label('VM'),
+                    func.coalesce(VirtualMachine.powerstate, 'N/A').label('Power'),
+                    func.coalesce(VirtualMachine.cpus, 0).label('CPUs'),
+                    (func.coalesce(VirtualMachine.memory, 0) / 1024.0).label('Memory (GB)'),
+                    func.coalesce(VirtualMachine.datacenter, 'N/A').label('Datacenter'),
+                    func.coalesce(VirtualMachine.cluster, 'N/A').label('Cluster'),
+                    func.coalesce(VirtualMachine.host, 'N/A').label('Host')
+                ).where(folder_filter)
+                df_vms = pd.read_sql_query(
+                    vms_stmt, session.connection(),
+                    dtype={'CPUs': 'int32', 'Memory (GB)': 'float32'}
+                )
                 st.dataframe(df_vms, width="stretch", hide_index=True)
                 
                 # Export VMs in folder
-                csv_vms = df_vms.to_csv(index=False).encode('utf-8')
+                csv_vms = encode_csv(df_vms)
                 st.download_button(
                     label=f"⬇️ Export VMs in '{selected_folder}'",
                     data=csv_vms,
@@ -1,13 +1,24 @@
 """Folder Labelling page - Manage VM and folder labels."""
 
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import func
 from streamlit_extras.colored_header import colored_header
 from streamlit_extras.add_vertical_space import add_vertical_space
+from src.services.backup_service import BackupService
 from src.services.label_service import LabelService
-from src.models import VirtualMachine
+from src.models import FolderLabel, VirtualMachine, VMLabel
+from src.dashboard.utils.cache import encode_csv, get_clusters, get_datacenters
+from src.dashboard.utils.database import DatabaseManager
+from src.dashboard.utils.pagination import PaginationHelper
+
+
+CONFIRM_TTL_SECONDS = 30  # A "click again to confirm" expires after this long
 
 
 def _render_label_badge(key: str, value: str, color: str = None):
@@ -16,6 +27,225 @@ def _render_label_badge(key: str, value: str, color: str = None):
     return f'<span style="background-color: {bg_color}; color: white; padding: 4px 8px; border-radius: 4px; margin: 2px; display: inline-block; font-size: 12px;">{key}={value}</span>'
 
 
+def _render_label_badges(labels: list) -> str:
+    """Render a group of label dicts as one HTML snippet, for a single st.markdown call."""
+    return "".join(_render_label_badge(lbl['key'], lbl['value'], lbl['color']) for lbl in labels)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_labels(db_url: str) -> list:
+    """Fetch all label definitions as plain dicts, ordered by key and value."""
+    with DatabaseManager.session_scope(db_url) as session:
+        return [
+            {
+                'id': label.id,
+                'key': label.key,
+                'value': label.value,
+                'description': label.description,
+                'color': label.color,
+                'created_at': label.created_at,
+            }
+            for label in LabelService(session).list_labels()
+        ]
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_label_keys(db_url: str) -> list:
+    """Fetch the distinct label keys offered in the key selectors."""
+    with DatabaseManager.session_scope(db_url) as session:
+        return LabelService(session).get_label_keys()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_label_values(db_url: str, key: str) -> list:
+    """Fetch the values defined for one label key."""
+    with DatabaseManager.session_scope(db_url) as session:
+        return LabelService(session).get_label_values(key)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_folders(db_url: str) -> list:
+    """Fetch the distinct folder paths of the inventory."""
+    with DatabaseManager.session_scope(db_url) as session:
+        return LabelService(session).get_all_folders()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _load_assignment_counts(db_url: str) -> dict:
+    """Count VM and folder label assignments (COUNT over the assignment tables only)."""
+    with DatabaseManager.session_scope(db_url) as session:
+        return {
+            'vm': session.query(func.count(VMLabel.id)).scalar() or 0,
+            'folder': session.query(func.count(FolderLabel.id)).scalar() or 0
+        }
+
+
+def _clear_label_caches():
+    """Invalidate the cached label definitions after they are created or deleted.
+    
+    Also resets the label table's row selection, whose positional index would
+    otherwise point at a different label in the changed list.
+    """
+    _load_labels.clear()
+    _load_label_keys.clear()
+    _load_label_values.clear()
+    st.session_state["labels_table_version"] = st.session_state.get("labels_table_version", 0) + 1
+
+
+def _confirmed(kind: str, key) -> bool:
+    """Two-click confirmation backed by one TTL-pruned session_state dict.
+    
+    Returns True (and consumes the confirmation) when the same action was armed
+    within CONFIRM_TTL_SECONDS; otherwise arms it and returns False.
+    """
+    now = time.time()
+    confirms = {k: expiry for k, expiry in st.session_state.get("confirms", {}).items() if expiry > now}
+    confirmed = confirms.pop((kind, key), None) is not None
+    if not confirmed:
+        confirms[(kind, key)] = now + CONFIRM_TTL_SECONDS
+    st.session_state["confirms"] = confirms
+    return confirmed
+
+
+def _parse_backup_upload(uploaded_file) -> dict:
+    """Parse an uploaded backup once per upload, reusing the result across reruns."""
+    cached = st.session_state.get("restore_upload")
+    if cached and cached[0] == uploaded_file.file_id:
+        return cached[1]
+    uploaded_file.seek(0)
+    content = json.loads(uploaded_file.read())
+    st.session_state["restore_upload"] = (uploaded_file.file_id, content)
+    return content
+
+
+@st.fragment
+def _render_vm_search(db_url: str):
+    """Search VMs and manage their direct labels.
+    
+    Runs as a fragment: searching, assigning and removing labels rerun only
+    this block, not the rest of the page.
+    """
+    session = DatabaseManager.get_session(db_url)
+    label_service = LabelService(session)
+    
+    try:
+        # Search for VM; the form only queries on submit, not while typing
+        with st.form("vm_search_form"):
+            vm_search = st.text_input("🔍 Search VM by name", placeholder="Enter VM name...", key="vm_search")
+            st.form_submit_button("Search")
+        
+        if vm_search and len(vm_search) >= 2:
+            try:
+                vms = label_service.search_vms(vm_search, limit=20)
+            except Exception as e:
+                # Rollback session if there was a previous error
+                session.rollback()
+                st.error(f"Database error: {str(e)}")
+                vms = []
+            
+            if vms:
+                st.write(f"Found {len(vms)} VM(s):")
+                
+                # Labels of all found VMs in one query
+                labels_by_vm = label_service.get_vm_labels_bulk([vm.id for vm in vms])
+                
+                for vm in vms:
+                    with st.expander(f"🖥️ {vm.vm}"):
+                        # Show VM info
+                        col1, col2 = st.columns(2)
+                        
+                        with col1:
+                            st.write(f"**Datacenter:** {vm.datacenter or 'N/A'}")
+                            st.write(f"**Cluster:** {vm.cluster or 'N/A'}")
+                            st.write(f"**Folder:** {vm.folder or 'N/A'}")
+                        
+                        with col2:
+                            st.write(f"**Power:** {vm.powerstate or 'N/A'}")
+                            st.write(f"**vCPUs:** {vm.cpus or 0}")
+                            st.write(f"**Memory:** {(vm.memory or 0) / 1024:.1f} GB")
+                        
+                        st.divider()
+                        
+                        # Current labels
+                        vm_labels = labels_by_vm.get(vm.id, [])
+                        
+                        if vm_labels:
+                            st.write("**Current Labels:**")
+                            st.markdown(_render_label_badges(vm_labels), unsafe_allow_html=True)
+                            inherited = [lbl for lbl in vm_labels if lbl['inherited']]
+                            if inherited:
+                                st.caption(" · ".join(
+                                    f"↳ {lbl['key']}={lbl['value']} inherited from: {lbl['source_folder']}"
+                                    for lbl in inherited
+                                ))
+                            
+                            direct = {lbl['label_id']: f"{lbl['key']}={lbl['value']}" for lbl in vm_labels if not lbl['inherited']}
+                            if direct:
+                                col1, col2 = st.columns([4, 1])
+                                
+                                with col1:
+                                    remove_id = st.selectbox(
+                                        "Label to remove",
+                                        options=list(direct.keys()),
+                                        format_func=direct.get,
+                                        key=f"rm_vm_sel_{vm.id}",
+                                        label_visibility="collapsed"
+                                    )
+                                
+                                with col2:
+                                    if st.button("Remove", key=f"rm_vm_{vm.id}"):
+                                        try:
+                                            label_service.remove_vm_label(vm.id, remove_id)
+                                            st.success("Label removed")
+                                            st.rerun(scope="fragment")
+                                        except Exception as e:
+                                            st.error(f"Error: {e}")
+                        else:
+                            st.info("No labels assigned")
+                        
+                        # Assign new label
+                        st.divider()
+                        st.write("**Assign New Label:**")
+                        
+                        col1, col2, col3 = st.columns([2, 2, 1])
+                        
+                        with col1:
+                            label_keys = _load_label_keys(db_url)
+                            if label_keys:
+                                vm_label_key = st.selectbox("Key", label_keys, key=f"vm_key_{vm.id}")
+                            else:
+                                st.warning("No labels defined")
+                                vm_label_key = None
+                        
+                        with col2:
+                            if vm_label_key:
+                                vm_label_values = _load_label_values(db_url, vm_label_key)
+                                vm_label_value = st.selectbox("Value", vm_label_values, key=f"vm_val_{vm.id}")
+                            else:
+                                vm_label_value = None
+                        
+                        with col3:
+                            if st.button("Assign", key=f"assign_vm_{vm.id}", type="primary"):
+                                if vm_label_key and vm_label_value:
+                                    try:
+                                        label = label_service.get_label_by_key_value(vm_label_key, vm_label_value)
+                                        if label:
+                                            label_service.assign_vm_label(vm.id, label.id)
+                                            st.success("Label assigned")
+                                            st.rerun(scope="fragment")
+                                    except Exception as e:
+                                        session.rollback()
+                                        error_msg = str(e)
+                                        if "UNIQUE constraint failed" in error_msg or "already assigned" in error_msg.lower():
+                                            st.info("ℹ️ This label is already assigned to this VM")
+                                        else:
+                                            st.error(f"Error: {e}")
+            else:
+                st.warning("No VMs found matching your search")
+    finally:
+        session.close()
+
+
 def render(db_url: str):
     """Render the folder labelling page."""
     colored_header(
@@ -24,25 +254,32 @@ def render(db_url: str):
         color_name="blue-70"
     )
     
+    # Pooled session from the engine cached across reruns
+    session = DatabaseManager.get_session(db_url)
+    
     try:
-        engine = create_engine(db_url, echo=False)
-        SessionLocal = sessionmaker(bind=engine)
-        session = SessionLocal()
         label_service = LabelService(session)
         
-        # Create tabs for different operations
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            "📋 Label Definitions", 
-            "📁 Folder Labels", 
-            "🖥️ VM Labels",
-            "🔍 Search by Label",
-            "⚙️ Management"
-        ])
+        # Section selector: unlike st.tabs, only the selected section's body
+        # (and its queries) runs on each rerun
+        section = st.radio(
+            "Section",
+            [
+                "📋 Label Definitions",
+                "📁 Folder Labels",
+                "🖥️ VM Labels",
+                "🔍 Search by Label",
+                "⚙️ Management"
+            ],
+            horizontal=True,
+            key="active_tab",
+            label_visibility="collapsed"
+        )
         
         # =====================================================================
         # Tab 1: Label Definitions
         # =====================================================================
-        with tab1:
+        if section == "📋 Label Definitions":
             colored_header(
                 label="Label Definitions",
                 description="Create and manage label definitions",
@@ -50,7 +287,8 @@ def render(db_url: str):
             )
             
             # Create new label
-            with st.expander("➕ Create New Label", expanded=False):
+            # A form defers reruns (and their queries) until submit instead of every keystroke
+            with st.expander("➕ Create New Label", expanded=False), st.form("create_label_form"):
                 col1, col2 = st.columns(2)
                 
                 with col1:
@@ -61,10 +299,11 @@ def render(db_url: str):
                     new_description = st.text_area("Description (optional)", placeholder="Label description")
                     new_color = st.color_picker("Color", value="#607078")
                 
-                if st.button("Create Label", type="primary"):
+                if st.form_submit_button("Create Label", type="primary"):
                     if new_key and new_value:
                         try:
                             label = label_service.create_label(new_key, new_value, new_description, new_color)
+                            _clear_label_caches()
                             st.success(f"✅ Label created: {label.key}={label.value}")
                             st.rerun()
                         except Exception as e:
@@ -75,52 +314,60 @@ def render(db_url: str):
             add_vertical_space(1)
             
             # List existing labels
-            labels = label_service.list_labels()
+            labels = _load_labels(db_url)
             
             if labels:
-                st.write(f"**{len(labels)} label(s) defined:**")
-                
-                # Group by key
-                labels_by_key = {}
-                for label in labels:
-                    if label.key not in labels_by_key:
-                        labels_by_key[label.key] = []
-                    labels_by_key[label.key].append(label)
-                
-                # Display grouped labels
-                for key in sorted(labels_by_key.keys()):
-                    with st.expander(f"🏷️ {key} ({len(labels_by_key[key])} values)"):
-                        for label in labels_by_key[key]:
-                            col1, col2, col3, col4 = st.columns([2, 3, 2, 1])
-                            
-                            with col1:
-                                st.markdown(_render_label_badge(label.key, label.value, label.color), unsafe_allow_html=True)
-                            
-                            with col2:
-                                st.caption(label.description if label.description else "No description")
-                            
-                            with col3:
-                                st.caption(f"ID: {label.id} | Created: {label.created_at.strftime('%Y-%m-%d')}")
-                            
-                            with col4:
-                                if st.button("🗑️", key=f"del_label_{label.id}", help="Delete label"):
-                                    if st.session_state.get(f"confirm_del_{label.id}"):
-                                        try:
-                                            label_service.delete_label(label.id)
-                                            st.success(f"Deleted {label.key}={label.value}")
-                                            st.rerun()
-                                        except Exception as e:
-                                            st.error(f"Error: {e}")
-                                    else:
-                                        st.session_state[f"confirm_del_{label.id}"] = True
-                                        st.warning("Click again to confirm deletion")
+                labels_df = pd.DataFrame(labels)
+                st.write(f"**{len(labels)} label(s) defined across {len(_load_label_keys(db_url))} key(s):**")
+                
+                # One virtualized table instead of a row of widgets per label;
+                # selecting a row exposes its delete action
+                event = st.dataframe(
+                    labels_df[['key', 'value', 'description', 'color', 'id', 'created_at']],
+                    width="stretch",
+                    hide_index=True,
+                    column_config={
+                        'key': st.column_config.TextColumn('Key'),
+                        'value': st.column_config.TextColumn('Value'),
+                        'description': st.column_config.TextColumn('Description'),
+                        'color': st.column_config.TextColumn('Color'),
+                        'id': st.column_config.NumberColumn('ID', format="%d"),
+                        'created_at': st.column_config.DatetimeColumn('Created', format="YYYY-MM-DD")
+                    },
+                    on_select="rerun",
+                    selection_mode="single-row",
+                    key=f"labels_table_{st.session_state.get('labels_table_version', 0)}"
+                )
+                
+                selected_rows = [row for row in event.selection.rows if row < len(labels)]
+                if selected_rows:
+                    label = labels[selected_rows[0]]
+                    col1, col2 = st.columns([4, 1])
+                    
+                    with col1:
+                        st.markdown(_render_label_badge(label['key'], label['value'], label['color']), unsafe_allow_html=True)
+                    
+                    with col2:
+                        if st.button("🗑️ Delete", key=f"del_label_{label['id']}", help="Delete label"):
+                            if _confirmed("del_label", label['id']):
+                                try:
+                                    label_service.delete_label(label['id'])
+                                    _clear_label_caches()
+                                    st.success(f"Deleted {label['key']}={label['value']}")
+                                    st.rerun()
+                                except Exception as e:
+                                    st.error(f"Error: {e}")
+                            else:
+                                st.warning("Click again to confirm deletion")
+                else:
+                    st.caption("Select a row to delete its label")
             else:
                 st.info("No labels defined yet. Create your first label above!")
         
         # =====================================================================
         # Tab 2: Folder Labels
         # =====================================================================
-        with tab2:
+        elif section == "📁 Folder Labels":
             colored_header(
                 label="Folder Labels",
                 description="Assign labels to folders with inheritance options",
@@ -128,7 +375,7 @@ def render(db_url: str):
             )
             
             # Get all folders
-            all_folders = label_service.get_all_folders()
+            all_folders = _load_folders(db_url)
             
             if not all_folders:
                 st.warning("No folders found in the inventory.")
@@ -139,44 +386,27 @@ def render(db_url: str):
             filter_col1, filter_col2 = st.columns(2)
             
             with filter_col1:
-                # Get unique clusters
-                clusters = session.query(VirtualMachine.cluster).filter(
-                    VirtualMachine.cluster.isnot(None)
-                ).distinct().order_by(VirtualMachine.cluster).all()
-                cluster_list = [c[0] for c in clusters]
+                # Unique clusters (cached; cleared on data import)
                 selected_cluster_filter = st.selectbox(
                     "Filter by Cluster",
-                    ["All Clusters"] + cluster_list,
+                    ["All Clusters"] + get_clusters(db_url),
                     key="cluster_filter"
                 )
             
             with filter_col2:
-                # Get unique datacenters
-                datacenters = session.query(VirtualMachine.datacenter).filter(
-                    VirtualMachine.datacenter.isnot(None)
-                ).distinct().order_by(VirtualMachine.datacenter).all()
-                datacenter_list = [d[0] for d in datacenters]
+                # Unique datacenters (cached; cleared on data import)
                 selected_dc_filter = st.selectbox(
                     "Filter by Datacenter",
-                    ["All Datacenters"] + datacenter_list,
+                    ["All Datacenters"] + get_datacenters(db_url),
                     key="dc_filter"
                 )
             
             # Filter folders based on cluster/datacenter
-            if selected_cluster_filter != "All Clusters" or selected_dc_filter != "All Datacenters":
-                # Get VMs that match the filter
-                vm_query = session.query(VirtualMachine.folder).filter(
-                    VirtualMachine.folder.isnot(None)
-                )
-                
-                if selected_cluster_filter != "All Clusters":
-                    vm_query = vm_query.filter(VirtualMachine.cluster == selected_cluster_filter)
-                
-                if selected_dc_filter != "All Datacenters":
-                    vm_query = vm_query.filter(VirtualMachine.datacenter == selected_dc_filter)
-                
-                filtered_folder_results = vm_query.distinct().all()
-                folders = [f[0] for f in filtered_folder_results]
+            folder_cluster = None if selected_cluster_filter == "All Clusters" else selected_cluster_filter
+            folder_dc = None if selected_dc_filter == "All Datacenters" else selected_dc_filter
+            
+            if folder_cluster or folder_dc:
+                folders = label_service.get_all_folders(cluster=folder_cluster, datacenter=folder_dc)
                 
                 st.info(f"📊 Showing {len(folders)} folder(s) matching filter")
             else:
@@ -192,10 +422,10 @@ def render(db_url: str):
                 
                 with col1:
                     # Get available labels
-                    label_keys = label_service.get_label_keys()
+                    label_keys = _load_label_keys(db_url)
                     if label_keys:
                         bulk_key = st.selectbox("Label Key", label_keys, key="bulk_folder_label_key")
-                        bulk_label_values = label_service.get_label_values(bulk_key)
+                        bulk_label_values = _load_label_values(db_url, bulk_key)
                         bulk_value = st.selectbox("Label Value", bulk_label_values, key="bulk_folder_label_value")
                     else:
                         st.warning("No labels defined. Create labels in the 'Label Definitions' tab first.")
@@ -222,19 +452,17 @@ def render(db_url: str):
                 
                 # Preview button
                 if st.button("🔍 Preview Folders", key="bulk_preview"):
-                    import fnmatch
-                    
-                    # Filter folders by pattern if provided
+                    # Filter folders by pattern in the database if provided
                     if bulk_pattern:
-                        preview_folders = [f for f in folders if fnmatch.fnmatch(f, bulk_pattern)]
+                        preview_folders = label_service.get_all_folders(folder_cluster, folder_dc, bulk_pattern)
                     else:
                         preview_folders = folders
                     
                     st.write(f"**Preview: {len(preview_folders)} folder(s) will be labeled:**")
                     
                     # Show first 20
-                    for folder in preview_folders[:20]:
-                        stats = label_service.get_folder_stats(folder)
+                    preview_stats = label_service.get_folder_stats_bulk(preview_folders[:20])
+                    for folder, stats in preview_stats.items():
                         st.caption(f"📁 {folder} ({stats['vm_count']} VMs)")
                     
                     if len(preview_folders) > 20:
@@ -243,11 +471,9 @@ def render(db_url: str):
                 # Apply button
                 if st.button("✅ Apply to All Folders", type="primary", key="bulk_apply"):
                     if bulk_key and bulk_value:
-                        import fnmatch
-                        
-                        # Filter folders by pattern if provided
+                        # Filter folders by pattern in the database if provided
                         if bulk_pattern:
-                            target_folders = [f for f in folders if fnmatch.fnmatch(f, bulk_pattern)]
+                            target_folders = label_service.get_all_folders(folder_cluster, folder_dc, bulk_pattern)
                             st.info(f"📊 Filtered to {len(target_folders)} folders matching pattern")
                         else:
                             target_folders = folders
@@ -255,58 +481,43 @@ def render(db_url: str):
                         if not target_folders:
                             st.warning("No folders match the criteria")
                         else:
-                            # Confirm
-                            confirm_key = f"confirm_bulk_{bulk_key}_{bulk_value}"
-                            if st.session_state.get(confirm_key):
+                            if _confirmed("bulk_apply", (bulk_key, bulk_value)):
                                 try:
-                                    label = label_service.get_label_by_key_value(bulk_key, bulk_value)
-                                    if not label:
-                                        label = label_service.create_label(bulk_key, bulk_value)
-                                        st.info(f"ℹ️ Created new label: {bulk_key}={bulk_value}")
+                                    # Single upsert: also recreates a label deleted since this page was rendered
+                                    label = label_service.get_or_create_label(bulk_key, bulk_value)
                                     
-                                    # Progress bar
-                                    progress_bar = st.progress(0)
-                                    status_text = st.empty()
+                                    # Progress bar carrying its own status text, advanced
+                                    # once per committed chunk (one UI update per chunk)
+                                    progress_bar = st.progress(0, text=f"Processing: 0/{len(target_folders)}")
                                     
-                                    success_count = 0
-                                    error_count = 0
+                                    def _report_progress(done, total):
+                                        progress_bar.progress(done / total, text=f"Processing: {done}/{total}")
                                     
-                                    for idx, folder in enumerate(target_folders):
-                                        try:
-                                            label_service.assign_folder_label(
-                                                folder,
-                                                label.id,
-                                                assigned_by=bulk_assigned_by or None,
-                                                inherit_to_vms=bulk_inherit_vms,
-                                                inherit_to_subfolders=bulk_inherit_subfolders
-                                            )
-                                            success_count += 1
-                                        except Exception as e:
-                                            session.rollback()
-                                            error_count += 1
-                                            if idx < 5:  # Show first few errors
-                                                st.warning(f"⚠️ {folder}: {str(e)[:50]}")
-                                        
-                                        # Update progress
-                                        progress = (idx + 1) / len(target_folders)
-                                        progress_bar.progress(progress)
-                                        status_text.text(f"Processing: {idx + 1}/{len(target_folders)}")
+                                    folder_count, vm_count = label_service.assign_folder_label_bulk(
+                                        target_folders,
+                                        label.id,
+                                        assigned_by=bulk_assigned_by or None,
+                                        inherit_to_vms=bulk_inherit_vms,
+                                        inherit_to_subfolders=bulk_inherit_subfolders,
+                                        progress_callback=_report_progress
+                                    )
                                     
                                     progress_bar.empty()
-                                    status_text.empty()
+                                    # The upsert may have (re)created the label definition
+                                    _clear_label_caches()
                                     
-                                    st.success(f"✅ Complete: {success_count} folders labeled")
-                                    if error_count > 0:
-                                        st.warning(f"⚠️ {error_count} errors (check above for details)")
+                                    st.success(f"✅ Complete: {len(target_folders)} folders labeled")
+                                    st.caption(
+                                        f"{folder_count} new folder assignment(s), "
+                                        f"{vm_count} VM(s) inherited the label"
+                                    )
                                     
-                                    # Clear confirmation
-                                    st.session_state[confirm_key] = False
                                     st.rerun()
                                     
                                 except Exception as e:
+                                    session.rollback()
                                     st.error(f"❌ Error: {e}")
                             else:
-                                st.session_state[confirm_key] = True
                                 st.warning(f"⚠️ Click again to confirm: Will label {len(target_folders)} folders")
                     else:
                         st.warning("Please select label key and value")
@@ -327,26 +538,31 @@ def render(db_url: str):
                 
                 with col2:
                     # Get available labels
-                    label_keys = label_service.get_label_keys()
+                    label_keys = _load_label_keys(db_url)
                     if label_keys:
                         selected_key = st.selectbox("Label Key", label_keys, key="folder_label_key")
-                        label_values = label_service.get_label_values(selected_key)
+                        label_values = _load_label_values(db_url, selected_key)
                         selected_value = st.selectbox("Label Value", label_values, key="folder_label_value")
                     else:
                         st.warning("No labels defined. Create labels in the 'Label Definitions' tab first.")
                         selected_key = None
                         selected_value = None
                 
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    inherit_vms = st.checkbox("Apply to VMs in folder", value=True)
-                with col2:
-                    inherit_subfolders = st.checkbox("Apply to subfolders", value=False)
-                with col3:
-                    assigned_by = st.text_input("Assigned by", placeholder="Optional")
+                # Options are batched in a form; the selectors above stay live because
+                # the folder stats and label values depend on them
+                with st.form("assign_folder_label_form"):
+                    col1, col2, col3 = st.columns(3)
+                    
+                    with col1:
+                        inherit_vms = st.checkbox("Apply to VMs in folder", value=True)
+                    with col2:
+                        inherit_subfolders = st.checkbox("Apply to subfolders", value=False)
+                    with col3:
+                        assigned_by = st.text_input("Assigned by", placeholder="Optional")
+                    
+                    submitted = st.form_submit_button("Assign to Folder", type="primary")
                 
-                if st.button("Assign to Folder", type="primary"):
+                if submitted:
                     if selected_folder and selected_key and selected_value:
                         try:
                             label = label_service.get_label_by_key_value(selected_key, selected_value)
@@ -377,53 +593,74 @@ def render(db_url: str):
             
             folder_search = st.text_input("🔍 Search folders by name", placeholder="Type to search...", key="folder_search")
             
-            # Apply search filter
-            display_folders = folders
+            # Labeled folders within the cluster/datacenter and name filters,
+            # together with their labels, in one query
+            labels_by_folder = label_service.list_folder_labels(folder_cluster, folder_dc, folder_search)
+            labeled_folders = list(labels_by_folder)
+            
             if folder_search:
-                display_folders = [f for f in folders if folder_search.lower() in f.lower()]
+                st.caption(f"{len(labeled_folders)} labeled folder(s) match '{folder_search}'")
             
-            # Show folder count
-            if len(display_folders) != len(folders):
-                st.caption(f"Showing {len(display_folders)} of {len(folders)} folders")
+            # Page through the labeled folders; statistics are fetched for the
+            # visible page alone
+            pagination = PaginationHelper(key_prefix="folder_labels_list", default_page_size=25)
+            total_pages = max(1, (len(labeled_folders) + pagination.page_size - 1) // pagination.page_size)
+            if pagination.current_page > total_pages:
+                pagination.current_page = total_pages
+            page_start = (pagination.current_page - 1) * pagination.page_size
+            visible_folders = labeled_folders[page_start:page_start + pagination.page_size]
+            visible_stats = label_service.get_folder_stats_bulk(visible_folders, labels_by_folder)
             
-            for folder in display_folders[:50]:  # Limit display
-                folder_labels = label_service.get_folder_labels(folder)
+            for folder in visible_folders:
+                stats = visible_stats[folder]
+                folder_labels = stats['labels']
                 
                 if folder_labels:
                     with st.expander(f"📁 {folder} ({len(folder_labels)} label(s))"):
-                        stats = label_service.get_folder_stats(folder)
                         st.caption(f"📊 {stats['vm_count']} VMs | {stats['storage_gib']:.1f} GiB")
                         
+                        st.markdown(_render_label_badges(folder_labels), unsafe_allow_html=True)
+                        
+                        inheritance = []
                         for lbl in folder_labels:
-                            col1, col2, col3 = st.columns([3, 2, 1])
-                            
-                            with col1:
-                                st.markdown(_render_label_badge(lbl['key'], lbl['value'], lbl['color']), unsafe_allow_html=True)
-                            
-                            with col2:
-                                inheritance = []
-                                if lbl['inherit_to_vms']:
-                                    inheritance.append("VMs")
-                                if lbl['inherit_to_subfolders']:
-                                    inheritance.append("Subfolders")
-                                st.caption(f"Inherits to: {', '.join(inheritance) if inheritance else 'None'}")
-                            
-                            with col3:
-                                if st.button("Remove", key=f"rm_folder_{folder}_{lbl['label_id']}"):
-                                    try:
-                                        label_service.remove_folder_label(folder, lbl['label_id'])
-                                        st.success("Label removed")
-                                        st.rerun()
-                                    except Exception as e:
-                                        st.error(f"Error: {e}")
+                            targets = [name for name, flag in (("VMs", lbl['inherit_to_vms']), ("Subfolders", lbl['inherit_to_subfolders'])) if flag]
+                            inheritance.append(f"{lbl['key']}={lbl['value']}: {', '.join(targets) if targets else 'None'}")
+                        st.caption(f"Inherits to — {' · '.join(inheritance)}")
+                        
+                        label_names = {lbl['label_id']: f"{lbl['key']}={lbl['value']}" for lbl in folder_labels}
+                        col1, col2 = st.columns([4, 1])
+                        
+                        with col1:
+                            remove_id = st.selectbox(
+                                "Label to remove",
+                                options=list(label_names.keys()),
+                                format_func=label_names.get,
+                                key=f"rm_folder_sel_{folder}",
+                                label_visibility="collapsed"
+                            )
+                        
+                        with col2:
+                            if st.button("Remove", key=f"rm_folder_{folder}"):
+                                try:
+                                    label_service.remove_folder_label(folder, remove_id)
+                                    st.success("Label removed")
+                                    st.rerun()
+                                except Exception as e:
+                                    st.error(f"Error: {e}")
             
-            if len(display_folders) > 50:
-                st.info(f"Showing first 50 of {len(display_folders)} folders. Use search to narrow results.")
+            if len(labeled_folders) > pagination.page_size:
+                st.caption(
+                    f"Page {pagination.current_page} of {total_pages} "
+                    f"({len(labeled_folders)} labeled folders)"
+                )
+                pagination.show_pagination_controls()
+            elif not labeled_folders:
+                st.info("No labeled folders match the current filters.")
         
         # =====================================================================
         # Tab 3: VM Labels
         # =====================================================================
-        with tab3:
+        elif section == "🖥️ VM Labels":
             colored_header(
                 label="VM Labels",
                 description="Assign labels directly to VMs",
@@ -435,104 +672,7 @@ def render(db_url: str):
             
             # ===== Individual VM Labelling =====
             with vm_tab1:
-                # Search for VM
-                vm_search = st.text_input("🔍 Search VM by name", placeholder="Enter VM name...")
-                
-                if vm_search and len(vm_search) >= 2:
-                    try:
-                        vms = session.query(VirtualMachine).filter(
-                            VirtualMachine.vm.ilike(f"%{vm_search}%")
-                        ).limit(20).all()
-                    except Exception as e:
-                        # Rollback session if there was a previous error
-                        session.rollback()
-                        st.error(f"Database error: {str(e)}")
-                        vms = []
-                    
-                    if vms:
-                        st.write(f"Found {len(vms)} VM(s):")
-                        
-                        for vm in vms:
-                            with st.expander(f"🖥️ {vm.vm}"):
-                                # Show VM info
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    st.write(f"**Datacenter:** {vm.datacenter or 'N/A'}")
-                                    st.write(f"**Cluster:** {vm.cluster or 'N/A'}")
-                                    st.write(f"**Folder:** {vm.folder or 'N/A'}")
-                                
-                                with col2:
-                                    st.write(f"**Power:** {vm.powerstate or 'N/A'}")
-                                    st.write(f"**vCPUs:** {vm.cpus or 0}")
-                                    st.write(f"**Memory:** {(vm.memory or 0) / 1024:.1f} GB")
-                                
-                                st.divider()
-                                
-                                # Current labels
-                                vm_labels = label_service.get_vm_labels(vm.id, include_inherited=True)
-                                
-                                if vm_labels:
-                                    st.write("**Current Labels:**")
-                                    for lbl in vm_labels:
-                                        col1, col2 = st.columns([4, 1])
-                                        
-                                        with col1:
-                                            st.markdown(_render_label_badge(lbl['key'], lbl['value'], lbl['color']), unsafe_allow_html=True)
-                                            if lbl['inherited']:
-                                                st.caption(f"↳ Inherited from: {lbl['source_folder']}")
-                                        
-                                        with col2:
-                                            if not lbl['inherited']:
-                                                if st.button("Remove", key=f"rm_vm_{vm.id}_{lbl['label_id']}"):
-                                                    try:
-                                                        label_service.remove_vm_label(vm.id, lbl['label_id'])
-                                                        st.success("Label removed")
-                                                        st.rerun()
-                                                    except Exception as e:
-                                                        st.error(f"Error: {e}")
-                                else:
-                                    st.info("No labels assigned")
-                                
-                                # Assign new label
-                                st.divider()
-                                st.write("**Assign New Label:**")
-                                
-                                col1, col2, col3 = st.columns([2, 2, 1])
-                                
-                                with col1:
-                                    label_keys = label_service.get_label_keys()
-                                    if label_keys:
-                                        vm_label_key = st.selectbox("Key", label_keys, key=f"vm_key_{vm.id}")
-                                    else:
-                                        st.warning("No labels defined")
-                                        vm_label_key = None
-                                
-                                with col2:
-                                    if vm_label_key:
-                                        vm_label_values = label_service.get_label_values(vm_label_key)
-                                        vm_label_value = st.selectbox("Value", vm_label_values, key=f"vm_val_{vm.id}")
-                                    else:
-                                        vm_label_value = None
-                                
-                                with col3:
-                                    if st.button("Assign", key=f"assign_vm_{vm.id}", type="primary"):
-                                        if vm_label_key and vm_label_value:
-                                            try:
-                                                label = label_service.get_label_by_key_value(vm_label_key, vm_label_value)
-                                                if label:
-                                                    label_service.assign_vm_label(vm.id, label.id)
-                                                    st.success("Label assigned")
-                                                    st.rerun()
-                                            except Exception as e:
-                                                session.rollback()
-                                                error_msg = str(e)
-                                                if "UNIQUE constraint failed" in error_msg or "already assigned" in error_msg.lower():
-                                                    st.info("ℹ️ This label is already assigned to this VM")
-                                                else:
-                                                    st.error(f"Error: {e}")
-                    else:
-                        st.warning("No VMs found matching your search")
+                _render_vm_search(db_url)
             
             # ===== Batch VM Labelling =====
             with vm_tab2:
@@ -652,10 +792,10 @@ def render(db_url: str):
                 
                 with col2:
                     # Label selection
-                    label_keys = label_service.get_label_keys()
+                    label_keys = _load_label_keys(db_url)
                     if label_keys:
                         batch_label_key = st.selectbox("Label Key", label_keys, key="batch_label_key")
-                        batch_label_values = label_service.get_label_values(batch_label_key)
+                        batch_label_values = _load_label_values(db_url, batch_label_key)
                         batch_label_value = st.selectbox("Label Value", batch_label_values, key="batch_label_value")
                     else:
                         st.warning("⚠️ No labels defined. Create labels first.")
@@ -667,55 +807,56 @@ def render(db_url: str):
                 # Preview button
                 if st.button("🔍 Preview VMs", key="preview_batch"):
                     try:
-                        # Get matching VMs based on filter type
-                        if filter_type == "OS Family":
-                            matching_vms = label_service.get_vms_by_os_category(os_family=category)
-                        elif filter_type == "Specific OS":
-                            if category:
-                                # Check if it's exact match or pattern
-                                if 'os_match_mode' in st.session_state and st.session_state.os_match_mode == "Exact Match":
-                                    # Exact match
-                                    matching_vms = session.query(VirtualMachine).filter(
-                                        VirtualMachine.os_config == category
-                                    ).all()
-                                else:
-                                    # Pattern match (use label_service method)
-                                    matching_vms = label_service.get_vms_by_os_category(os_pattern=category)
-                            else:
-                                matching_vms = []
-                        elif filter_type == "Resource Size":
-                            matching_vms = label_service.get_vms_by_resource_category(category)
-                        elif filter_type == "Network Complexity":
-                            matching_vms = label_service.get_vms_by_network_complexity(category)
-                        elif filter_type == "Storage Complexity":
-                            matching_vms = label_service.get_vms_by_storage_complexity(category)
+                        # Build the matching query in SQL; only the preview rows and
+                        # the VM ids are fetched, never full VM objects
+                        if filter_type == "Specific OS":
+                            exact = st.session_state.get('os_match_mode') == "Exact Match"
+                            filter_kind = "os_exact" if exact else "os_pattern"
                         else:
-                            matching_vms = []
+                            filter_kind = {
+                                "OS Family": "os_family",
+                                "Resource Size": "resource_size",
+                                "Network Complexity": "network_complexity",
+                                "Storage Complexity": "storage_complexity"
+                            }.get(filter_type)
+                        vm_query = label_service.filter_vms(filter_kind, category)
                         
-                        if matching_vms:
-                            st.success(f"✅ Found {len(matching_vms)} VMs matching criteria")
-                            
-                            # Display preview
-                            preview_data = []
-                            for vm in matching_vms[:50]:  # Show first 50
-                                preview_data.append({
-                                    'VM': vm.vm,
-                                    'OS': vm.os_config or 'N/A',
-                                    'vCPUs': vm.cpus or 0,
-                                    'Memory (GB)': f"{(vm.memory or 0) / 1024:.1f}",
-                                    'NICs': vm.nics or 0,
-                                    'Disks': vm.disks or 0,
-                                    'Folder': vm.folder or 'N/A'
-                                })
+                        vm_ids = [vm_id for (vm_id,) in vm_query.with_entities(VirtualMachine.id).order_by(None)]
+                        
+                        if vm_ids:
+                            st.success(f"✅ Found {len(vm_ids)} VMs matching criteria")
                             
-                            df_preview = pd.DataFrame(preview_data)
+                            # Display preview (first 50)
+                            preview_rows = vm_query.with_entities(
+                                VirtualMachine.vm,
+                                VirtualMachine.os_config,
+                                VirtualMachine.cpus,
+                                VirtualMachine.memory,
+                                VirtualMachine.nics,
+                                VirtualMachine.disks,
+                                VirtualMachine.folder
+                            ).limit(50).all()
+                            df_preview = pd.DataFrame.from_records(
+                                (
+                                    {
+                                        'VM': row.vm,
+                                        'OS': row.os_config or 'N/A',
+                                        'vCPUs': row.cpus or 0,
+                                        'Memory (GB)': f"{(row.memory or 0) / 1024:.1f}",
+                                        'NICs': row.nics or 0,
+                                        'Disks': row.disks or 0,
+                                        'Folder': row.folder or 'N/A'
+                                    }
+                                    for row in preview_rows
+                                )
+                            )
                             st.dataframe(df_preview, width="stretch", hide_index=True)
                             
-                            if len(matching_vms) > 50:
-                                st.info(f"ℹ️ Showing first 50 of {len(matching_vms)} VMs")
+                            if len(vm_ids) > 50:
+                                st.info(f"ℹ️ Showing first 50 of {len(vm_ids)} VMs")
                             
                             # Store in session state for batch assign
-                            st.session_state['batch_vm_ids'] = [vm.id for vm in matching_vms]
+                            st.session_state['batch_vm_ids'] = vm_ids
                         else:
                             st.warning("⚠️ No VMs found matching criteria")
                             st.session_state['batch_vm_ids'] = []
@@ -753,7 +894,7 @@ def render(db_url: str):
         # =====================================================================
         # Tab 4: Search by Label
         # =====================================================================
-        with tab4:
+        elif section == "🔍 Search by Label":
             colored_header(
                 label="Search by Label",
                 description="Find VMs and folders by labels",
@@ -763,10 +904,10 @@ def render(db_url: str):
             col1, col2 = st.columns(2)
             
             with col1:
-                label_keys = label_service.get_label_keys()
+                label_keys = _load_label_keys(db_url)
                 if label_keys:
                     search_key = st.selectbox("Label Key", label_keys, key="search_key")
-                    search_values = label_service.get_label_values(search_key)
+                    search_values = _load_label_values(db_url, search_key)
                     search_value = st.selectbox("Label Value", search_values, key="search_value")
                 else:
                     st.warning("No labels defined")
@@ -776,55 +917,79 @@ def render(db_url: str):
             with col2:
                 search_type = st.radio("Search for:", ["VMs", "Folders", "Both"], horizontal=True)
             
+            vm_pagination = PaginationHelper(key_prefix="label_search_vms", default_page_size=50)
+            
             if st.button("🔍 Search", type="primary"):
                 if search_key and search_value:
-                    add_vertical_space(1)
+                    search = {'key': search_key, 'value': search_value, 'vms': None, 'folders': None}
                     
-                    # Search VMs
                     if search_type in ["VMs", "Both"]:
-                        vms = label_service.get_vms_with_label(search_key, search_value)
-                        
-                        st.write(f"**VMs with {search_key}={search_value}:** {len(vms)}")
-                        
-                        if vms:
-                            vm_data = []
-                            for vm in vms:
-                                vm_data.append({
-                                    'VM': vm.vm,
-                                    'Datacenter': vm.datacenter or 'N/A',
-                                    'Cluster': vm.cluster or 'N/A',
-                                    'Folder': vm.folder or 'N/A',
-                                    'Power': vm.powerstate or 'N/A'
-                                })
-                            
-                            df_vms = pd.DataFrame(vm_data)
-                            st.dataframe(df_vms, width="stretch", hide_index=True)
-                            
-                            # Export button
-                            csv_data = df_vms.to_csv(index=False).encode('utf-8')
-                            st.download_button(
-                                label="⬇️ Export CSV",
-                                data=csv_data,
-                                file_name=f"vms_{search_key}_{search_value}.csv",
-                                mime="text/csv"
-                            )
+                        # Fetch only the displayed columns, straight into a DataFrame
+                        vms_stmt = label_service.query_vms_with_label(search_key, search_value).with_entities(
+                            VirtualMachine.vm.label('VM'),
+                            func.coalesce(VirtualMachine.datacenter, 'N/A').label('Datacenter'),
+                            func.coalesce(VirtualMachine.cluster, 'N/A').label('Cluster'),
+                            func.coalesce(VirtualMachine.folder, 'N/A').label('Folder'),
+                            func.coalesce(VirtualMachine.powerstate, 'N/A').label('Power')
+                        ).statement
+                        search['vms'] = pd.read_sql_query(vms_stmt, session.connection())
                     
-                    # Search Folders
                     if search_type in ["Folders", "Both"]:
-                        add_vertical_space(1)
-                        folders = label_service.get_folders_with_label(search_key, search_value)
+                        # One grouped statistics query for all matching folders; labels are not shown
+                        search['folders'] = label_service.get_folder_stats_bulk(
+                            label_service.get_folders_with_label(search_key, search_value), {}
+                        )
+                    
+                    # Keep the results across reruns so they can be paged
+                    st.session_state['label_search'] = search
+                    vm_pagination.current_page = 1
+            
+            search = st.session_state.get('label_search')
+            if search:
+                add_vertical_space(1)
+                
+                # Search VMs
+                df_vms = search['vms']
+                if df_vms is not None:
+                    st.write(f"**VMs with {search['key']}={search['value']}:** {len(df_vms)}")
+                    
+                    if not df_vms.empty:
+                        # Only the current page is sent to the browser
+                        total_pages = max(1, (len(df_vms) + vm_pagination.page_size - 1) // vm_pagination.page_size)
+                        if vm_pagination.current_page > total_pages:
+                            vm_pagination.current_page = total_pages
+                        page_start = (vm_pagination.current_page - 1) * vm_pagination.page_size
+                        st.dataframe(
+                            df_vms.iloc[page_start:page_start + vm_pagination.page_size],
+                            width="stretch",
+                            hide_index=True
+                        )
                         
-                        st.write(f"**Folders with {search_key}={search_value}:** {len(folders)}")
+                        if len(df_vms) > vm_pagination.page_size:
+                            st.caption(f"Page {vm_pagination.current_page} of {total_pages} ({len(df_vms)} VMs)")
+                            vm_pagination.show_pagination_controls()
                         
-                        if folders:
-                            for folder in folders:
-                                stats = label_service.get_folder_stats(folder)
-                                st.write(f"📁 {folder} ({stats['vm_count']} VMs)")
+                        # Export button; encode_csv is cached, so reruns reuse the bytes
+                        st.download_button(
+                            label="⬇️ Export CSV",
+                            data=encode_csv(df_vms),
+                            file_name=f"vms_{search['key']}_{search['value']}.csv",
+                            mime="text/csv"
+                        )
+                
+                # Search Folders
+                folders = search['folders']
+                if folders is not None:
+                    add_vertical_space(1)
+                    st.write(f"**Folders with {search['key']}={search['value']}:** {len(folders)}")
+                    
+                    for folder, stats in folders.items():
+                        st.write(f"📁 {folder} ({stats['vm_count']} VMs)")
         
         # =====================================================================
         # Tab 5: Management
         # =====================================================================
-        with tab5:
+        elif section == "⚙️ Management":
             colored_header(
                 label="Label Management",
                 description="Maintenance and synchronization operations",
@@ -839,7 +1004,7 @@ def render(db_url: str):
                 st.write("**Sync Inherited Labels**")
                 st.caption("Re-apply folder labels to VMs based on inheritance settings")
                 
-                sync_folder = st.selectbox("Folder (or All)", ["All Folders"] + folders, key="sync_folder")
+                sync_folder = st.selectbox("Folder (or All)", ["All Folders"] + _load_folders(db_url), key="sync_folder")
                 
                 if st.button("🔄 Sync Labels", type="secondary"):
                     try:
@@ -851,18 +1016,19 @@ def render(db_url: str):
             
             with col2:
                 st.write("**Statistics**")
-                labels_count = len(label_service.list_labels())
-                label_keys_count = len(label_service.get_label_keys())
+                labels_count = len(_load_labels(db_url))
+                label_keys_count = len(_load_label_keys(db_url))
                 
                 st.metric("Total Label Definitions", labels_count)
                 st.metric("Unique Label Keys", label_keys_count)
                 
-                # Count assignments
-                vm_label_count = session.query(VirtualMachine).join(
-                    'virtual_machines'
-                ).count() if hasattr(VirtualMachine, 'labels') else 0
+                # Count assignments (cached briefly; refreshed at most every 30s)
+                assignment_counts = _load_assignment_counts(db_url)
                 
-                st.caption(f"📊 Active in system")
+                st.caption(
+                    f"📊 Active in system: {assignment_counts['vm']:,} VM assignment(s), "
+                    f"{assignment_counts['folder']:,} folder assignment(s)"
+                )
             
             add_vertical_space(2)
             st.divider()
@@ -876,33 +1042,31 @@ def render(db_url: str):
                 st.write("**Create Backup**")
                 st.caption("Export all labels and assignments to JSON file")
                 
-                from datetime import datetime
-                from pathlib import Path
-                
                 default_filename = f"labels_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
                 backup_filename = st.text_input("Backup Filename", value=default_filename, key="backup_filename")
+                save_backup = st.checkbox("Also save to data/backups", value=True, key="save_backup")
                 
                 if st.button("💾 Create Backup", type="primary", key="create_backup"):
                     try:
-                        from src.services.backup_service import BackupService
                         backup_service = BackupService(session)
                         
-                        backup_path = Path("data/backups") / backup_filename
-                        
                         with st.spinner("Creating backup..."):
-                            stats = backup_service.export_labels(backup_path)
+                            if save_backup:
+                                stats = backup_service.export_labels(Path("data/backups") / backup_filename)
+                            else:
+                                backup_service.export_labels_to_bytes()
                         
                         st.success(f"✅ Backup created successfully!")
-                        st.info(f"📊 Labels: {stats['labels']}, VM Assignments: {stats['vm_assignments']}, Folder Assignments: {stats['folder_assignments']}")
-                        st.caption(f"📁 File: {stats['file']} ({stats['size_bytes']:,} bytes)")
-                        
-                        # Offer download
-                        with open(backup_path, 'r') as f:
-                            backup_data = f.read()
+                        if save_backup:
+                            st.info(f"📊 Labels: {stats['labels']}, VM Assignments: {stats['vm_assignments']}, Folder Assignments: {stats['folder_assignments']}")
+                            st.caption(f"📁 File: {stats['file']} ({stats['size_bytes']:,} bytes)")
+                        else:
+                            st.caption(f"📦 {len(backup_service.last_export_bytes):,} bytes, not saved on the server")
                         
+                        # Offer download of the exported bytes (no re-read from disk)
                         st.download_button(
                             label="⬇️ Download Backup",
-                            data=backup_data,
+                            data=backup_service.last_export_bytes,
                             file_name=backup_filename,
                             mime="application/json"
                         )
@@ -922,19 +1086,25 @@ def render(db_url: str):
                 )
                 
                 if uploaded_file:
-                    import json
-                    import tempfile
-                    
                     try:
-                        # Show backup info
-                        backup_content = json.loads(uploaded_file.read())
-                        uploaded_file.seek(0)  # Reset file pointer
+                        # Show backup info from the counts header; only older
+                        # backups without one need a full parse here
+                        header = BackupService.read_backup_header(uploaded_file)
+                        if header is None:
+                            backup_content = _parse_backup_upload(uploaded_file)
+                            header = {
+                                'exported_at': backup_content.get('exported_at'),
+                                'counts': {
+                                    section: len(backup_content.get(section, []))
+                                    for section in ('labels', 'vm_assignments', 'folder_assignments')
+                                }
+                            }
                         
                         st.info(f"📊 Backup contains:")
-                        st.caption(f"Labels: {len(backup_content.get('labels', []))}")
-                        st.caption(f"VM Assignments: {len(backup_content.get('vm_assignments', []))}")
-                        st.caption(f"Folder Assignments: {len(backup_content.get('folder_assignments', []))}")
-                        st.caption(f"Exported: {backup_content.get('exported_at', 'Unknown')}")
+                        st.caption(f"Labels: {header['counts'].get('labels', 0)}")
+                        st.caption(f"VM Assignments: {header['counts'].get('vm_assignments', 0)}")
+                        st.caption(f"Folder Assignments: {header['counts'].get('folder_assignments', 0)}")
+                        st.caption(f"Exported: {header['exported_at'] or 'Unknown'}")
                         
                         restore_mode = st.selectbox(
                             "Import Mode",
@@ -944,23 +1114,16 @@ def render(db_url: str):
                         )
                         
                         if st.button("🔄 Restore from Backup", type="primary", key="restore_backup"):
-                            # Confirmation
-                            confirm_key = "confirm_restore"
-                            if st.session_state.get(confirm_key):
+                            if _confirmed("restore", uploaded_file.name):
                                 try:
-                                    from src.services.backup_service import BackupService
                                     backup_service = BackupService(session)
                                     
-                                    # Save uploaded file temporarily
-                                    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as tmp:
-                                        json.dump(backup_content, tmp)
-                                        tmp_path = Path(tmp.name)
-                                    
+                                    # Import the parsed upload directly (no temp file)
                                     with st.spinner("Restoring backup..."):
-                                        stats = backup_service.import_labels(tmp_path, mode=restore_mode)
+                                        backup_content = _parse_backup_upload(uploaded_file)
+                                        stats = backup_service.import_labels_from_dict(backup_content, mode=restore_mode)
                                     
-                                    # Clean up
-                                    tmp_path.unlink()
+                                    _clear_label_caches()
                                     
                                     st.success("✅ Restore complete!")
                                     st.info(f"""
@@ -980,15 +1143,11 @@ def render(db_url: str):
                                             for error in stats['errors'][:20]:
                                                 st.caption(f"- {error}")
                                     
-                                    st.session_state[confirm_key] = False
                                     st.rerun()
                                     
                                 except Exception as e:
                                     st.error(f"❌ Error restoring backup: {e}")
-                                    if tmp_path.exists():
-                                        tmp_path.unlink()
                             else:
-                                st.session_state[confirm_key] = True
                                 st.warning("⚠️ Click again to confirm restore operation")
                         
                     except json.JSONDecodeError:
@@ -185,15 +185,14 @@ def render(db_url: str):
             vms = filtered_vms[offset:offset + page_size]
         else:
             # Use database-side pagination (much more efficient)
-            # Get total for warning
-            total_count = query.count()
-            config = PaginationConfig(page_size=page_size)
-            show_results_warning(total_count, config)
-            
-            # Paginate query
+            # Paginate query; the total comes back with the page
             result = paginate_query(query, page=page, page_size=page_size)
             vms = result.items
             
+            # Warn on large result sets
+            config = PaginationConfig(page_size=page_size)
+            show_results_warning(result.total, config)
+            
             st.info(f"Found {result.total:,} VMs")
             
             # Show pagination controls
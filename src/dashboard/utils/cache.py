@@ -4,6 +4,8 @@ This module provides cached query functions for common database operations
 to improve performance and reduce database load.
 """
 
+import io
+import pandas as pd
 import streamlit as st
 from sqlalchemy import func
 from sqlalchemy.orm import Session
@@ -28,12 +30,12 @@ def get_datacenters(db_url: str) -> List[str]:
         db_url: Database URL
         
     Returns:
-        List of datacenter names
+        List of datacenter names, sorted
     """
     from .database import DatabaseManager
     
     with DatabaseManager.session_scope(db_url) as session:
-        result = session.query(VirtualMachine.datacenter).distinct().all()
+        result = session.query(VirtualMachine.datacenter).distinct().order_by(VirtualMachine.datacenter).all()
         return [dc[0] for dc in result if dc[0]]
 
 
@@ -45,12 +47,12 @@ def get_clusters(db_url: str) -> List[str]:
         db_url: Database URL
         
     Returns:
-        List of cluster names
+        List of cluster names, sorted
     """
     from .database import DatabaseManager
     
     with DatabaseManager.session_scope(db_url) as session:
-        result = session.query(VirtualMachine.cluster).distinct().all()
+        result = session.query(VirtualMachine.cluster).distinct().order_by(VirtualMachine.cluster).all()
         return [cluster[0] for cluster in result if cluster[0]]
 
 
@@ -71,6 +73,29 @@ def get_power_states(db_url: str) -> List[str]:
         return [ps[0] for ps in result if ps[0]]
 
 
+@st.cache_data(ttl=CACHE_TTL_LONG)
+def get_distinct_values(db_url: str, column: str) -> tuple:
+    """Get the distinct non-null values of a VM column with caching.
+    
+    Intended for low-cardinality (categorical) columns such as power state
+    or firmware, where the value list is small and rarely changes.
+    
+    Args:
+        db_url: Database URL
+        column: VirtualMachine attribute name
+        
+    Returns:
+        Tuple of distinct values
+    """
+    from .database import DatabaseManager
+    
+    col_attr = getattr(VirtualMachine, column)
+    
+    with DatabaseManager.session_scope(db_url) as session:
+        result = session.query(col_attr).filter(col_attr.isnot(None)).distinct().all()
+        return tuple(value[0] for value in result)
+
+
 @st.cache_data(ttl=CACHE_TTL_SHORT)
 def get_vm_counts(db_url: str) -> Dict[str, int]:
     """Get VM counts with caching.
@@ -234,6 +259,25 @@ def get_label_values(db_url: str, key: str) -> List[str]:
         return [value[0] for value in result if value[0]]
 
 
+@st.cache_data(ttl=CACHE_TTL_MEDIUM, show_spinner=False)
+def encode_csv(df: pd.DataFrame) -> bytes:
+    """Encode a DataFrame as UTF-8 CSV bytes with caching.
+    
+    Streamlit hashes the DataFrame, so download buttons only re-serialize
+    when the data actually changes. Rows are written straight into a byte
+    buffer, skipping the intermediate str copy.
+    
+    Args:
+        df: DataFrame to export
+        
+    Returns:
+        CSV content without the index
+    """
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, encoding='utf-8')
+    return buffer.getvalue()
+
+
 def clear_all_caches():
     """Clear all cached data.
     
@@ -279,11 +323,13 @@ class CacheManager:
             get_datacenters,
             get_clusters,
             get_power_states,
+            get_distinct_values,
             get_vm_counts,
             get_resource_totals,
             get_data_quality_metrics,
             get_label_keys,
-            get_label_values
+            get_label_values,
+            encode_csv
         ]
         
         return {
@@ -5,6 +5,7 @@ efficiently without loading everything into memory.
 """
 
 import streamlit as st
+from sqlalchemy import func
 from sqlalchemy.orm import Query
 from typing import Any, Callable, Optional, Tuple
 import logging
@@ -84,10 +85,15 @@ def paginate_query(
         query: SQLAlchemy query to paginate
         page: Page number (1-indexed)
         page_size: Items per page
-        count_query: Optional separate query for counting (for optimization)
+        count_query: Optional separate query for counting (for optimization).
+            Without it, the total comes from a COUNT(*) OVER () window column on
+            the page query itself, so a page costs one round-trip. Queries that
+            already use DISTINCT, LIMIT or OFFSET are counted separately instead,
+            since the window would count the rows before those are applied
         
     Returns:
-        PaginatedResult with items and metadata
+        PaginatedResult with items and metadata; items have the same shape as
+        ``query.all()`` (ORM entities for a single-entity query, Rows otherwise)
         
     Example:
         query = session.query(VirtualMachine).filter(...)
@@ -101,6 +107,28 @@ def paginate_query(
     # Get total count
     if count_query:
         total = count_query.count()
+    elif _can_window_count(query):
+        page = max(1, page)
+        windowed = query.add_columns(
+            func.count().over().label('_total')
+        ).offset((page - 1) * page_size).limit(page_size)
+        result = query.session.execute(windowed.statement).freeze()
+        rows = result().all()
+        
+        if rows or page == 1:
+            total = rows[0]._total if rows else 0
+            # Drop the window column but keep the Row/entity shape of query.all()
+            descriptions = query.column_descriptions
+            page_rows = result().columns(*range(len(descriptions)))
+            if len(descriptions) == 1 and descriptions[0]['expr'] is descriptions[0]['entity']:
+                # Legacy Query.all() uniques single-entity results (e.g. after a join)
+                page_rows = page_rows.scalars().unique()
+            items = page_rows.all()
+            logger.debug(f"Paginated query: page={page}, size={page_size}, total={total}, fetched={len(items)}")
+            return PaginatedResult(items, total, page, page_size)
+        
+        # Past the last page: count separately so the page can be clamped
+        total = query.count()
     else:
         total = query.count()
     
@@ -118,6 +146,19 @@ def paginate_query(
     return PaginatedResult(items, total, page, page_size)
 
 
+def _can_window_count(query: Query) -> bool:
+    """Check whether COUNT(*) OVER () on ``query`` gives its true total.
+    
+    The window is evaluated before DISTINCT and LIMIT/OFFSET, so such queries
+    need a separate ``query.count()``, which wraps them in a subquery.
+    """
+    return not (
+        query._distinct
+        or query._limit_clause is not None
+        or query._offset_clause is not None
+    )
+
+
 def show_pagination_controls(
     result: PaginatedResult,
     key_prefix: str = "pagination"
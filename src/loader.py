@@ -2,12 +2,16 @@
 
 from datetime import datetime
 from pathlib import Path
+import logging
 import pandas as pd
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Optional
+from typing import Callable, Optional
 
 from .models import Base, VirtualMachine
+from .services.quality_service import QualityService
+
+logger = logging.getLogger(__name__)
 
 
 def normalize_column_name(name: str) -> str:
@@ -78,7 +82,16 @@ def get_sheet_names(excel_path: Path) -> list[str]:
     return excel_file.sheet_names
 
 
-def load_excel_to_db(excel_path: Path, db_url: str, clear_existing: bool = False, sheet_name: str = "Sheet1") -> int:
+PROGRESS_INTERVAL = 100  # Rows processed between progress callback invocations
+
+
+def load_excel_to_db(
+    excel_path: Path,
+    db_url: str,
+    clear_existing: bool = False,
+    sheet_name: str = "Sheet1",
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> int:
     """
     Load VMware inventory from Excel file into database.
     
@@ -87,6 +100,8 @@ def load_excel_to_db(excel_path: Path, db_url: str, clear_existing: bool = False
         db_url: SQLAlchemy database URL
         clear_existing: If True, clear existing data before loading
         sheet_name: Name or index of sheet to load (default: "Sheet1")
+        progress_callback: Optional callable receiving (rows_processed, total_rows),
+            invoked every PROGRESS_INTERVAL rows and once when all rows are processed
         
     Returns:
         Number of records loaded
@@ -124,9 +139,16 @@ def load_excel_to_db(excel_path: Path, db_url: str, clear_existing: bool = False
         column_mapping = {col: normalize_column_name(col) for col in df.columns}
         
         records_loaded = 0
+        total_rows = len(df)
+        
+        if progress_callback:
+            progress_callback(0, total_rows)
         
         # Process each row
-        for _, row in df.iterrows():
+        for row_number, (_, row) in enumerate(df.iterrows(), start=1):
+            if progress_callback and row_number % PROGRESS_INTERVAL == 0:
+                progress_callback(row_number, total_rows)
+            
             # Map Excel columns to model fields
             vm_data = {
                 "vm": str(row["VM"]) if not pd.isna(row["VM"]) else None,
@@ -220,6 +242,18 @@ def load_excel_to_db(excel_path: Path, db_url: str, clear_existing: bool = False
         
         # Commit all records
         session.commit()
+        
+        # Refresh materialized column statistics used by the Data Quality report
+        try:
+            QualityService(session).refresh_column_stats()
+        except Exception as e:
+            # Report falls back to live aggregation, so the load still succeeds
+            logger.warning(f"Could not refresh column statistics: {e}")
+            session.rollback()
+        
+        if progress_callback:
+            progress_callback(total_rows, total_rows)
+        
         return records_loaded
         
     except Exception as e:
@@ -9,6 +9,7 @@ from src.models.vmware import (
     Label,
     VMLabel,
     FolderLabel,
+    ColumnQualityStat,
     SchemaVersion
 )
 
@@ -29,6 +30,7 @@ __all__ = [
     "Label",
     "VMLabel",
     "FolderLabel",
+    "ColumnQualityStat",
     "SchemaVersion",
     "MigrationTarget",
     "MigrationScenario",
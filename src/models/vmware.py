@@ -1,7 +1,7 @@
 """Database models for VMware inventory."""
 
 from datetime import datetime
-from sqlalchemy import String, Integer, Float, DateTime, Boolean, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import String, Integer, Float, DateTime, Boolean, Text, ForeignKey, Index, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 from src.models.base import Base
 
@@ -133,6 +133,20 @@ class VirtualMachine(Base):
     # Metadata
     imported_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Partial index for folder grouping (Data Quality folder coverage)
+        Index(
+            'ix_virtual_machines_folder_not_null', 'folder',
+            sqlite_where=folder.isnot(None),
+            postgresql_where=folder.isnot(None)
+        ),
+        # Expression index for case-insensitive VM name prefix search
+        Index('ix_virtual_machines_vm_lower', func.lower(vm)),
+        # Composite indexes for distinct folders within a cluster / datacenter
+        Index('ix_virtual_machines_cluster_folder', 'cluster', 'folder'),
+        Index('ix_virtual_machines_datacenter_folder', 'datacenter', 'folder'),
+    )
+    
     def __repr__(self) -> str:
         return f"<VirtualMachine(vm='{self.vm}', datacenter='{self.datacenter}', cluster='{self.cluster}')>"
 
@@ -183,6 +197,8 @@ class VMLabel(Base):
     
     __table_args__ = (
         UniqueConstraint('vm_id', 'label_id', name='_vm_label_uc'),
+        # Covers per-VM direct/inherited coverage aggregates without table lookups
+        Index('ix_vm_labels_vm_id_inherited', 'vm_id', 'inherited_from_folder', 'label_id'),
     )
     
     def __repr__(self) -> str:
@@ -215,6 +231,26 @@ class FolderLabel(Base):
         return f"<FolderLabel(folder_path='{self.folder_path}', label_id={self.label_id})>"
 
 
+class ColumnQualityStat(Base):
+    """Per-column completeness/cardinality of virtual_machines, refreshed on import.
+    
+    Lets the Data Quality report read precomputed counts instead of
+    aggregating the whole inventory on every render.
+    """
+    
+    __tablename__ = "column_quality_stats"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    column_name: Mapped[str] = mapped_column(String(100), nullable=False, unique=True, index=True)
+    non_null_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    distinct_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_rows: Mapped[int] = mapped_column(Integer, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<ColumnQualityStat(column='{self.column_name}', non_null={self.non_null_count}, distinct={self.distinct_count})>"
+
+
 class SchemaVersion(Base):
     """Track database schema versions and migrations.
     
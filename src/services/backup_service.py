@@ -1,9 +1,11 @@
 """Backup and restore service for labels and assignments."""
 
+import io
 import json
+import re
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, List, Optional
 from sqlalchemy.orm import Session
 
 from src.models import Label, VMLabel, FolderLabel, VirtualMachine
@@ -14,11 +16,15 @@ class BackupService:
     
     def __init__(self, session: Session):
         self.session = session
+        self.last_export_bytes: Optional[bytes] = None
     
     def export_labels(self, output_path: Path, include_metadata: bool = True) -> Dict:
         """
         Export all labels and assignments to JSON file.
         
+        The serialized content is also kept in ``last_export_bytes`` so callers
+        can offer it for download without reading the file back.
+        
         Args:
             output_path: Path to output JSON file
             include_metadata: Include metadata like timestamps
@@ -26,6 +32,50 @@ class BackupService:
         Returns:
             Dictionary with export statistics
         """
+        export_data = self._build_export_data(include_metadata)
+        content = self.export_labels_to_bytes(include_metadata, export_data=export_data)
+        
+        # Write to file
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'wb') as f:
+            f.write(content)
+        
+        # Return statistics
+        return {
+            "labels": len(export_data["labels"]),
+            "vm_assignments": len(export_data["vm_assignments"]),
+            "folder_assignments": len(export_data["folder_assignments"]),
+            "file": str(output_path),
+            "size_bytes": output_path.stat().st_size
+        }
+    
+    def export_labels_to_bytes(self, include_metadata: bool = True,
+                               export_data: Dict = None) -> bytes:
+        """
+        Export all labels and assignments as UTF-8 JSON bytes, without a file.
+        
+        Args:
+            include_metadata: Include metadata like timestamps
+            export_data: Already built export structure (built when omitted)
+            
+        Returns:
+            JSON document, also kept in ``last_export_bytes``
+        """
+        if export_data is None:
+            export_data = self._build_export_data(include_metadata)
+        
+        # Encode while dumping instead of building an intermediate str
+        buffer = io.BytesIO()
+        writer = io.TextIOWrapper(buffer, encoding='utf-8')
+        json.dump(export_data, writer, indent=2, ensure_ascii=False)
+        writer.flush()
+        writer.detach()
+        
+        self.last_export_bytes = buffer.getvalue()
+        return self.last_export_bytes
+    
+    def _build_export_data(self, include_metadata: bool) -> Dict:
+        """Collect labels and assignments into the backup document structure."""
         # Get all labels
         labels = self.session.query(Label).all()
         
@@ -41,6 +91,12 @@ class BackupService:
         export_data = {
             "version": "1.0",
             "exported_at": datetime.utcnow().isoformat(),
+            # Written ahead of the arrays so read_backup_header only needs the file's start
+            "counts": {
+                "labels": len(labels),
+                "vm_assignments": len(vm_labels),
+                "folder_assignments": len(folder_labels)
+            },
             "labels": [],
             "vm_assignments": [],
             "folder_assignments": []
@@ -92,19 +148,43 @@ class BackupService:
             
             export_data["folder_assignments"].append(folder_assignment)
         
-        # Write to file
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        return export_data
+    
+    @staticmethod
+    def read_backup_header(backup_file: BinaryIO, max_bytes: int = 65536) -> Optional[Dict]:
+        """
+        Read the export date and item counts from the start of a backup file.
         
-        # Return statistics
-        return {
-            "labels": len(labels),
-            "vm_assignments": len(vm_labels),
-            "folder_assignments": len(folder_labels),
-            "file": str(output_path),
-            "size_bytes": output_path.stat().st_size
-        }
+        Backups written by export_labels carry a ``counts`` object ahead of the
+        (potentially large) data arrays, so only the first bytes are parsed.
+        
+        Args:
+            backup_file: Binary file object; rewound before and after reading
+            max_bytes: How much of the file to inspect
+            
+        Returns:
+            Dict with ``exported_at`` and ``counts``, or None for backups
+            without a counts header
+        """
+        backup_file.seek(0)
+        head = backup_file.read(max_bytes).decode('utf-8', errors='ignore')
+        backup_file.seek(0)
+        
+        decoder = json.JSONDecoder()
+        counts_match = re.search(r'"counts"\s*:\s*', head)
+        if not counts_match:
+            return None
+        try:
+            counts, _ = decoder.raw_decode(head, counts_match.end())
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(counts, dict):
+            return None
+        
+        exported_match = re.search(r'"exported_at"\s*:\s*', head)
+        exported_at = decoder.raw_decode(head, exported_match.end())[0] if exported_match else None
+        
+        return {"exported_at": exported_at, "counts": counts}
     
     def import_labels(self, input_path: Path, mode: str = 'merge', 
                      clear_existing: bool = False) -> Dict:
@@ -123,6 +203,21 @@ class BackupService:
         with open(input_path, 'r', encoding='utf-8') as f:
             import_data = json.load(f)
         
+        return self.import_labels_from_dict(import_data, mode=mode, clear_existing=clear_existing)
+    
+    def import_labels_from_dict(self, import_data: Dict, mode: str = 'merge',
+                                clear_existing: bool = False) -> Dict:
+        """
+        Import labels and assignments from an already parsed backup document.
+        
+        Args:
+            import_data: Backup content as produced by export_labels
+            mode: Import mode - 'merge' (default), 'replace', 'skip_duplicates'
+            clear_existing: Clear existing data before import (use with caution!)
+            
+        Returns:
+            Dictionary with import statistics
+        """
         stats = {
             "labels_created": 0,
             "labels_updated": 0,
@@ -1,13 +1,55 @@
 """Label service layer for managing VM and folder labels."""
 
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from typing import Callable, List, Dict, Optional, Set, Tuple
+from sqlalchemy.orm import Query, Session
+from sqlalchemy import and_, false, func, insert, literal, or_
+from sqlalchemy.dialects import postgresql, sqlite
 
 from src.models import Label, VMLabel, FolderLabel, VirtualMachine
 
 
+BULK_ASSIGN_CHUNK_SIZE = 200  # Folders written per statement batch and commit
+
+
+# Resource criteria (get_vms_by_resource_criteria arguments) behind each predefined category
+RESOURCE_SIZE_CRITERIA = {
+    'small': {'max_cpus': 2, 'max_memory_gb': 4},
+    'medium': {'min_cpus': 3, 'max_cpus': 4, 'min_memory_gb': 4, 'max_memory_gb': 16},
+    'large': {'min_cpus': 5, 'max_cpus': 8, 'min_memory_gb': 16, 'max_memory_gb': 32},
+    'xlarge': {'min_cpus': 9, 'min_memory_gb': 32},
+}
+NETWORK_COMPLEXITY_CRITERIA = {
+    'simple': {'max_nics': 1},
+    'standard': {'min_nics': 2, 'max_nics': 2},
+    'complex': {'min_nics': 3},
+}
+STORAGE_COMPLEXITY_CRITERIA = {
+    'simple': {'max_disks': 1},
+    'standard': {'min_disks': 2, 'max_disks': 3},
+    'complex': {'min_disks': 4},
+}
+
+
+def _escape_like(text: str) -> str:
+    """Escape LIKE wildcards in literal text (backslash is the escape character)."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _sql_lower(text: str):
+    """Lowercase a bound value in SQL, so it folds exactly like lower(column).
+    
+    SQLite's lower() only folds ASCII; lowering in Python instead would miss
+    non-ASCII names on that backend.
+    """
+    return func.lower(literal(text))
+
+
+def _glob_to_like(pattern: str) -> str:
+    """Translate a shell-style glob ('*' and '?') into a backslash-escaped LIKE pattern."""
+    return _escape_like(pattern).replace('*', '%').replace('?', '_')
+
+
 class LabelService:
     """Service for managing labels and their assignments."""
     
@@ -40,6 +82,39 @@ class LabelService:
         self.session.commit()
         return label
     
+    def get_or_create_label(self, key: str, value: str, description: str = None,
+                            color: str = None) -> Label:
+        """Get the label for a key-value pair, creating it if missing.
+        
+        On SQLite and PostgreSQL this is a single INSERT ... ON CONFLICT
+        RETURNING statement, so concurrent callers cannot race between the
+        lookup and the insert. Other backends fall back to create_label.
+        An existing label keeps its description and color.
+        """
+        dialect_name = self.session.get_bind().dialect.name
+        if dialect_name == 'sqlite':
+            upsert = sqlite.insert
+        elif dialect_name == 'postgresql':
+            upsert = postgresql.insert
+        else:
+            return self.create_label(key, value, description, color)
+        
+        stmt = upsert(Label).values(
+            key=key,
+            value=value,
+            description=description,
+            color=color
+        )
+        # A no-op update (rather than DO NOTHING) makes RETURNING yield the existing row
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Label.key, Label.value],
+            set_={'key': stmt.excluded.key}
+        ).returning(Label.id)
+        
+        label_id = self.session.execute(stmt).scalar_one()
+        self.session.commit()
+        return self.session.get(Label, label_id)
+    
     def get_label(self, label_id: int) -> Optional[Label]:
         """Get a label by ID."""
         return self.session.query(Label).filter(Label.id == label_id).first()
@@ -148,22 +223,76 @@ class LabelService:
         
         results = query.all()
         
-        labels = []
-        for label, vm_label in results:
-            labels.append({
-                'label_id': label.id,
-                'key': label.key,
-                'value': label.value,
-                'description': label.description,
-                'color': label.color,
-                'inherited': vm_label.inherited_from_folder,
-                'source_folder': vm_label.source_folder_path,
-                'assigned_at': vm_label.assigned_at,
-                'assigned_by': vm_label.assigned_by
-            })
+        return [self._vm_label_to_dict(label, vm_label) for label, vm_label in results]
+    
+    def get_vm_labels_bulk(self, vm_ids: List[int], include_inherited: bool = True) -> Dict[int, List[Dict]]:
+        """Get the labels of several VMs in one query.
+        
+        Returns:
+            Dict mapping VM id to its labels (VMs without labels are absent)
+        """
+        if not vm_ids:
+            return {}
+        
+        query = self.session.query(Label, VMLabel).join(
+            VMLabel, Label.id == VMLabel.label_id
+        ).filter(VMLabel.vm_id.in_(vm_ids))
+        
+        if not include_inherited:
+            query = query.filter(VMLabel.inherited_from_folder == False)
+        
+        labels = {}
+        for label, vm_label in query.order_by(Label.key, Label.value).all():
+            labels.setdefault(vm_label.vm_id, []).append(self._vm_label_to_dict(label, vm_label))
         
         return labels
     
+    @staticmethod
+    def _vm_label_to_dict(label: Label, vm_label: VMLabel) -> Dict:
+        """Flatten a VM label assignment and its label definition."""
+        return {
+            'label_id': label.id,
+            'key': label.key,
+            'value': label.value,
+            'description': label.description,
+            'color': label.color,
+            'inherited': vm_label.inherited_from_folder,
+            'source_folder': vm_label.source_folder_path,
+            'assigned_at': vm_label.assigned_at,
+            'assigned_by': vm_label.assigned_by
+        }
+    
+    def search_vms(self, name: str, limit: int = 20) -> List[VirtualMachine]:
+        """Find VMs by name, case-insensitively.
+        
+        Name prefix matches come first and are served by the lower(vm)
+        expression index. Only when they do not fill the limit is the rest
+        filled with substring matches, which need a scan.
+        
+        Args:
+            name: Text to look for in VM names
+            limit: Maximum number of VMs returned
+        """
+        vm_name = func.lower(VirtualMachine.vm)
+        
+        if self.session.get_bind().dialect.name == 'sqlite':
+            # SQLite compares text bytewise, so the prefix is a plain index range
+            prefix_match = and_(vm_name >= _sql_lower(name), vm_name < _sql_lower(name + '\U0010ffff'))
+        else:
+            prefix_match = vm_name.like(_sql_lower(f"{_escape_like(name)}%"), escape='\\')
+        
+        vms = self.session.query(VirtualMachine).filter(prefix_match).order_by(
+            vm_name
+        ).limit(limit).all()
+        
+        if len(vms) < limit:
+            vms += self.session.query(VirtualMachine).filter(
+                vm_name.like(_sql_lower(f"%{_escape_like(name)}%"), escape='\\'),
+                VirtualMachine.id.notin_([vm.id for vm in vms])
+            ).order_by(vm_name).limit(limit - len(vms)).all()
+        
+        return vms
+    
     def get_vms_with_label(self, key: str, value: str) -> List[VirtualMachine]:
         """Get all VMs that have a specific label."""
         label = self.get_label_by_key_value(key, value)
@@ -174,6 +303,17 @@ class LabelService:
             VMLabel, VirtualMachine.id == VMLabel.vm_id
         ).filter(VMLabel.label_id == label.id).all()
     
+    def query_vms_with_label(self, key: str, value: str) -> Query:
+        """Query VMs that have a specific label, resolving the label in the same statement.
+        
+        Callers can narrow it with with_entities() and read it column-wise.
+        """
+        return self.session.query(VirtualMachine).join(
+            VMLabel, VirtualMachine.id == VMLabel.vm_id
+        ).join(
+            Label, Label.id == VMLabel.label_id
+        ).filter(Label.key == key, Label.value == value)
+    
     # ========================================================================
     # Folder Label Operations
     # ========================================================================
@@ -216,6 +356,77 @@ class LabelService:
         
         return folder_label
     
+    def assign_folder_label_bulk(self, folder_paths: List[str], label_id: int,
+                                 assigned_by: str = None, inherit_to_vms: bool = True,
+                                 inherit_to_subfolders: bool = False,
+                                 progress_callback: Optional[Callable[[int, int], None]] = None
+                                 ) -> Tuple[int, int]:
+        """Assign a label to many folders with set-based statements.
+        
+        Same outcome as assign_folder_label per folder, but each chunk of
+        BULK_ASSIGN_CHUNK_SIZE folders is written with one UPDATE, one
+        multi-row INSERT per table and a single commit.
+        
+        Args:
+            folder_paths: Folder paths to label
+            label_id: Label ID to assign
+            assigned_by: Who assigned the label
+            inherit_to_vms: Apply the label to VMs in the folders
+            inherit_to_subfolders: Also apply it to VMs in subfolders
+            progress_callback: Optional callable receiving (folders_processed,
+                total_folders), invoked after each committed chunk
+        
+        Returns:
+            Tuple of (new_folder_assignments, inherited_vm_assignments)
+        """
+        total = len(folder_paths)
+        folders_assigned = 0
+        vms_assigned = 0
+        # Nearest-folder inheritance is resolved against every target folder,
+        # not just the current chunk, so the result does not depend on chunking
+        all_targets = set(folder_paths)
+        
+        for start in range(0, total, BULK_ASSIGN_CHUNK_SIZE):
+            chunk = folder_paths[start:start + BULK_ASSIGN_CHUNK_SIZE]
+            
+            # Existing assignments only get their inheritance flags updated
+            existing_query = self.session.query(FolderLabel).filter(
+                FolderLabel.label_id == label_id,
+                FolderLabel.folder_path.in_(chunk)
+            )
+            existing = {r[0] for r in existing_query.with_entities(FolderLabel.folder_path).all()}
+            if existing:
+                existing_query.update({
+                    FolderLabel.inherit_to_vms: inherit_to_vms,
+                    FolderLabel.inherit_to_subfolders: inherit_to_subfolders
+                }, synchronize_session=False)
+            
+            rows = [
+                {
+                    'folder_path': folder_path,
+                    'label_id': label_id,
+                    'assigned_by': assigned_by,
+                    'inherit_to_vms': inherit_to_vms,
+                    'inherit_to_subfolders': inherit_to_subfolders
+                }
+                for folder_path in chunk if folder_path not in existing
+            ]
+            if rows:
+                self.session.execute(insert(FolderLabel), rows)
+            
+            if inherit_to_vms:
+                vms_assigned += self._apply_folder_label_to_vms_bulk(
+                    chunk, label_id, inherit_to_subfolders, targets=all_targets
+                )
+            
+            self.session.commit()
+            folders_assigned += len(rows)
+            
+            if progress_callback:
+                progress_callback(start + len(chunk), total)
+        
+        return folders_assigned, vms_assigned
+    
     def remove_folder_label(self, folder_path: str, label_id: int,
                            remove_inherited: bool = True) -> bool:
         """Remove a label from a folder."""
@@ -242,22 +453,46 @@ class LabelService:
             FolderLabel, Label.id == FolderLabel.label_id
         ).filter(FolderLabel.folder_path == folder_path).all()
         
-        labels = []
+        return [self._folder_label_to_dict(label, folder_label) for label, folder_label in results]
+    
+    def get_folder_labels_bulk(self, folder_paths: List[str]) -> Dict[str, List[Dict]]:
+        """Get the labels of several folders in one query.
+        
+        Returns:
+            Dict mapping folder path to its labels (folders without labels are absent)
+        """
+        if not folder_paths:
+            return {}
+        
+        results = self.session.query(Label, FolderLabel).join(
+            FolderLabel, Label.id == FolderLabel.label_id
+        ).filter(
+            FolderLabel.folder_path.in_(folder_paths)
+        ).order_by(Label.key, Label.value).all()
+        
+        labels = {}
         for label, folder_label in results:
-            labels.append({
-                'label_id': label.id,
-                'key': label.key,
-                'value': label.value,
-                'description': label.description,
-                'color': label.color,
-                'inherit_to_vms': folder_label.inherit_to_vms,
-                'inherit_to_subfolders': folder_label.inherit_to_subfolders,
-                'assigned_at': folder_label.assigned_at,
-                'assigned_by': folder_label.assigned_by
-            })
+            labels.setdefault(folder_label.folder_path, []).append(
+                self._folder_label_to_dict(label, folder_label)
+            )
         
         return labels
     
+    @staticmethod
+    def _folder_label_to_dict(label: Label, folder_label: FolderLabel) -> Dict:
+        """Flatten a folder label assignment and its label definition."""
+        return {
+            'label_id': label.id,
+            'key': label.key,
+            'value': label.value,
+            'description': label.description,
+            'color': label.color,
+            'inherit_to_vms': folder_label.inherit_to_vms,
+            'inherit_to_subfolders': folder_label.inherit_to_subfolders,
+            'assigned_at': folder_label.assigned_at,
+            'assigned_by': folder_label.assigned_by
+        }
+    
     def get_folders_with_label(self, key: str, value: str) -> List[str]:
         """Get all folder paths that have a specific label."""
         label = self.get_label_by_key_value(key, value)
@@ -270,17 +505,78 @@ class LabelService:
         
         return [r[0] for r in results]
     
+    def list_folder_labels(self, cluster: str = None, datacenter: str = None,
+                           search: str = None) -> Dict[str, List[Dict]]:
+        """Get the labels of all labeled inventory folders in one query.
+        
+        Args:
+            cluster: Only folders holding VMs of this cluster
+            datacenter: Only folders holding VMs of this datacenter
+            search: Case-insensitive substring of the folder path
+        
+        Returns:
+            Dict mapping folder path to its labels, ordered by folder path
+            (only folders that hold VMs and carry labels are present)
+        """
+        vm_folders = self.session.query(VirtualMachine.folder).filter(
+            VirtualMachine.folder.isnot(None)
+        )
+        if cluster:
+            vm_folders = vm_folders.filter(VirtualMachine.cluster == cluster)
+        if datacenter:
+            vm_folders = vm_folders.filter(VirtualMachine.datacenter == datacenter)
+        
+        query = self.session.query(Label, FolderLabel).join(
+            FolderLabel, Label.id == FolderLabel.label_id
+        ).filter(FolderLabel.folder_path.in_(vm_folders))
+        
+        if search:
+            query = query.filter(
+                func.lower(FolderLabel.folder_path).like(
+                    _sql_lower(f"%{_escape_like(search)}%"), escape='\\'
+                )
+            )
+        
+        labels = {}
+        for label, folder_label in query.order_by(FolderLabel.folder_path, Label.key, Label.value).all():
+            labels.setdefault(folder_label.folder_path, []).append(
+                self._folder_label_to_dict(label, folder_label)
+            )
+        
+        return labels
+    
     # ========================================================================
     # Folder Operations
     # ========================================================================
     
-    def get_all_folders(self) -> List[str]:
-        """Get all unique folder paths from VMs."""
-        results = self.session.query(VirtualMachine.folder).filter(
+    def get_all_folders(self, cluster: str = None, datacenter: str = None,
+                        pattern: str = None) -> List[str]:
+        """Get all unique folder paths from VMs.
+        
+        Args:
+            cluster: Only folders holding VMs of this cluster
+            datacenter: Only folders holding VMs of this datacenter
+            pattern: Shell-style glob (e.g. '*/prod/*') matched in the database
+        """
+        query = self.session.query(VirtualMachine.folder).filter(
             VirtualMachine.folder.isnot(None)
-        ).distinct().order_by(VirtualMachine.folder).all()
+        )
         
-        return [r[0] for r in results]
+        if cluster:
+            query = query.filter(VirtualMachine.cluster == cluster)
+        if datacenter:
+            query = query.filter(VirtualMachine.datacenter == datacenter)
+        if pattern:
+            if self.session.get_bind().dialect.name == 'sqlite':
+                # SQLite GLOB has the same semantics as fnmatch
+                query = query.filter(VirtualMachine.folder.op('GLOB')(pattern))
+            else:
+                query = query.filter(VirtualMachine.folder.like(_glob_to_like(pattern), escape='\\'))
+        
+        # Stream the rows in batches rather than buffering the whole result set
+        query = query.distinct().order_by(VirtualMachine.folder).yield_per(1000)
+        
+        return [r[0] for r in query]
     
     def get_folder_stats(self, folder_path: str) -> Dict:
         """Get statistics for a folder."""
@@ -305,6 +601,49 @@ class LabelService:
             'labels': labels
         }
     
+    def get_folder_stats_bulk(self, folder_paths: List[str],
+                              labels_by_folder: Dict[str, List[Dict]] = None) -> Dict[str, Dict]:
+        """Get statistics for several folders with one grouped query.
+        
+        Args:
+            folder_paths: Folder paths to describe
+            labels_by_folder: Labels already fetched per folder (e.g. by
+                list_folder_labels); skips the label query when given
+        
+        Returns:
+            Dict mapping each requested folder path to the same statistics
+            as get_folder_stats (folders without VMs report zero)
+        """
+        if not folder_paths:
+            return {}
+        
+        totals = {
+            folder: (vm_count, storage_sum or 0)
+            for folder, vm_count, storage_sum in self.session.query(
+                VirtualMachine.folder,
+                func.count(VirtualMachine.id),
+                func.sum(VirtualMachine.in_use_mib)
+            ).filter(
+                VirtualMachine.folder.in_(folder_paths)
+            ).group_by(VirtualMachine.folder).all()
+        }
+        if labels_by_folder is None:
+            labels_by_folder = self.get_folder_labels_bulk(folder_paths)
+        
+        stats = {}
+        for folder_path in folder_paths:
+            vm_count, storage_sum = totals.get(folder_path, (0, 0))
+            labels = labels_by_folder.get(folder_path, [])
+            stats[folder_path] = {
+                'folder_path': folder_path,
+                'vm_count': vm_count,
+                'storage_gib': storage_sum / 1024,
+                'label_count': len(labels),
+                'labels': labels
+            }
+        
+        return stats
+    
     # ========================================================================
     # Label Inheritance Logic
     # ========================================================================
@@ -342,6 +681,56 @@ class LabelService:
                 self.session.rollback()
                 continue
     
+    def _apply_folder_label_to_vms_bulk(self, folder_paths: List[str], label_id: int,
+                                        include_subfolders: bool,
+                                        targets: Optional[Set[str]] = None) -> int:
+        """Apply a folder label to the VMs of several folders with one INSERT.
+        
+        VMs that already carry the label are skipped. With subfolders, a VM
+        below several of the labeled folders inherits from the nearest one.
+        
+        Args:
+            folder_paths: Folders whose VMs (and subfolder VMs) are selected
+            label_id: Label ID to apply
+            include_subfolders: Also select VMs in subfolders
+            targets: All folders being labeled, used to find the nearest
+                source folder (defaults to folder_paths)
+        
+        Returns:
+            Number of VM labels created
+        """
+        conditions = [VirtualMachine.folder.in_(folder_paths)]
+        if include_subfolders:
+            conditions.extend(VirtualMachine.folder.like(f"{path}/%") for path in folder_paths)
+        
+        labeled_vm_ids = self.session.query(VMLabel.vm_id).filter(VMLabel.label_id == label_id)
+        vms = self.session.query(VirtualMachine.id, VirtualMachine.folder).filter(
+            or_(*conditions),
+            VirtualMachine.id.notin_(labeled_vm_ids)
+        ).all()
+        
+        if targets is None:
+            targets = set(folder_paths)
+        rows = []
+        for vm_id, folder in vms:
+            # Walk up the path to the nearest labeled folder
+            source = folder
+            while source not in targets and '/' in source:
+                source = source.rsplit('/', 1)[0]
+            if source not in targets:
+                continue
+            rows.append({
+                'vm_id': vm_id,
+                'label_id': label_id,
+                'assigned_by': 'system',
+                'inherited_from_folder': True,
+                'source_folder_path': source
+            })
+        
+        if rows:
+            self.session.execute(insert(VMLabel), rows)
+        return len(rows)
+    
     def _remove_inherited_labels_from_vms(self, folder_path: str, label_id: int,
                                          include_subfolders: bool):
         """Remove inherited labels from VMs in a folder."""
@@ -470,6 +859,10 @@ class LabelService:
             # Get specific Linux distro
             ubuntu_vms = service.get_vms_by_os_category(os_pattern='%Ubuntu%')
         """
+        return self._os_category_query(os_pattern, os_family).order_by(VirtualMachine.vm).all()
+    
+    def _os_category_query(self, os_pattern: str = None, os_family: str = None) -> Query:
+        """Build the (unordered) VM query behind get_vms_by_os_category."""
         query = self.session.query(VirtualMachine)
         
         if os_pattern:
@@ -512,7 +905,7 @@ class LabelService:
                     ~VirtualMachine.os_config.like('%Solaris%')
                 )
         
-        return query.order_by(VirtualMachine.vm).all()
+        return query
     
     def get_vms_by_resource_criteria(self,
                                      min_cpus: int = None,
@@ -555,6 +948,26 @@ class LabelService:
                 min_disks=3
             )
         """
+        return self._resource_criteria_query(
+            min_cpus=min_cpus, max_cpus=max_cpus,
+            min_memory_gb=min_memory_gb, max_memory_gb=max_memory_gb,
+            min_storage_gb=min_storage_gb, max_storage_gb=max_storage_gb,
+            min_nics=min_nics, max_nics=max_nics,
+            min_disks=min_disks, max_disks=max_disks
+        ).order_by(VirtualMachine.vm).all()
+    
+    def _resource_criteria_query(self,
+                                 min_cpus: int = None,
+                                 max_cpus: int = None,
+                                 min_memory_gb: float = None,
+                                 max_memory_gb: float = None,
+                                 min_storage_gb: float = None,
+                                 max_storage_gb: float = None,
+                                 min_nics: int = None,
+                                 max_nics: int = None,
+                                 min_disks: int = None,
+                                 max_disks: int = None) -> Query:
+        """Build the (unordered) VM query behind get_vms_by_resource_criteria."""
         query = self.session.query(VirtualMachine)
         
         # CPU filters (INTEGER)
@@ -587,7 +1000,7 @@ class LabelService:
         if max_disks is not None:
             query = query.filter(VirtualMachine.disks <= max_disks)
         
-        return query.order_by(VirtualMachine.vm).all()
+        return query
     
     def get_vms_by_resource_category(self, category: str) -> List[VirtualMachine]:
         """Get VMs by predefined resource size categories.
@@ -604,18 +1017,8 @@ class LabelService:
             - large: 5-8 vCPUs, 16-32 GB RAM
             - xlarge: 9+ vCPUs, 32+ GB RAM
         """
-        if category == 'small':
-            return self.get_vms_by_resource_criteria(max_cpus=2, max_memory_gb=4)
-        elif category == 'medium':
-            return self.get_vms_by_resource_criteria(min_cpus=3, max_cpus=4, 
-                                                    min_memory_gb=4, max_memory_gb=16)
-        elif category == 'large':
-            return self.get_vms_by_resource_criteria(min_cpus=5, max_cpus=8,
-                                                    min_memory_gb=16, max_memory_gb=32)
-        elif category == 'xlarge':
-            return self.get_vms_by_resource_criteria(min_cpus=9, min_memory_gb=32)
-        else:
-            return []
+        criteria = RESOURCE_SIZE_CRITERIA.get(category)
+        return self.get_vms_by_resource_criteria(**criteria) if criteria else []
     
     def batch_assign_label_to_vms(self, vm_ids: List[int], label_id: int,
                                   assigned_by: str = None) -> Tuple[int, int]:
@@ -656,14 +1059,8 @@ class LabelService:
             - standard: 2 NICs (typical dual-homed)
             - complex: 3+ NICs (multi-network)
         """
-        if complexity == 'simple':
-            return self.get_vms_by_resource_criteria(max_nics=1)
-        elif complexity == 'standard':
-            return self.get_vms_by_resource_criteria(min_nics=2, max_nics=2)
-        elif complexity == 'complex':
-            return self.get_vms_by_resource_criteria(min_nics=3)
-        else:
-            return []
+        criteria = NETWORK_COMPLEXITY_CRITERIA.get(complexity)
+        return self.get_vms_by_resource_criteria(**criteria) if criteria else []
     
     def get_vms_by_storage_complexity(self, complexity: str) -> List[VirtualMachine]:
         """Get VMs by storage complexity based on disk count.
@@ -679,14 +1076,45 @@ class LabelService:
             - standard: 2-3 disks (OS + data)
             - complex: 4+ disks (multi-volume)
         """
-        if complexity == 'simple':
-            return self.get_vms_by_resource_criteria(max_disks=1)
-        elif complexity == 'standard':
-            return self.get_vms_by_resource_criteria(min_disks=2, max_disks=3)
-        elif complexity == 'complex':
-            return self.get_vms_by_resource_criteria(min_disks=4)
-        else:
-            return []
+        criteria = STORAGE_COMPLEXITY_CRITERIA.get(complexity)
+        return self.get_vms_by_resource_criteria(**criteria) if criteria else []
+    
+    def filter_vms(self, filter_type: str, category: str) -> Query:
+        """Build the VM query behind a batch-labelling filter, without running it.
+        
+        Callers narrow it with with_entities()/limit() so only the rows they
+        display are fetched.
+        
+        Args:
+            filter_type: 'os_family', 'os_exact', 'os_pattern', 'resource_size',
+                'network_complexity' or 'storage_complexity'
+            category: OS family, exact os_config value, SQL LIKE pattern or
+                predefined category name, depending on filter_type
+            
+        Returns:
+            Query over VirtualMachine ordered by name (matches nothing for an
+            empty category or an unknown filter type / category)
+        """
+        query = None
+        if category:
+            if filter_type == 'os_family':
+                query = self._os_category_query(os_family=category)
+            elif filter_type == 'os_exact':
+                query = self.session.query(VirtualMachine).filter(VirtualMachine.os_config == category)
+            elif filter_type == 'os_pattern':
+                query = self._os_category_query(os_pattern=category)
+            else:
+                criteria = {
+                    'resource_size': RESOURCE_SIZE_CRITERIA,
+                    'network_complexity': NETWORK_COMPLEXITY_CRITERIA,
+                    'storage_complexity': STORAGE_COMPLEXITY_CRITERIA
+                }.get(filter_type, {}).get(category)
+                if criteria:
+                    query = self._resource_criteria_query(**criteria)
+        
+        if query is None:
+            query = self.session.query(VirtualMachine).filter(false())
+        return query.order_by(VirtualMachine.vm)
     
     def get_distinct_os_values(self) -> List[str]:
         """Get all distinct OS configuration values from VMs.
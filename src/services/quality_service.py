@@ -0,0 +1,71 @@
+"""Column quality statistics service for the VM inventory."""
+
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, inspect, select
+from typing import List
+import logging
+
+from src.models import ColumnQualityStat, VirtualMachine
+
+logger = logging.getLogger(__name__)
+
+# Columns that describe the import itself rather than the inventory
+EXCLUDED_COLUMNS = ("id", "imported_at")
+
+
+class QualityService:
+    """Service for maintaining the materialized column quality statistics."""
+    
+    def __init__(self, session: Session):
+        """Initialize quality service.
+        
+        Args:
+            session: Database session
+        """
+        self.session = session
+    
+    @staticmethod
+    def analyzable_columns() -> List[str]:
+        """Get the VirtualMachine columns covered by quality statistics."""
+        return [
+            name for name in inspect(VirtualMachine).columns.keys()
+            if name not in EXCLUDED_COLUMNS
+        ]
+    
+    def refresh_column_stats(self) -> int:
+        """Recompute non-null and distinct counts for every column in one scan.
+        
+        All COUNT / COUNT(DISTINCT) aggregates are fused into a single SELECT
+        over virtual_machines, and the previous statistics are replaced.
+        
+        Returns:
+            Number of columns refreshed
+        """
+        columns = self.analyzable_columns()
+        attrs = [getattr(VirtualMachine, name) for name in columns]
+        
+        counts = self.session.execute(select(
+            func.count(),
+            *[func.count(attr) for attr in attrs],
+            *[func.count(func.distinct(attr)) for attr in attrs]
+        ).select_from(VirtualMachine)).one()
+        
+        total_rows = counts[0]
+        refreshed_at = datetime.utcnow()
+        
+        self.session.execute(delete(ColumnQualityStat))
+        self.session.add_all([
+            ColumnQualityStat(
+                column_name=name,
+                non_null_count=counts[1 + idx] or 0,
+                distinct_count=counts[1 + len(columns) + idx] or 0,
+                total_rows=total_rows,
+                refreshed_at=refreshed_at
+            )
+            for idx, name in enumerate(columns)
+        ])
+        self.session.commit()
+        
+        logger.info(f"Refreshed quality statistics for {len(columns)} columns over {total_rows} VMs")
+        return len(columns)
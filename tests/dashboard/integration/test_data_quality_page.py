@@ -0,0 +1,192 @@
+"""Integration tests for Data Quality dashboard page."""
+
+import pytest
+import pandas as pd
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from src.models import Label, VirtualMachine, VMLabel
+
+
+@pytest.fixture
+def populated_db_url(db_url):
+    """Provide a file database URL with a small VM inventory."""
+    engine = create_engine(db_url, echo=False)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        VirtualMachine(vm="vm-01", powerstate="poweredOn", cpus=2, folder="/PROD/Web"),
+        VirtualMachine(vm="vm-02", powerstate="poweredOn", cpus=4, folder="/PROD/Web"),
+        VirtualMachine(vm="vm-03", powerstate="poweredOff", cpus=4, folder=None),
+        VirtualMachine(vm="vm-04", powerstate="poweredOff", cpus=None, folder="/DEV"),
+    ])
+    session.commit()
+    session.close()
+    engine.dispose()
+    return db_url
+
+
+@pytest.mark.integration
+@pytest.mark.dashboard
+class TestDataQualitySummary:
+    """Tests for Data Quality summary aggregation."""
+    
+    @pytest.mark.parametrize("dialect_name", ["sqlite", "postgresql"])
+    def test_distinct_count_expr(self, populated_db_url, dialect_name):
+        """Test both distinct-count forms ignore NULLs and agree."""
+        from dashboard.pages import data_quality
+        
+        engine = create_engine(populated_db_url)
+        with engine.connect() as conn:
+            expr = data_quality._distinct_count_expr(VirtualMachine.folder, dialect_name)
+            assert conn.execute(select(expr)).scalar() == 2
+        engine.dispose()
+    
+    def test_distinct_count_expr_fused(self):
+        """Test multi-column probes keep COUNT(DISTINCT) so they share one scan."""
+        from dashboard.pages import data_quality
+        
+        expr = data_quality._distinct_count_expr(VirtualMachine.folder, "postgresql", fused=True)
+        assert "SELECT" not in str(expr)
+    
+    def test_compute_quality_metrics(self, populated_db_url):
+        """Test completeness and cardinality computed in one pass."""
+        from dashboard.pages import data_quality
+        
+        df = data_quality._compute_quality(populated_db_url, ("vm", "cpus", "folder", "powerstate"), 4)
+        rows = df.set_index("Column")
+        
+        assert rows.loc["vm", "Non-Null Count"] == 4
+        assert rows.loc["vm", "Unique Values"] == 4
+        assert rows.loc["cpus", "Null Count"] == 1
+        assert rows.loc["cpus", "Unique Values"] == 2
+        assert rows.loc["folder", "Completeness (%)"] == 75.0
+        assert rows.loc["powerstate", "Unique Values"] == 2
+    
+    def test_compute_quality_empty_columns(self, populated_db_url):
+        """Test no columns yields an empty report."""
+        from dashboard.pages import data_quality
+        
+        df = data_quality._compute_quality(populated_db_url, (), 4)
+        
+        assert df.empty
+    
+    def test_compute_quality_batches_wide_column_sets(self, populated_db_url, monkeypatch):
+        """Test batched probing yields the same metrics as a single query."""
+        from dashboard.pages import data_quality
+        
+        columns = ("vm", "cpus", "folder")
+        single = data_quality._compute_quality(populated_db_url, columns, 4)
+        
+        monkeypatch.setattr(data_quality, "MAX_COLUMNS_PER_QUERY", 1)
+        data_quality._compute_quality.clear()
+        batched = data_quality._compute_quality(populated_db_url, columns, 4)
+        
+        pd.testing.assert_frame_equal(single, batched)
+    
+    def test_compute_quality_reads_materialized_stats(self, populated_db_url):
+        """Test fresh import-time statistics are used and stale ones ignored."""
+        from dashboard.pages import data_quality
+        from src.models import ColumnQualityStat
+        from src.services.quality_service import QualityService
+        
+        engine = create_engine(populated_db_url)
+        session = sessionmaker(bind=engine)()
+        QualityService(session).refresh_column_stats()
+        # Tamper with a stored count so the test can tell where values came from
+        session.query(ColumnQualityStat).filter_by(column_name="cpus").update({"distinct_count": 99})
+        session.commit()
+        session.close()
+        engine.dispose()
+        
+        fresh = data_quality._compute_quality(populated_db_url, ("vm", "cpus"), 4).set_index("Column")
+        stale = data_quality._compute_quality(populated_db_url, ("vm", "cpus"), 5).set_index("Column")
+        
+        assert fresh.loc["cpus", "Unique Values"] == 99
+        assert stale.loc["cpus", "Unique Values"] == 2
+    
+    @pytest.mark.parametrize("dialect_name", ["duckdb", "snowflake", "bigquery"])
+    def test_approx_distinct_expr_native(self, dialect_name):
+        """Test warehouses with a native estimator use APPROX_COUNT_DISTINCT."""
+        from dashboard.pages import data_quality
+        
+        expr = data_quality._approx_distinct_expr(VirtualMachine.vm, dialect_name)
+        assert str(expr).startswith("approx_count_distinct(")
+    
+    def test_approx_distinct_not_supported_on_sqlite(self, populated_db_url):
+        """Test SQLite falls back to exact distinct counts."""
+        from dashboard.pages import data_quality
+        
+        assert data_quality._approx_distinct_supported(populated_db_url) is False
+
+
+@pytest.mark.integration
+@pytest.mark.dashboard
+class TestDataQualityLabels:
+    """Tests for Data Quality label coverage aggregation."""
+    
+    def test_folder_coverage_page(self, populated_db_url):
+        """Test folders are paged largest first and NULL folders are skipped."""
+        from dashboard.pages import data_quality
+        
+        first = data_quality._folder_coverage(populated_db_url, 1, 1)
+        second = data_quality._folder_coverage(populated_db_url, 2, 1)
+        
+        assert first.to_dict("records") == [{"Folder": "/PROD/Web", "Total VMs": 2, "Labeled VMs": 0}]
+        assert second["Folder"].tolist() == ["/DEV"]
+    
+    def test_folder_coverage_keyset_matches_offset(self, populated_db_url):
+        """Test seeking past the previous page's last row returns the next page."""
+        from dashboard.pages import data_quality
+        
+        first = data_quality._folder_coverage(populated_db_url, 1, 1)
+        after = (int(first["Total VMs"].iloc[-1]), first["Folder"].iloc[-1])
+        
+        by_offset = data_quality._folder_coverage(populated_db_url, 2, 1)
+        by_keyset = data_quality._folder_coverage(populated_db_url, 2, 1, after)
+        
+        pd.testing.assert_frame_equal(by_offset, by_keyset)
+    
+    def test_folder_coverage_filter_and_sort_in_sql(self, populated_db_url):
+        """Test min_vms and sort_by apply to the whole set before paging."""
+        from dashboard.pages import data_quality
+        
+        filtered = data_quality._folder_coverage(populated_db_url, 1, 10, None, 2, "Total VMs")
+        by_folder_name = data_quality._folder_coverage(populated_db_url, 1, 10, None, 1, "Coverage %")
+        
+        assert filtered["Folder"].tolist() == ["/PROD/Web"]
+        # Equal (zero) coverage falls back to folder path order
+        assert by_folder_name["Folder"].tolist() == ["/DEV", "/PROD/Web"]
+        assert sorted(data_quality._folder_sizes(populated_db_url).tolist()) == [1, 2]
+    
+    def test_label_overview(self, populated_db_url):
+        """Test label counts and direct / inherited-only VM coverage come from one query."""
+        from dashboard.pages import data_quality
+        
+        engine = create_engine(populated_db_url)
+        session = sessionmaker(bind=engine)()
+        env, tier = Label(key="env", value="prod"), Label(key="tier", value="web")
+        session.add_all([env, tier])
+        session.flush()
+        session.add_all([
+            # vm 1: direct and inherited, vm 2: inherited only, vms 3-4: unlabeled
+            VMLabel(vm_id=1, label_id=env.id, inherited_from_folder=False),
+            VMLabel(vm_id=1, label_id=tier.id, inherited_from_folder=True),
+            VMLabel(vm_id=2, label_id=env.id, inherited_from_folder=True),
+        ])
+        session.commit()
+        
+        overview = data_quality._label_overview(populated_db_url)
+        assert overview == {
+            "total_labels": 2, "label_keys": 2, "folders_with_labels": 0,
+            "direct": 1, "inherited_only": 1, "labeled": 2,
+        }
+        # vm 1 carries two labels but is still counted once per folder
+        coverage = data_quality._folder_coverage(populated_db_url, 1, 10)
+        assert coverage.iloc[0].to_dict() == {"Folder": "/PROD/Web", "Total VMs": 2, "Labeled VMs": 2}
+        
+        session.close()
+        engine.dispose()
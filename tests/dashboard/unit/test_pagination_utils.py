@@ -0,0 +1,90 @@
+"""Unit tests for pagination utility module."""
+
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from dashboard.utils.pagination import paginate_query
+from src.models import Label, VirtualMachine, VMLabel
+
+
+@pytest.fixture
+def vm_query(db_session):
+    """Provide an ordered query over seven VMs."""
+    db_session.add_all([VirtualMachine(vm=f"vm-{i:02d}") for i in range(7)])
+    db_session.commit()
+    return db_session.query(VirtualMachine).order_by(VirtualMachine.vm)
+
+
+@pytest.mark.unit
+class TestPaginateQuery:
+    """Tests for paginate_query."""
+    
+    def test_page_and_total_in_one_query(self, vm_query):
+        """Test the window total matches and items stay ORM entities."""
+        result = paginate_query(vm_query, page=2, page_size=3)
+        
+        assert result.total == 7
+        assert result.total_pages == 3
+        assert [vm.vm for vm in result.items] == ["vm-03", "vm-04", "vm-05"]
+    
+    def test_page_past_end_is_clamped(self, vm_query):
+        """Test requesting a page beyond the last one returns the last page."""
+        result = paginate_query(vm_query, page=10, page_size=3)
+        
+        assert result.page == 3
+        assert result.total == 7
+        assert [vm.vm for vm in result.items] == ["vm-06"]
+    
+    def test_empty_query(self, db_session):
+        """Test an empty result reports zero total without a second query."""
+        result = paginate_query(db_session.query(VirtualMachine), page=1, page_size=3)
+        
+        assert result.total == 0
+        assert result.items == []
+    
+    def test_column_query_keeps_row_attributes(self, vm_query):
+        """Test multi-column queries return Rows with named attributes."""
+        query = vm_query.with_entities(VirtualMachine.vm, VirtualMachine.cluster)
+        result = paginate_query(query, page=1, page_size=2)
+        
+        assert result.total == 7
+        assert [row.vm for row in result.items] == ["vm-00", "vm-01"]
+        assert result.items[0]._mapping["cluster"] is None
+    
+    def test_distinct_query_total(self, db_session):
+        """Test DISTINCT queries report the distinct total, not the row count."""
+        db_session.add_all([
+            VirtualMachine(vm=f"vm-{i:02d}", datacenter=f"dc-{i % 2}") for i in range(6)
+        ])
+        db_session.commit()
+        query = db_session.query(VirtualMachine.datacenter).distinct().order_by(
+            VirtualMachine.datacenter
+        )
+        
+        result = paginate_query(query, page=1, page_size=10)
+        
+        assert result.total == 2
+        assert [row.datacenter for row in result.items] == ["dc-0", "dc-1"]
+    
+    def test_joined_entity_query_is_unique(self, db_session):
+        """Test a one-to-many join still returns each entity once, like query.all()."""
+        vm1, vm2 = VirtualMachine(vm="vm1"), VirtualMachine(vm="vm2")
+        prod, dev = Label(key="env", value="prod"), Label(key="env", value="dev")
+        db_session.add_all([vm1, vm2, prod, dev])
+        db_session.flush()
+        db_session.add_all([
+            VMLabel(vm_id=vm1.id, label_id=prod.id),
+            VMLabel(vm_id=vm1.id, label_id=dev.id),
+            VMLabel(vm_id=vm2.id, label_id=prod.id),
+        ])
+        db_session.commit()
+        query = db_session.query(VirtualMachine).join(
+            VMLabel, VMLabel.vm_id == VirtualMachine.id
+        ).filter(VMLabel.label_id.in_([prod.id, dev.id])).order_by(VirtualMachine.vm)
+        
+        result = paginate_query(query, page=1, page_size=10)
+        
+        assert [vm.vm for vm in result.items] == [vm.vm for vm in query.all()] == ["vm1", "vm2"]
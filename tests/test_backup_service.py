@@ -85,6 +85,31 @@ class TestLabelExport:
         assert "folder_assignments" in data
         assert len(data["labels"]) == 3
     
+    def test_export_labels_to_bytes(self, backup_service, sample_labels, tmp_path):
+        """Test that the in-memory export matches the file export."""
+        content = backup_service.export_labels_to_bytes()
+        
+        data = json.loads(content)
+        assert len(data["labels"]) == 3
+        assert backup_service.last_export_bytes == content
+        
+        output_file = tmp_path / "backup.json"
+        backup_service.export_labels(output_file)
+        assert output_file.read_bytes() == backup_service.last_export_bytes
+    
+    def test_read_backup_header(self, backup_service, sample_labels):
+        """Test that counts are read from the head of a backup without a full parse."""
+        import io
+        
+        content = backup_service.export_labels_to_bytes()
+        header = BackupService.read_backup_header(io.BytesIO(content), max_bytes=256)
+        
+        assert header["counts"] == {"labels": 3, "vm_assignments": 0, "folder_assignments": 0}
+        assert header["exported_at"] == json.loads(content)["exported_at"]
+        
+        legacy = json.dumps({"version": "1.0", "labels": []}).encode()
+        assert BackupService.read_backup_header(io.BytesIO(legacy)) is None
+    
     def test_export_labels_with_vm_assignments(self, backup_service, sample_labels, sample_vms, tmp_path):
         """Test exporting labels with VM assignments."""
         # Create VM label assignment
@@ -162,6 +187,24 @@ class TestLabelImport:
         assert label is not None
         assert label.description == "Production"
     
+    def test_import_labels_from_dict(self, backup_service, sample_labels):
+        """Test importing an already parsed backup without a file."""
+        backup_data = {
+            "labels": [
+                {"id": 7, "key": "env", "value": "test", "description": "Test", "color": "#FFFF00"},
+                {"id": 8, "key": "environment", "value": "production"}
+            ],
+            "vm_assignments": [],
+            "folder_assignments": [{"folder_path": "/test", "label_id": 7}]
+        }
+        
+        stats = backup_service.import_labels_from_dict(backup_data, mode='skip_duplicates')
+        
+        assert stats["labels_created"] == 1
+        assert stats["labels_skipped"] == 1
+        assert stats["folder_assignments_created"] == 1
+        assert backup_service.session.query(FolderLabel).one().folder_path == "/test"
+    
     def test_import_labels_skip_duplicates_mode(self, backup_service, sample_labels, tmp_path):
         """Test importing labels in skip_duplicates mode."""
         backup_data = {
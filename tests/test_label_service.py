@@ -243,6 +243,26 @@ class TestVMLabelOperations:
         # Verify filter was called with inherited_from_folder == False
         mock_query.filter.assert_called_once()
     
+    def test_get_vm_labels_bulk(self, label_service, mock_session):
+        """Test getting labels for several VMs groups rows by VM."""
+        mock_label = Mock(
+            spec=Label, id=1, key="env", value="prod",
+            description="Prod", color="#FF0000"
+        )
+        rows = [
+            (mock_label, Mock(spec=VMLabel, vm_id=vm_id, inherited_from_folder=False,
+                              source_folder_path=None, assigned_at=None, assigned_by=None))
+            for vm_id in (1, 2)
+        ]
+        
+        mock_session.query.return_value.join.return_value.filter.return_value.order_by.return_value.all.return_value = rows
+        
+        result = label_service.get_vm_labels_bulk([1, 2, 3])
+        
+        assert set(result) == {1, 2}
+        assert result[1][0]["key"] == "env"
+        mock_session.query.assert_called_once()
+    
     def test_get_vms_with_label(self, label_service, mock_session):
         """Test getting all VMs with a specific label."""
         mock_label = Mock(spec=Label, id=1)
@@ -343,6 +363,31 @@ class TestFolderLabelOperations:
         assert result[0]["key"] == "env"
         assert result[0]["inherit_to_vms"] is True
     
+    def test_get_folder_labels_bulk(self, label_service, mock_session):
+        """Test getting labels for several folders groups rows by folder."""
+        mock_label = Mock(
+            spec=Label, id=1, key="env", value="prod",
+            description="Prod", color="#FF0000"
+        )
+        rows = [
+            (mock_label, Mock(spec=FolderLabel, folder_path=path, inherit_to_vms=True,
+                              inherit_to_subfolders=False, assigned_at=None, assigned_by=None))
+            for path in ("/prod", "/prod/web")
+        ]
+        
+        mock_session.query.return_value.join.return_value.filter.return_value.order_by.return_value.all.return_value = rows
+        
+        result = label_service.get_folder_labels_bulk(["/prod", "/prod/web", "/dev"])
+        
+        assert set(result) == {"/prod", "/prod/web"}
+        assert result["/prod"][0]["key"] == "env"
+        mock_session.query.assert_called_once()
+    
+    def test_get_folder_labels_bulk_empty(self, label_service, mock_session):
+        """Test no folders issues no query."""
+        assert label_service.get_folder_labels_bulk([]) == {}
+        mock_session.query.assert_not_called()
+    
     def test_get_folders_with_label(self, label_service, mock_session):
         """Test getting all folders with a specific label."""
         mock_label = Mock(spec=Label, id=1)
@@ -369,7 +414,7 @@ class TestFolderOperations:
     
     def test_get_all_folders(self, label_service, mock_session):
         """Test getting all unique folder paths."""
-        mock_session.query.return_value.filter.return_value.distinct.return_value.order_by.return_value.all.return_value = [
+        mock_session.query.return_value.filter.return_value.distinct.return_value.order_by.return_value.yield_per.return_value = [
             ("/prod",), ("/dev",), ("/test",)
         ]
         
@@ -399,6 +444,24 @@ class TestFolderOperations:
             assert result["label_count"] == 0
 
 
+    def test_get_folder_stats_bulk(self, label_service, mock_session):
+        """Test statistics for several folders come from one grouped query."""
+        mock_session.query.return_value.filter.return_value.group_by.return_value.all.return_value = [
+            ("/prod", 10, 10240)
+        ]
+        labels = {"/prod": [{"label_id": 1, "key": "env", "value": "prod"}]}
+        
+        with patch.object(label_service, 'get_folder_labels_bulk', return_value=labels):
+            result = label_service.get_folder_stats_bulk(["/prod", "/empty"])
+        
+        assert list(result) == ["/prod", "/empty"]
+        assert result["/prod"]["vm_count"] == 10
+        assert result["/prod"]["storage_gib"] == 10
+        assert result["/prod"]["label_count"] == 1
+        assert result["/empty"]["vm_count"] == 0
+        assert result["/empty"]["labels"] == []
+
+
 class TestLabelInheritance:
     """Unit tests for label inheritance logic."""
     
@@ -541,3 +604,267 @@ class TestHelperMethods:
         result = label_service.get_vm_effective_labels(999)
         
         assert result == {}
+
+
+@pytest.fixture
+def db_session():
+    """Create an in-memory database session for set-based operations."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from src.models import Base
+    
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+class TestBulkFolderAssignment:
+    """Tests for bulk folder label assignment against a real session."""
+    
+    def test_assign_folder_label_bulk(self, db_session):
+        """Test new and existing folder assignments plus VM inheritance."""
+        label = Label(key="env", value="prod")
+        db_session.add_all([
+            label,
+            VirtualMachine(vm="vm-01", folder="/prod"),
+            VirtualMachine(vm="vm-02", folder="/prod/web"),
+            VirtualMachine(vm="vm-03", folder="/dev"),
+        ])
+        db_session.commit()
+        db_session.add(FolderLabel(folder_path="/prod", label_id=label.id, inherit_to_vms=False))
+        db_session.commit()
+        
+        progress = []
+        service = LabelService(db_session)
+        with patch("src.services.label_service.BULK_ASSIGN_CHUNK_SIZE", 1):
+            result = service.assign_folder_label_bulk(
+                ["/prod", "/prod/web"], label.id,
+                progress_callback=lambda done, total: progress.append((done, total))
+            )
+        
+        assert result == (1, 2)
+        assert progress == [(1, 2), (2, 2)]
+        assert db_session.query(FolderLabel).count() == 2
+        assert all(fl.inherit_to_vms for fl in db_session.query(FolderLabel))
+        sources = {vl.vm_id: vl.source_folder_path for vl in db_session.query(VMLabel)}
+        assert sources == {1: "/prod", 2: "/prod/web"}
+    
+    def test_assign_folder_label_bulk_subfolders_nearest_source(self, db_session):
+        """Test subfolder VMs inherit from the nearest labeled folder, once."""
+        label = Label(key="env", value="prod")
+        db_session.add_all([
+            label,
+            VirtualMachine(vm="vm-01", folder="/prod/web/app"),
+            VirtualMachine(vm="vm-02", folder="/production"),
+        ])
+        db_session.commit()
+        
+        service = LabelService(db_session)
+        result = service.assign_folder_label_bulk(
+            ["/prod", "/prod/web"], label.id, inherit_to_subfolders=True
+        )
+        
+        assert result == (2, 1)
+        vm_label = db_session.query(VMLabel).one()
+        assert vm_label.source_folder_path == "/prod/web"
+        assert vm_label.inherited_from_folder is True
+        
+        # Re-running skips VMs that already carry the label
+        assert service.assign_folder_label_bulk(["/prod"], label.id, inherit_to_subfolders=True) == (0, 0)
+    
+    def test_assign_folder_label_bulk_subfolders_across_chunks(self, db_session):
+        """Test the nearest source folder does not depend on chunk boundaries."""
+        label = Label(key="env", value="prod")
+        db_session.add_all([
+            label,
+            VirtualMachine(vm="vm-01", folder="/prod/web/app"),
+            VirtualMachine(vm="vm-02", folder="/prod/db"),
+        ])
+        db_session.commit()
+        
+        service = LabelService(db_session)
+        with patch("src.services.label_service.BULK_ASSIGN_CHUNK_SIZE", 1):
+            result = service.assign_folder_label_bulk(
+                ["/prod", "/prod/web"], label.id, inherit_to_subfolders=True
+            )
+        
+        assert result == (2, 2)
+        sources = {vm: source for vm, source in db_session.query(
+            VirtualMachine.vm, VMLabel.source_folder_path
+        ).join(VMLabel, VMLabel.vm_id == VirtualMachine.id)}
+        assert sources == {"vm-01": "/prod/web", "vm-02": "/prod"}
+
+
+class TestVMLabelQuery:
+    """Tests for querying labelled VMs against a real session."""
+    
+    def test_query_vms_with_label(self, db_session):
+        """Test the query resolves the label by key and value and can be narrowed."""
+        prod, dev = Label(key="env", value="prod"), Label(key="env", value="dev")
+        vm1, vm2 = VirtualMachine(vm="vm-01"), VirtualMachine(vm="vm-02")
+        db_session.add_all([prod, dev, vm1, vm2])
+        db_session.commit()
+        db_session.add_all([
+            VMLabel(vm_id=vm1.id, label_id=prod.id),
+            VMLabel(vm_id=vm2.id, label_id=dev.id),
+        ])
+        db_session.commit()
+        service = LabelService(db_session)
+        
+        query = service.query_vms_with_label("env", "prod")
+        
+        assert query.with_entities(VirtualMachine.vm).all() == [("vm-01",)]
+        assert service.query_vms_with_label("env", "missing").count() == 0
+
+
+class TestVMFilters:
+    """Tests for the SQL-side batch-labelling filters."""
+    
+    def test_filter_vms(self, db_session):
+        """Test filter types build queries matching the category helpers."""
+        db_session.add_all([
+            VirtualMachine(vm="win-01", os_config="Microsoft Windows Server 2019", cpus=2, memory=4096, nics=1, disks=1),
+            VirtualMachine(vm="lin-01", os_config="Ubuntu Linux (64-bit)", cpus=8, memory=32768, nics=3, disks=4),
+            VirtualMachine(vm="lin-02", os_config="Red Hat Enterprise Linux 8", cpus=4, memory=8192, nics=2, disks=2),
+        ])
+        db_session.commit()
+        service = LabelService(db_session)
+        
+        def names(filter_type, category):
+            return [vm for (vm,) in service.filter_vms(filter_type, category).with_entities(VirtualMachine.vm)]
+        
+        assert names("os_family", "linux") == ["lin-01", "lin-02"]
+        assert names("os_exact", "Red Hat Enterprise Linux 8") == ["lin-02"]
+        assert names("os_pattern", "%Windows%") == ["win-01"]
+        assert names("resource_size", "large") == ["lin-01"]
+        assert names("network_complexity", "standard") == ["lin-02"]
+        assert names("storage_complexity", "simple") == ["win-01"]
+        assert names("resource_size", "huge") == []
+        assert names("os_pattern", None) == []
+        assert [vm.vm for vm in service.get_vms_by_resource_category("medium")] == ["lin-02"]
+
+
+class TestLabelUpsert:
+    """Tests for the single-statement label upsert."""
+    
+    def test_get_or_create_label(self, db_session):
+        """Test the upsert creates once and then returns the existing label unchanged."""
+        service = LabelService(db_session)
+        
+        created = service.get_or_create_label("env", "prod", color="#ff0000")
+        again = service.get_or_create_label("env", "prod", color="#00ff00")
+        
+        assert again.id == created.id
+        assert again.color == "#ff0000"
+        assert db_session.query(Label).count() == 1
+        assert service.get_or_create_label("env", "dev").id != created.id
+
+
+class TestFolderFiltering:
+    """Tests for folder filtering pushed into the database."""
+    
+    def test_get_all_folders_filters(self, db_session):
+        """Test cluster, datacenter and glob filters narrow the folder list."""
+        db_session.add_all([
+            VirtualMachine(vm="vm-01", folder="/dc1/prod/web", cluster="CL1", datacenter="DC1"),
+            VirtualMachine(vm="vm-02", folder="/dc1/prod/db", cluster="CL2", datacenter="DC1"),
+            VirtualMachine(vm="vm-03", folder="/dc2/dev", cluster="CL1", datacenter="DC2"),
+        ])
+        db_session.commit()
+        service = LabelService(db_session)
+        
+        assert service.get_all_folders(cluster="CL1") == ["/dc1/prod/web", "/dc2/dev"]
+        assert service.get_all_folders(datacenter="DC1") == ["/dc1/prod/db", "/dc1/prod/web"]
+        assert service.get_all_folders(pattern="*/prod/*") == ["/dc1/prod/db", "/dc1/prod/web"]
+        assert service.get_all_folders(cluster="CL1", pattern="/dc?/*") == ["/dc1/prod/web", "/dc2/dev"]
+    
+    def test_list_folder_labels(self, db_session):
+        """Test labeled folders are filtered by VM location and name in one query."""
+        env, tier = Label(key="env", value="prod"), Label(key="tier", value="web")
+        db_session.add_all([
+            env, tier,
+            VirtualMachine(vm="vm-01", folder="/dc1/prod/web", cluster="CL1"),
+            VirtualMachine(vm="vm-02", folder="/dc1/prod/db", cluster="CL2"),
+            VirtualMachine(vm="vm-03", folder="/DC/Équipe", cluster="CL2"),
+        ])
+        db_session.commit()
+        db_session.add_all([
+            FolderLabel(folder_path="/DC/Équipe", label_id=env.id),
+            FolderLabel(folder_path="/dc1/prod/web", label_id=tier.id),
+            FolderLabel(folder_path="/dc1/prod/web", label_id=env.id),
+            FolderLabel(folder_path="/dc1/prod/db", label_id=env.id),
+            # Labels on folders without VMs are not listed
+            FolderLabel(folder_path="/retired", label_id=env.id),
+        ])
+        db_session.commit()
+        service = LabelService(db_session)
+        
+        result = service.list_folder_labels()
+        assert list(result) == ["/DC/Équipe", "/dc1/prod/db", "/dc1/prod/web"]
+        assert [lbl["key"] for lbl in result["/dc1/prod/web"]] == ["env", "tier"]
+        assert list(service.list_folder_labels(cluster="CL1")) == ["/dc1/prod/web"]
+        assert list(service.list_folder_labels(search="PROD/D")) == ["/dc1/prod/db"]
+        assert list(service.list_folder_labels(search="Équipe")) == ["/DC/Équipe"]
+    
+    def test_glob_to_like(self):
+        """Test glob wildcards map to LIKE and LIKE wildcards are escaped."""
+        from src.services.label_service import _glob_to_like
+        
+        assert _glob_to_like("*/prod_1/?") == "%/prod\\_1/_"
+        assert _glob_to_like("100%") == "100\\%"
+
+
+class TestVMSearch:
+    """Tests for VM name search."""
+    
+    def test_search_vms_prefix_first(self, db_session):
+        """Test prefix matches come before substring matches, case-insensitively."""
+        db_session.add_all([
+            VirtualMachine(vm="app-web-01"),
+            VirtualMachine(vm="Web-02"),
+            VirtualMachine(vm="web-01"),
+            VirtualMachine(vm="db-01"),
+        ])
+        db_session.commit()
+        service = LabelService(db_session)
+        
+        assert [vm.vm for vm in service.search_vms("WEB")] == ["web-01", "Web-02", "app-web-01"]
+        assert [vm.vm for vm in service.search_vms("web", limit=2)] == ["web-01", "Web-02"]
+        assert service.search_vms("web_") == []
+    
+    def test_search_vms_non_ascii(self, db_session):
+        """Test non-ASCII names are found, folding case the same way SQL does."""
+        db_session.add(VirtualMachine(vm="ÉCOLE-WEB-01"))
+        db_session.commit()
+        service = LabelService(db_session)
+        
+        assert [vm.vm for vm in service.search_vms("ÉCOLE")] == ["ÉCOLE-WEB-01"]
+        assert [vm.vm for vm in service.search_vms("ÉCOLE-WEB-01")] == ["ÉCOLE-WEB-01"]
+        assert [vm.vm for vm in service.search_vms("web")] == ["ÉCOLE-WEB-01"]
+    
+    def test_search_vms_prefix_uses_index(self, db_session):
+        """Test the prefix lookup search_vms issues is served by the lower(vm) expression index."""
+        from sqlalchemy import event
+        
+        statements = []
+        engine = db_session.get_bind()
+        
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+        
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            LabelService(db_session).search_vms("web", limit=1)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        
+        statement, parameters = statements[0]
+        plan = db_session.connection().exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        ).all()
+        
+        assert "SEARCH virtual_machines USING INDEX ix_virtual_machines_vm_lower" in " ".join(
+            str(row[-1]) for row in plan
+        )
@@ -0,0 +1,53 @@
+"""Unit tests for QualityService."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.models import Base, ColumnQualityStat, VirtualMachine
+from src.services.quality_service import QualityService
+
+
+@pytest.fixture
+def db_session():
+    """Create a temporary in-memory database for testing."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    session.add_all([
+        VirtualMachine(vm="vm-01", powerstate="poweredOn", cpus=2),
+        VirtualMachine(vm="vm-02", powerstate="poweredOn", cpus=None),
+        VirtualMachine(vm="vm-03", powerstate="poweredOff", cpus=2),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+class TestQualityService:
+    """Tests for materialized column statistics."""
+    
+    def test_refresh_column_stats(self, db_session):
+        """Test every analyzable column gets non-null and distinct counts."""
+        refreshed = QualityService(db_session).refresh_column_stats()
+        
+        stats = {s.column_name: s for s in db_session.query(ColumnQualityStat).all()}
+        assert refreshed == len(stats)
+        assert "id" not in stats and "imported_at" not in stats
+        assert (stats["vm"].non_null_count, stats["vm"].distinct_count) == (3, 3)
+        assert (stats["cpus"].non_null_count, stats["cpus"].distinct_count) == (2, 1)
+        assert (stats["folder"].non_null_count, stats["folder"].distinct_count) == (0, 0)
+        assert all(s.total_rows == 3 for s in stats.values())
+    
+    def test_refresh_replaces_previous_stats(self, db_session):
+        """Test a second refresh overwrites instead of duplicating rows."""
+        service = QualityService(db_session)
+        service.refresh_column_stats()
+        db_session.add(VirtualMachine(vm="vm-04", powerstate="suspended"))
+        db_session.commit()
+        service.refresh_column_stats()
+        
+        powerstate = db_session.query(ColumnQualityStat).filter_by(column_name="powerstate").one()
+        assert powerstate.total_rows == 4
+        assert powerstate.distinct_count == 3